@@ -1,17 +1,75 @@
-from fastapi import FastAPI, HTTPException, Request
-from app.schemas import TransitRequest, TransitResponse
-from app.transit_service import get_transit_analysis_payload
+from fastapi import FastAPI, HTTPException, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from app.schemas import TransitRequest, TransitResponse, TransitBatchRequest, TransitBatchResponse, ForecastRequest, \
+    EventsRequest, EventsResponse, StationsRequest, StationsResponse, ChartRegistrationRequest, \
+    ChartRegistrationResponse, StoredChartResponse, CHART_ID_PATTERN
+from app.transit_service import (
+    ChartNotFound,
+    register_chart,
+    get_stored_chart,
+    get_transit_analysis_payload,
+    get_transit_batch_payload,
+    iter_transit_batch_json,
+    iter_forecast_ndjson,
+    iter_forecast_sse,
+    prepare_natal_context,
+    get_events_payload,
+    get_stations_payload,
+)
 from app.logger_config import logger
+from app.responses import JSON, NotAcceptable, negotiate, encoded_response
+from app.codes import CODE_TABLES, encode_analysis_payload
+from app.executor import create_executor_from_env, ExecutorLease, ExecutorSaturated
+from app.response_cache import create_response_cache_from_env, make_cache_key, make_etag, etag_matches
+from core_files.ephemeris import use_ephemeris_table
+from core_files.ephemeris_table import EphemerisTable
 import uvicorn
+import json
 import time
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 # 1. Load environment variables from .env
 load_dotenv()
 
+# LRU/TTL cache of computed /analyze payloads (keyed by chart content hash + date)
+response_cache = create_response_cache_from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Execution backend for CPU-bound analysis (keeps the event loop free for /health and logging).
+    # Built per server process here, not at import, so importing app.api never starts a worker pool
+    app.state.analysis_executor = create_executor_from_env()
+    yield
+    app.state.analysis_executor.shutdown()
+
+
 # 2. Initialize the application
-app = FastAPI(title=os.getenv("PROJECT_NAME", "AstroMind API"))
+app = FastAPI(title=os.getenv("PROJECT_NAME", "AstroMind API"), lifespan=lifespan)
+
+
+def service_unavailable(e: ExecutorSaturated) -> HTTPException:
+    """503 with a retry hint when the analysis queue is saturated."""
+    logger.warning(f"Request rejected: {e}")
+    return HTTPException(status_code=503, detail="Server is busy, retry later", headers={"Retry-After": "1"})
+
+
+def response_media_type(http_request: Request) -> str:
+    """Negotiated response encoding (JSON, MessagePack or CBOR); 406 when none of the accepted ones is available."""
+    try:
+        return negotiate(http_request.headers.get("accept"))
+    except NotAcceptable as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+
+# Optional precomputed ephemeris table (built with `make ephemeris-table`), memory-mapped once per worker
+ephemeris_table_path = os.getenv("EPHEMERIS_TABLE_PATH")
+if ephemeris_table_path:
+    use_ephemeris_table(EphemerisTable.load(ephemeris_table_path))
+    logger.info(f"Ephemeris table loaded from {ephemeris_table_path}")
 
 # 3. Request logging middleware (optional, but highly useful)
 @app.middleware("http")
@@ -29,25 +87,220 @@ async def health_check():
     return {
         "status": "ok",
         "engine": "AstroMind",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "analysis_queue": app.state.analysis_executor.stats()
     }
 
-# 4. Main analysis endpoint
+async def resolve_chart(chart_data, chart_id):
+    """
+    (chart_data, chart_hash) of an inline or registered chart; unknown ids answer 404.
+    The hash is None for inline charts (computed where needed). The chart store
+    (SQLite, legacy JSON import on first use) is read on the threadpool.
+    """
+    if chart_id is None:
+        return chart_data, None
+    try:
+        return await run_in_threadpool(get_stored_chart, chart_id)
+    except ChartNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+# Response cache counters (for capacity tuning)
+@app.get("/api/v1/cache/stats", tags=["System"])
+async def cache_stats():
+    return response_cache.stats()
+
+# Chart registration: upload a chart once, then analyse it by chart_id
+@app.post("/api/v1/charts", response_model=ChartRegistrationResponse, status_code=201)
+async def create_chart(request: ChartRegistrationRequest, response: Response):
+    try:
+        result = await app.state.analysis_executor.run(register_chart, request.chart_data)
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        logger.error(f"Chart registration failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Calculation Error")
+
+    if not result["created"]:
+        response.status_code = 200
+    return result
+
+@app.get("/api/v1/charts/{chart_id}", response_model=StoredChartResponse)
+async def get_chart(chart_id: str = Path(pattern=CHART_ID_PATTERN)):
+    chart_data, chart_hash = await resolve_chart(None, chart_id)
+    return {"chart_id": chart_id, "chart_hash": chart_hash, "chart_data": chart_data}
+
+# Code tables of the compact numeric schema ("codes": true)
+@app.get("/api/v1/codes")
+async def get_codes():
+    return CODE_TABLES
+
+# 4. Main analysis endpoint (payloads are serialized directly; response_model documents the schema)
 @app.post("/api/v1/analyze", response_model=TransitResponse)
-async def analyze_transit(request: TransitRequest):
+async def analyze_transit(request: TransitRequest, http_request: Request):
+    chart_data, chart_hash = await resolve_chart(request.chart_data, request.chart_id)
+    media_type = response_media_type(http_request)
+    # Charts sent by reference get a lean response without the echoed natal chart
+    include_natal = request.include_natal if request.include_natal is not None else request.chart_id is None
+    # An explicit section list decides on its own (natal_chart is one of the sections)
+    sections = request.get_sections()
+    if sections is not None:
+        include_natal = True
     try:
-        # Business logic for transit calculation
-        payload = get_transit_analysis_payload(request.chart_data, request.transit_date)
-        return payload
+        variant = ("scores" if request.scores_only else "full") + ("+stations" if request.stationary_motion else "")
+        if not include_natal and not request.scores_only:
+            variant += "+lean"
+        if sections is not None:
+            variant += "+sections=" + ",".join(sections)
+        cache_key = make_cache_key(chart_data, request.transit_date, variant, chart_hash)
+        # One cached payload, a distinct ETag per representation (encoding and schema)
+        representation = ("" if media_type == JSON else f":{media_type}") + (":codes" if request.codes else "")
+        etag = make_etag(cache_key + representation)
+        if etag_matches(http_request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        # Shared backends (SQLite, Redis) block, so the cache is read and written on the threadpool
+        payload = await run_in_threadpool(response_cache.get, cache_key)
+        headers = {"X-Cache": "HIT" if payload is not None else "MISS", "ETag": etag}
+        if payload is None:
+            # Business logic for transit calculation
+            payload = await app.state.analysis_executor.run(
+                get_transit_analysis_payload, chart_data, request.transit_date,
+                request.scores_only, request.stationary_motion, include_natal, chart_hash, sections
+            )
+            await run_in_threadpool(response_cache.set, cache_key, payload)
+
+        if request.codes:
+            payload = encode_analysis_payload(payload)
+        return encoded_response(payload, media_type, headers=headers)
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
     except Exception as e:
         logger.error(f"Calculation failed: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Calculation Error")
 
+async def guarded_stream(chunks, error_chunk: str):
+    """
+    Once streaming has started the status code is already sent:
+    a failure is logged and reported to the client as a final chunk.
+    """
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        logger.error(f"Stream failed: {str(e)}", exc_info=True)
+        yield error_chunk
+
+class BoundedStreamingResponse(StreamingResponse):
+    """
+    Streamed response holding an analysis queue slot (ExecutorLease) until the
+    stream ends or the client disconnects, so long streams count against
+    ANALYSIS_MAX_PENDING like any other job. The content computes through the
+    same lease, so streams also run on the configured backend.
+    """
+
+    def __init__(self, content, lease: ExecutorLease, **kwargs):
+        super().__init__(content, **kwargs)
+        self.lease = lease
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.lease.release()
+
+# Batch analysis: one natal chart, many dates
+@app.post("/api/v1/analyze/batch", response_model=TransitBatchResponse)
+async def analyze_transit_batch(request: TransitBatchRequest, http_request: Request):
+    dates = request.get_dates()
+    chart_data, chart_hash = await resolve_chart(request.chart_data, request.chart_id)
+    include_natal = request.include_natal if request.include_natal is not None else request.chart_id is None
+    # Streamed batches are always JSON
+    media_type = JSON if request.stream else response_media_type(http_request)
+    try:
+        if request.stream:
+            # Invalid charts fail here with a regular 500, before the stream starts
+            chart_hash = await app.state.analysis_executor.run(prepare_natal_context, chart_data, chart_hash)
+            lease = app.state.analysis_executor.lease()
+            # Results are serialized one date at a time as they are computed; a failure
+            # closes the results array and adds an "error" member, so the document stays parseable
+            error_chunk = '],"error":' + json.dumps("Internal Calculation Error") + "}"
+            chunks = iter_transit_batch_json(lease.run, chart_data, dates, include_natal, request.codes, chart_hash)
+            return BoundedStreamingResponse(
+                guarded_stream(chunks, error_chunk), lease, media_type="application/json"
+            )
+        return encoded_response(await app.state.analysis_executor.run(
+            get_transit_batch_payload, chart_data, dates, include_natal, request.codes, chart_hash
+        ), media_type)
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        logger.error(f"Batch calculation failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Calculation Error")
+
+# Event finder: exact ingress / nakshatra / pada / house change instants
+@app.post("/api/v1/events", response_model=EventsResponse)
+async def find_transit_events(request: EventsRequest, http_request: Request):
+    media_type = response_media_type(http_request)
+    try:
+        return encoded_response(await app.state.analysis_executor.run(
+            get_events_payload, request.start_date, request.end_date,
+            request.planets, request.event_types, request.chart_data
+        ), media_type)
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        logger.error(f"Event search failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Calculation Error")
+
+# Station finder: exact station-retrograde / station-direct instants (cached per planet per year)
+@app.post("/api/v1/stations", response_model=StationsResponse)
+async def find_planet_stations(request: StationsRequest, http_request: Request):
+    media_type = response_media_type(http_request)
+    try:
+        return encoded_response(await app.state.analysis_executor.run(
+            get_stations_payload, request.start_date, request.end_date, request.planets
+        ), media_type)
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        logger.error(f"Station search failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Calculation Error")
+
+# Streamed forecast: NDJSON by default, Server-Sent Events for `Accept: text/event-stream`
+@app.post("/api/v1/forecast")
+async def forecast(request: ForecastRequest, http_request: Request):
+    chart_data, chart_hash = await resolve_chart(request.chart_data, request.chart_id)
+    executor = app.state.analysis_executor
+    try:
+        # Invalid charts fail here with a regular 500, before the stream starts
+        chart_hash = await executor.run(prepare_natal_context, chart_data, chart_hash)
+        lease = executor.lease()
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        logger.error(f"Forecast setup failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Calculation Error")
+
+    error = {"error": "Internal Calculation Error"}
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        chunks = iter_forecast_sse(lease.run, chart_data, request.iter_dates(), request.include_report, chart_hash)
+        return BoundedStreamingResponse(
+            guarded_stream(chunks, f"event: error\ndata: {json.dumps(error)}\n\n"),
+            lease,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    chunks = iter_forecast_ndjson(lease.run, chart_data, request.iter_dates(), request.include_report, chart_hash)
+    return BoundedStreamingResponse(
+        guarded_stream(chunks, json.dumps(error) + "\n"), lease, media_type="application/x-ndjson"
+    )
+
 # 5. Entry point
 if __name__ == "__main__":
     # Get configuration from .env with default fallback values
     host = os.getenv("HOST", "127.0.0.1")
-    port = int(os.getenv("PORT", 8000))
+    port = int(os.getenv("PORT", "8000"))
     debug = os.getenv("DEBUG", "False").lower() == "true"
 
     logger.info(f"Starting {app.title} server on {host}:{port}...")
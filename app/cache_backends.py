@@ -0,0 +1,349 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import orjson
+
+from core_files.sqlite_db import SQLiteDatabase
+
+BACKENDS = ("memory", "sqlite", "redis")
+
+
+class CacheBackendError(Exception):
+    """Backend is unreachable or answered with an error; callers treat it as a cache miss."""
+
+
+def encode_value(value) -> bytes:
+    """
+    Serialization used by the shared backends (payloads are JSON-compatible data;
+    dates are stored as ISO strings, as in the API response).
+    """
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def decode_value(raw: bytes):
+    return orjson.loads(raw)
+
+
+class MemoryBackend:
+    """
+    Per-process LRU with optional TTL. Values are stored as-is (no serialization),
+    so it is the fastest backend but is not shared between workers.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_size: int = 1024, ttl: float = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def size(self) -> int:
+        return len(self._items)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend(SQLiteDatabase):
+    """
+    Node-local cache shared by all workers through one SQLite file in WAL mode
+    (concurrent readers, one writer). Eviction is LRU by last access time,
+    expiry uses wall-clock time so every process sees the same deadline.
+    Hits only read: their access times are buffered and written with the next
+    set(), or once TOUCH_BATCH_SIZE of them have accumulated.
+    """
+
+    name = "sqlite"
+    TOUCH_BATCH_SIZE = 128
+    TIMEOUT = 5.0
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)",
+    )
+
+    def __init__(self, path: str, max_size: int = 1024, ttl: float = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evictions = 0
+        self._touched = {}
+        self._touched_lock = threading.Lock()
+        super().__init__(path)
+
+    def get(self, key):
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            with self._touched_lock:
+                self._touched[key] = now
+                flush = len(self._touched) >= self.TOUCH_BATCH_SIZE
+            if flush:
+                self._flush_touched(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+        return decode_value(value)
+
+    def _flush_touched(self, conn: sqlite3.Connection):
+        """Writes the buffered access times (in the caller's transaction)."""
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            conn.executemany(
+                "UPDATE cache SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in touched.items()]
+            )
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, encode_value(value), expires_at, now)
+            )
+            self._flush_touched(conn)
+            overflow = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_size
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            conn.commit()
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+    def delete(self, key):
+        try:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            conn.commit()
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+    def clear(self):
+        with self._touched_lock:
+            self._touched.clear()
+        try:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache")
+            conn.commit()
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+    def size(self) -> int:
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+
+class RedisBackend:
+    """
+    Minimal Redis client (RESP2 over a plain socket) for caches shared across nodes.
+    Keys are prefixed so clear() only touches this cache; capacity is governed by
+    the server's maxmemory policy (e.g. allkeys-lru), TTL by SET ... PX.
+    size() and clear() walk the prefix with SCAN (never the blocking KEYS).
+    Evictions happen on the server and are not attributable to the prefix, so
+    evictions is None.
+    """
+
+    name = "redis"
+    SCAN_COUNT = 1000
+
+    def __init__(self, url: str = "redis://127.0.0.1:6379/0", ttl: float = None,
+                 prefix: str = "astromind:", timeout: float = 2.0):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL '{url}', expected redis://host:port/db")
+
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.ttl = ttl
+        self.prefix = prefix
+        self.timeout = timeout
+        self.evictions = None
+        self._local = threading.local()
+
+    # --- RESP protocol ---
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self.password:
+            self._command("AUTH", self.password)
+        if self.db:
+            self._command("SELECT", self.db)
+
+    def _disconnect(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                self._local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    @staticmethod
+    def _encode_command(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        reader = self._local.reader
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by Redis server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            raise CacheBackendError(body.decode("utf-8"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise CacheBackendError(f"Unexpected RESP reply: {line!r}")
+
+    def _command(self, *args):
+        self._local.sock.sendall(self._encode_command(args))
+        return self._read_reply()
+
+    def execute(self, *args):
+        """Sends one command, reconnecting once if the connection was dropped."""
+        for attempt in range(2):
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._connect()
+                return self._command(*args)
+            except (OSError, ConnectionError) as e:
+                self._disconnect()
+                if attempt:
+                    raise CacheBackendError(f"Redis unavailable: {e}") from e
+
+    # --- cache interface ---
+
+    def get(self, key):
+        raw = self.execute("GET", self.prefix + key)
+        return None if raw is None else decode_value(raw)
+
+    def set(self, key, value):
+        args = ["SET", self.prefix + key, encode_value(value)]
+        if self.ttl:
+            args += ["PX", int(self.ttl * 1000)]
+        self.execute(*args)
+
+    def delete(self, key):
+        self.execute("DEL", self.prefix + key)
+
+    def _scan_own_keys(self):
+        """Batches of this cache's keys, SCAN_COUNT keys inspected per round trip."""
+        cursor = b"0"
+        while True:
+            cursor, keys = self.execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", self.SCAN_COUNT)
+            if keys:
+                yield keys
+            if cursor == b"0":
+                return
+
+    def clear(self):
+        for keys in self._scan_own_keys():
+            self.execute("UNLINK", *keys)
+
+    def size(self) -> int:
+        return sum(len(keys) for keys in self._scan_own_keys())
+
+    def close(self):
+        self._disconnect()
+
+
+def create_cache_backend(backend: str, max_size: int = 1024, ttl: float = None,
+                         sqlite_path: str = "response_cache.sqlite3", redis_url: str = None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown cache backend '{backend}', expected one of {BACKENDS}")
+    if backend == "memory" or max_size <= 0:
+        # max_size 0 disables caching for every backend
+        return MemoryBackend(max_size=max_size, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteBackend(sqlite_path, max_size=max_size, ttl=ttl)
+    return RedisBackend(redis_url or "redis://127.0.0.1:6379/0", ttl=ttl)
+
+
+def create_cache_backend_from_env():
+    """
+    CACHE_BACKEND: memory (default) | sqlite | redis
+    CACHE_SQLITE_PATH, CACHE_REDIS_URL, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL.
+    """
+    ttl = os.getenv("RESPONSE_CACHE_TTL")
+    return create_cache_backend(
+        os.getenv("CACHE_BACKEND", "memory"),
+        max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+        ttl=float(ttl) if ttl else None,
+        sqlite_path=os.getenv("CACHE_SQLITE_PATH", "response_cache.sqlite3"),
+        redis_url=os.getenv("CACHE_REDIS_URL"),
+    )
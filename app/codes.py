@@ -0,0 +1,97 @@
+"""
+Compact numeric schema for high-volume clients (`"codes": true` in a request).
+
+Grahas, signs, nakshatras and house statuses are sent as small integer codes,
+their index in the CODE_TABLES lists (published at GET /api/v1/codes), and
+transit positions as rows of POSITION_FIELDS instead of dicts keyed by name.
+Numbers are the same as in the named schema; the "degree" display string is
+dropped (it follows from sidereal_longitude). Free-text sections (aspects,
+planets_detailed, special_conditions, raw_logs) and the echoed natal chart are
+left as they are: leave them out with `include`.
+
+Encoding works on finished payloads, so one cached payload serves both schemas.
+"""
+from core_files.constants import GRAHAS, ZODIAC_SIGNS, NAKSHATRAS, HOUSE_STATUSES
+
+# Bumped when a table or POSITION_FIELDS changes; sent as meta.codes
+CODES_VERSION = 1
+
+POSITION_FIELDS = ("planet", "sidereal_longitude", "speed", "sign", "house", "nakshatra", "pada", "retrograde")
+
+CODE_TABLES = {
+    "version": CODES_VERSION,
+    "planets": list(GRAHAS),
+    "signs": list(ZODIAC_SIGNS),
+    "nakshatras": list(NAKSHATRAS),
+    "house_statuses": list(HOUSE_STATUSES),
+    "position_fields": list(POSITION_FIELDS),
+}
+
+PLANET_CODES = {name: code for code, name in enumerate(GRAHAS)}
+SIGN_CODES = {name: code for code, name in enumerate(ZODIAC_SIGNS)}
+NAKSHATRA_CODES = {name: code for code, name in enumerate(NAKSHATRAS)}
+STATUS_CODES = {name: code for code, name in enumerate(HOUSE_STATUSES)}
+
+# Planet-valued fields of dasha periods
+DASHA_PLANET_FIELDS = ("planet", "mahadasha", "antara", "pratyantara", "sookshma")
+
+
+def encode_positions(positions: dict) -> list:
+    """{name: position dict} -> [[planet, sidereal_longitude, speed, sign, house, nakshatra, pada, retrograde], ...]"""
+    return [
+        [
+            PLANET_CODES[name], data["sidereal_longitude"], data["speed"], SIGN_CODES[data["sign"]], data["house"],
+            NAKSHATRA_CODES[data["nakshatra"]], data["pada"], data["retrograde"]
+        ]
+        for name, data in positions.items()
+    ]
+
+
+def encode_house_scores(scores: dict) -> dict:
+    """House tables with the status as a code."""
+    return {house: {**data, "status": STATUS_CODES[data["status"]]} for house, data in scores.items()}
+
+
+def encode_dasha_states(states):
+    """Dasha periods with planet codes (None stays None)."""
+    if states is None:
+        return None
+    return {
+        level: {key: PLANET_CODES[value] if key in DASHA_PLANET_FIELDS else value for key, value in period.items()}
+        for level, period in states.items()
+    }
+
+
+def encode_analysis_payload(payload: dict) -> dict:
+    """/analyze payload (full, projected or scores_only) in the compact schema; the input is not modified."""
+    encoded = dict(payload)
+    encoded["meta"] = {**payload["meta"], "codes": CODES_VERSION}
+
+    transits = payload.get("transits")
+    if transits is not None:
+        encoded["transits"] = {**transits, "positions": encode_positions(transits["positions"])}
+        if "stationary" in transits:
+            encoded["transits"]["stationary"] = [PLANET_CODES[name] for name in transits["stationary"]]
+
+    tables = dict(payload["derived_tables"])
+    if "houses" in tables:
+        tables["houses"] = {**tables["houses"], "scores": encode_house_scores(tables["houses"]["scores"])}
+    if "house_rulers" in tables:
+        tables["house_rulers"] = {
+            house: [PLANET_CODES.get(ruler), transit_house]
+            for house, (ruler, transit_house) in tables["house_rulers"].items()
+        }
+    if "periods" in tables:
+        tables["periods"] = {**tables["periods"], "vimshottari": encode_dasha_states(tables["periods"]["vimshottari"])}
+    encoded["derived_tables"] = tables
+    return encoded
+
+
+def encode_batch_result(result: dict) -> dict:
+    """One batch/forecast result in the compact schema."""
+    encoded = dict(result)
+    encoded["positions"] = encode_positions(result["positions"])
+    encoded["houses"] = encode_house_scores(result["houses"])
+    if result["dasha"] is not None:
+        encoded["dasha"] = {level: PLANET_CODES[planet] for level, planet in result["dasha"].items()}
+    return encoded
@@ -0,0 +1,109 @@
+"""
+Payload size and encode/decode time of the response encodings.
+
+Compares the JSON the API used to produce (stdlib json) with orjson,
+MessagePack and CBOR, each in the named and in the compact code schema, on a
+full /analyze payload, a houses-only projection and a 30-day batch:
+
+    python -m app.encoding_benchmark --repeat 200
+
+Encodings whose optional package is not installed are skipped.
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+from app.codes import encode_analysis_payload
+from app.responses import JSON, MSGPACK, CBOR, available_media_types, encode, decode
+from app.transit_service import get_transit_analysis_payload, get_transit_batch_payload
+from core_files.chart_builder import build_birth_chart
+
+# Birth data of the sample chart
+SAMPLE_BIRTH = ("Пример", datetime(1988, 2, 2, 2, 2), "Москва", 55.7558, 37.6173, "Europe/Moscow")
+SAMPLE_DATE = datetime(2026, 1, 1)
+BATCH_DAYS = 30
+
+
+def stdlib_encode(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def stdlib_decode(raw: bytes):
+    return json.loads(raw)
+
+
+def sample_payloads() -> dict:
+    """{name: (named payload, code payload)}"""
+    chart = build_birth_chart(*SAMPLE_BIRTH)
+    date_str = SAMPLE_DATE.strftime("%Y-%m-%d")
+    full = get_transit_analysis_payload(chart, date_str)
+    houses = get_transit_analysis_payload(chart, date_str, include=("houses",))
+    dates = [(SAMPLE_DATE + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(BATCH_DAYS)]
+    batch = get_transit_batch_payload(chart, dates)
+    batch_codes = get_transit_batch_payload(chart, dates, codes=True)
+    return {
+        "analyze": (full, encode_analysis_payload(full)),
+        "analyze houses": (houses, encode_analysis_payload(houses)),
+        f"batch {BATCH_DAYS}d": (batch, batch_codes),
+    }
+
+
+def encoders() -> dict:
+    """{label: (encode, decode)}, the old stdlib JSON first."""
+    labels = {JSON: "orjson", MSGPACK: "msgpack", CBOR: "cbor"}
+    result = {"json (stdlib)": (stdlib_encode, stdlib_decode)}
+    for media_type in available_media_types():
+        result[labels[media_type]] = (
+            lambda payload, media_type=media_type: encode(payload, media_type),
+            lambda raw, media_type=media_type: decode(raw, media_type),
+        )
+    return result
+
+
+def time_call(func, arg, repeat: int) -> float:
+    """Mean time of one call in microseconds."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def run_benchmark(repeat: int = 100) -> list:
+    """One row per payload, schema and encoding."""
+    rows = []
+    for payload_name, (named, coded) in sample_payloads().items():
+        for schema, payload in (("names", named), ("codes", coded)):
+            for label, (encode_func, decode_func) in encoders().items():
+                raw = encode_func(payload)
+                rows.append({
+                    "payload": payload_name,
+                    "schema": schema,
+                    "encoding": label,
+                    "bytes": len(raw),
+                    "gzip_bytes": len(gzip.compress(raw)),
+                    "encode_us": time_call(encode_func, payload, repeat),
+                    "decode_us": time_call(decode_func, raw, repeat),
+                })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare payload size and encode/decode time of response encodings.")
+    parser.add_argument("--repeat", type=int, default=100, help="Calls per measurement")
+    args = parser.parse_args(argv)
+
+    missing = {MSGPACK, CBOR} - set(available_media_types())
+    if missing:
+        print(f"Не установлены (пропущены): {', '.join(sorted(missing))}")
+
+    rows = run_benchmark(args.repeat)
+    print(f"{'Ответ':<16}{'Схема':<7}{'Кодировка':<15}{'Байт':>8}{'gzip':>8}{'Кодир., мкс':>13}{'Декод., мкс':>13}")
+    for row in rows:
+        print(f"{row['payload']:<16}{row['schema']:<7}{row['encoding']:<15}{row['bytes']:>8}{row['gzip_bytes']:>8}"
+              f"{row['encode_us']:>13.1f}{row['decode_us']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
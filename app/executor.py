@@ -0,0 +1,176 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+
+BACKENDS = ("thread", "process", "inline")
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the analysis queue is full; the API maps it to 503."""
+
+
+def _warm_up_worker():
+    """
+    Process-pool initializer: imports Swiss Ephemeris and the calculation engine
+    once per worker so the first request does not pay the import cost.
+    """
+    import app.transit_service  # noqa: F401
+    from core_files.ephemeris import use_ephemeris_table
+    from core_files.ephemeris_table import EphemerisTable
+
+    table_path = os.getenv("EPHEMERIS_TABLE_PATH")
+    if table_path:
+        use_ephemeris_table(EphemerisTable.load(table_path))
+
+
+def _ping():
+    return os.getpid()
+
+
+class AnalysisExecutor:
+    """
+    Runs CPU-bound analysis off the event loop with bounded queue depth.
+
+    backend:
+      - "thread"  — ThreadPoolExecutor
+      - "process" — ProcessPoolExecutor with warmed-up workers
+      - "inline"  — runs in the event loop (debugging / single-request tools)
+    max_pending limits running + queued jobs; beyond it run() raises ExecutorSaturated.
+    """
+
+    def __init__(self, backend: str = "thread", workers: int = 4, max_pending: int = 32):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown analysis backend '{backend}', expected one of {BACKENDS}")
+
+        self.backend = backend
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+
+        if backend == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        elif backend == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up_worker
+            )
+            # Spawn all workers now instead of on the first requests
+            for future in [self._pool.submit(_ping) for _ in range(workers)]:
+                future.result()
+        else:
+            self._pool = None
+
+    def acquire(self):
+        """
+        Takes a queue slot or raises ExecutorSaturated. run() holds one per job;
+        streamed responses hold one for the whole stream (release() frees it).
+        The pending counter is only touched from the event loop thread, so no lock is needed.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturated(f"Analysis queue is full ({self.max_pending} pending)")
+        self.pending += 1
+
+    def release(self):
+        self.pending -= 1
+
+    def release_when_done(self, future: Future):
+        """
+        Frees a slot once the pool job itself finishes. A cancelled await (client
+        disconnect, timeout) does not stop a job that already runs in the pool,
+        so the slot stays taken until then and max_pending keeps bounding real load.
+        """
+        if future.done():
+            self.release()
+            return
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self.release)
+            except RuntimeError:
+                pass  # event loop already closed (server shutdown)
+
+        future.add_done_callback(release)
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """
+        Starts func(*args, **kwargs) on the backend under a slot the caller already
+        holds (run() and ExecutorLease take it). Inline jobs complete before returning.
+        """
+        if self._pool is not None:
+            return self._pool.submit(partial(func, *args, **kwargs))
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    async def run(self, func, *args, **kwargs):
+        """Executes func(*args, **kwargs) on the configured backend."""
+        self.acquire()
+        try:
+            future = self.submit(func, *args, **kwargs)
+        except BaseException:
+            self.release()
+            raise
+        self.release_when_done(future)
+        return await asyncio.wrap_future(future)
+
+    def lease(self) -> "ExecutorLease":
+        """Takes a slot for a series of jobs (streamed responses); raises ExecutorSaturated."""
+        return ExecutorLease(self)
+
+    def stats(self) -> dict:
+        """Queue state for health monitoring."""
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ExecutorLease:
+    """
+    One queue slot held across several jobs: a streamed response counts against
+    max_pending for its whole duration and runs its jobs one at a time on the
+    configured backend.
+    """
+
+    def __init__(self, executor: AnalysisExecutor):
+        executor.acquire()
+        self.executor = executor
+        self._last = None
+
+    async def run(self, func, *args, **kwargs):
+        """Executes func(*args, **kwargs) on the backend under the held slot."""
+        self._last = self.executor.submit(func, *args, **kwargs)
+        return await asyncio.wrap_future(self._last)
+
+    def release(self):
+        """Frees the slot, once the last job finishes if it still runs."""
+        if self._last is None:
+            self.executor.release()
+        else:
+            self.executor.release_when_done(self._last)
+
+
+def create_executor_from_env() -> AnalysisExecutor:
+    """
+    Builds the executor from ANALYSIS_BACKEND, ANALYSIS_WORKERS and ANALYSIS_MAX_PENDING.
+    """
+    backend = os.getenv("ANALYSIS_BACKEND", "thread").lower()
+    workers = int(os.getenv("ANALYSIS_WORKERS", str(min(4, os.cpu_count() or 1))))
+    max_pending = int(os.getenv("ANALYSIS_MAX_PENDING", str(workers * 8)))
+    return AnalysisExecutor(backend=backend, workers=workers, max_pending=max_pending)
@@ -1,5 +1,8 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # Define the path for logs (at the project root)
@@ -19,14 +22,19 @@ def setup_logging():
     # 1. Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
     # 2. File handler
     file_handler = logging.FileHandler(LOG_DIR / "api.log", encoding="utf-8")
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+    # 3. Records are only enqueued on the event loop; a background thread does the I/O
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
 
     return logger
 
 # Create the logger instance
-logger = setup_logging()
\ No newline at end of file
+logger = setup_logging()
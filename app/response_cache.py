@@ -0,0 +1,101 @@
+import hashlib
+
+from app.cache_backends import CacheBackendError, MemoryBackend, create_cache_backend_from_env
+from app.logger_config import logger
+from core_files.natal_context import chart_content_hash
+
+# Bump together with meta.engine_version: invalidates ETags and shared-backend
+# entries produced by older engines
+CACHE_NAMESPACE = "AstroMind/2.1.0"
+
+
+def make_cache_key(chart_data: dict, transit_date: str, variant: str = "full", chart_hash: str = None) -> str:
+    """Cache key: engine namespace + canonical chart hash + transit date + payload variant."""
+    return f"{CACHE_NAMESPACE}:{chart_hash or chart_content_hash(chart_data)}:{transit_date}:{variant}"
+
+
+def make_etag(cache_key: str) -> str:
+    """
+    Strong ETag for a cache key. The payload depends only on the key
+    (except meta.calculation_timestamp), so the tag is known before calculation.
+    """
+    digest = hashlib.sha256(f"{CACHE_NAMESPACE}:{cache_key}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Checks an If-None-Match header value against the ETag (supports lists, W/ and *)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """
+    Cache of computed payloads on top of a pluggable backend (see app.cache_backends).
+    Keys are namespaced, so payloads and other cached data can share one backend.
+    Backend failures (CacheBackendError or anything else the backend raises, e.g. a
+    corrupt entry) are logged and treated as misses; hit/miss counters are per worker.
+    get() and set() block on the shared backends, so the API calls them on the threadpool.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = None, backend=None, namespace: str = "analyze"):
+        self.backend = backend if backend is not None else MemoryBackend(max_size=max_size, ttl=ttl)
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key):
+        try:
+            value = self.backend.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache backend '{self.backend.name}' read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            self.backend.set(self._key(key), value)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache backend '{self.backend.name}' write failed: {e}")
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        try:
+            size = self.backend.size()
+        except CacheBackendError:
+            size = None
+        return {
+            "backend": self.backend.name,
+            "size": size,
+            "max_size": getattr(self.backend, "max_size", None),
+            "ttl": self.backend.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def create_response_cache_from_env() -> ResponseCache:
+    """
+    Builds the cache on the backend selected by CACHE_BACKEND (memory | sqlite | redis).
+    RESPONSE_CACHE_SIZE (0 disables caching) and RESPONSE_CACHE_TTL (seconds) apply to every backend
+    that supports them.
+    """
+    return ResponseCache(backend=create_cache_backend_from_env())
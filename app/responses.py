@@ -0,0 +1,122 @@
+"""
+Direct serialization of API payloads and content negotiation.
+
+Payloads are plain dicts built by transit_service. Validating them against the
+response models and converting them with jsonable_encoder on every request
+costs about as much as the analysis itself, so endpoints return them through
+encoded_response(): the dict is written as is. The response models in
+app.schemas remain the documented schema (OpenAPI) and are checked against
+real payloads in the tests. House-indexed tables get their JSON string keys
+once, when transit_service builds the payload, so cached payloads serialize
+without any conversion.
+
+Besides JSON (orjson), MessagePack and CBOR are served to clients that ask for
+them in the Accept header. Both are optional dependencies (`pip install
+msgpack cbor2`); a client that accepts only an encoding that is not installed
+gets 406.
+"""
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional dependency
+    cbor2 = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+# Other names clients use for the same encodings
+MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+class NotAcceptable(Exception):
+    """Only encodings that are not installed were accepted; the API maps it to 406."""
+
+
+def available_media_types() -> tuple:
+    return (JSON,) + ((MSGPACK,) if msgpack is not None else ()) + ((CBOR,) if cbor2 is not None else ())
+
+
+def negotiate(accept: str) -> str:
+    """
+    Media type for an Accept header: the most preferred (highest q, then first)
+    of JSON, MessagePack and CBOR that is installed. No header, */* and
+    application/* mean JSON; other media types are ignored and JSON is served,
+    as before negotiation existed.
+    """
+    if not accept:
+        return JSON
+
+    ranges = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        ranges.append((-quality, position, MEDIA_TYPE_ALIASES.get(media_type, media_type)))
+
+    missing = []
+    for negative_quality, _, media_type in sorted(ranges):
+        if negative_quality >= 0:
+            continue  # q=0: explicitly not acceptable
+        if media_type in ("*/*", "application/*", JSON):
+            return JSON
+        if media_type in (MSGPACK, CBOR):
+            if media_type in available_media_types():
+                return media_type
+            missing.append(media_type)
+
+    if missing:
+        raise NotAcceptable(f"Not installed on this server: {', '.join(missing)}; available: "
+                            f"{', '.join(available_media_types())}")
+    return JSON
+
+
+def dumps(value) -> str:
+    """Compact JSON text (UTF-8, non-ASCII kept) for streamed chunks."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+
+
+def encode(payload, media_type: str = JSON) -> bytes:
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    if media_type == CBOR:
+        return cbor2.dumps(payload)
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def decode(raw: bytes, media_type: str = JSON):
+    if media_type == MSGPACK:
+        return msgpack.unpackb(raw, raw=False)
+    if media_type == CBOR:
+        return cbor2.loads(raw)
+    return orjson.loads(raw)
+
+
+def json_response(payload, status_code: int = 200, headers: dict = None) -> ORJSONResponse:
+    """Response serialized straight from the payload, bypassing response_model validation."""
+    return ORJSONResponse(payload, status_code=status_code, headers=headers)
+
+
+def encoded_response(payload, media_type: str = JSON, status_code: int = 200, headers: dict = None) -> Response:
+    """Payload in the negotiated encoding (see negotiate)."""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if media_type == JSON:
+        return json_response(payload, status_code=status_code, headers=headers)
+    return Response(encode(payload, media_type), status_code=status_code, headers=headers, media_type=media_type)
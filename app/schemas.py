@@ -1,16 +1,90 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from typing import Optional, Dict, Any, List, Union
+from pydantic import BaseModel, Field, AliasChoices, field_validator, model_validator
 import datetime
 
+from core_files.constants import GRAHAS, EVENT_TYPES, STATION_PLANETS
+
+# Registered chart ids (POST /api/v1/charts) are the chart content hash (SHA-256 hex)
+CHART_ID_PATTERN = r"^[0-9a-f]{64}$"
+
+# Upper bound for one batch request (a full year, including leap years)
+MAX_BATCH_DAYS = 366
+
+# Sections of the /analyze payload that can be requested with `include`
+# (house_reasons adds the reason texts to the houses table)
+ANALYSIS_SECTIONS = (
+    "natal_chart", "transits", "houses", "house_reasons", "house_rulers", "aspects",
+    "planets_detailed", "special_conditions", "periods", "raw_logs",
+)
+
+# Upper bound for one streamed forecast (ten years; memory does not depend on the range)
+MAX_FORECAST_DAYS = 3653
+
+# Upper bound for one event search
+MAX_EVENT_DAYS = 3653
+
+# Upper bound for one station search (stations are cached per year, so a century is cheap)
+MAX_STATION_DAYS = 36525
+
 # ---------- INPUT ----------
 
+def validate_chart_source(chart_data: Optional[dict], chart_id: Optional[str]):
+    """
+    Exactly one of `chart_data` (inline chart) or `chart_id` (registered via /api/v1/charts).
+    """
+    if (chart_data is None) == (chart_id is None):
+        raise ValueError("Provide either 'chart_data' or 'chart_id'")
+
+
+class ChartRegistrationRequest(BaseModel):
+    """
+    Schema for registering a natal chart for analysis by reference.
+    """
+    chart_data: dict
+
+    @field_validator('chart_data')
+    @classmethod
+    def validate_chart(cls, v):
+        missing = [key for key in ("planets", "lagna", "julian_day") if key not in v]
+        if missing:
+            raise ValueError(f"chart_data is missing required fields: {missing}")
+        return v
+
+
 class TransitRequest(BaseModel):
     """
     Schema for incoming transit analysis requests.
     """
-    chart_data: dict
+    chart_data: Optional[dict] = None
+    # Registered chart (POST /api/v1/charts) instead of inline chart_data
+    chart_id: Optional[str] = Field(default=None, pattern=CHART_ID_PATTERN)
     transit_date: str
+    scores_only: bool = False
+    # Stationary house rulers score 0 for motion instead of ±1
+    stationary_motion: bool = False
+    # Echo the natal chart back (default: yes for chart_data, no for chart_id)
+    include_natal: Optional[bool] = None
+    # Only these payload sections (ANALYSIS_SECTIONS), as a list or "a,b,c"; also accepted as `fields`
+    include: Optional[List[str]] = Field(default=None, validation_alias=AliasChoices("include", "fields"))
+    # Compact numeric schema: planets, signs, nakshatras and statuses as codes (GET /api/v1/codes)
+    codes: bool = False
+
+    @field_validator('include', mode='before')
+    @classmethod
+    def split_include(cls, v):
+        if isinstance(v, str):
+            return [item.strip() for item in v.split(",") if item.strip()]
+        return v
+
+    @field_validator('include')
+    @classmethod
+    def validate_include(cls, v):
+        if v is not None:
+            unknown = [section for section in v if section not in ANALYSIS_SECTIONS]
+            if unknown:
+                raise ValueError(f"Unknown sections: {unknown}, expected {list(ANALYSIS_SECTIONS)}")
+        return v
 
     @field_validator('transit_date')
     @classmethod
@@ -25,14 +99,379 @@ class TransitRequest(BaseModel):
         except ValueError:
             raise ValueError("Incorrect data format, should be YYYY-MM-DD")
 
+    @model_validator(mode='after')
+    def validate_chart_reference(self):
+        validate_chart_source(self.chart_data, self.chart_id)
+        if self.include is not None and self.scores_only:
+            raise ValueError("Use either 'scores_only' or 'include'")
+        if self.include is not None and self.include_natal is not None:
+            raise ValueError("Use either 'include_natal' or 'include' (with 'natal_chart')")
+        return self
+
+    def get_sections(self):
+        """Requested sections in ANALYSIS_SECTIONS order (None = all)."""
+        if self.include is None:
+            return None
+        return tuple(section for section in ANALYSIS_SECTIONS if section in self.include)
+
+
+class TransitBatchRequest(BaseModel):
+    """
+    Schema for batch transit analysis: one natal chart, many dates.
+    Either an explicit `dates` list or a `start_date`/`end_date` range (inclusive).
+    """
+    chart_data: Optional[dict] = None
+    chart_id: Optional[str] = Field(default=None, pattern=CHART_ID_PATTERN)
+    dates: Optional[List[str]] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    stream: bool = False
+    include_natal: Optional[bool] = None
+    # Compact numeric schema (see TransitRequest.codes)
+    codes: bool = False
+
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def validate_range_format(cls, v):
+        if v is not None:
+            try:
+                datetime.datetime.strptime(v, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError("Incorrect data format, should be YYYY-MM-DD")
+        return v
+
+    @field_validator('dates')
+    @classmethod
+    def validate_dates_format(cls, v):
+        if v is not None:
+            for item in v:
+                try:
+                    datetime.datetime.strptime(item, '%Y-%m-%d')
+                except ValueError:
+                    raise ValueError(f"Incorrect data format '{item}', should be YYYY-MM-DD")
+        return v
+
+    @model_validator(mode='after')
+    def validate_date_selection(self):
+        """
+        Ensures exactly one way of selecting dates is used and the batch size is bounded.
+        """
+        validate_chart_source(self.chart_data, self.chart_id)
+        has_range = self.start_date is not None or self.end_date is not None
+        if (self.dates is None) == (not has_range):
+            raise ValueError("Provide either 'dates' or 'start_date' and 'end_date'")
+        if has_range and (self.start_date is None or self.end_date is None):
+            raise ValueError("Both 'start_date' and 'end_date' are required")
+
+        count = len(self.get_dates())
+        if count == 0:
+            raise ValueError("Date selection is empty")
+        if count > MAX_BATCH_DAYS:
+            raise ValueError(f"Too many dates: {count} (maximum {MAX_BATCH_DAYS})")
+        return self
+
+    def get_dates(self) -> List[str]:
+        """Returns the requested dates as a list of YYYY-MM-DD strings."""
+        if self.dates is not None:
+            return self.dates
+
+        start = datetime.datetime.strptime(self.start_date, '%Y-%m-%d')
+        end = datetime.datetime.strptime(self.end_date, '%Y-%m-%d')
+        days = (end - start).days + 1
+        return [(start + datetime.timedelta(days=i)).strftime('%Y-%m-%d') for i in range(max(days, 0))]
+
+
+class ForecastRequest(BaseModel):
+    """
+    Schema for a streamed forecast: one natal chart over an inclusive date range.
+    Dates are produced lazily, so the range size only bounds the request duration.
+    """
+    chart_data: Optional[dict] = None
+    chart_id: Optional[str] = Field(default=None, pattern=CHART_ID_PATTERN)
+    start_date: str
+    end_date: str
+    include_report: bool = False
+
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def validate_range_format(cls, v):
+        try:
+            datetime.datetime.strptime(v, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError("Incorrect data format, should be YYYY-MM-DD")
+        return v
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        validate_chart_source(self.chart_data, self.chart_id)
+        days = self.get_days()
+        if days <= 0:
+            raise ValueError("'end_date' must not be earlier than 'start_date'")
+        if days > MAX_FORECAST_DAYS:
+            raise ValueError(f"Range too long: {days} days (maximum {MAX_FORECAST_DAYS})")
+        return self
+
+    def get_days(self) -> int:
+        start = datetime.datetime.strptime(self.start_date, '%Y-%m-%d')
+        end = datetime.datetime.strptime(self.end_date, '%Y-%m-%d')
+        return (end - start).days + 1
+
+    def iter_dates(self):
+        """Yields the YYYY-MM-DD dates of the range one at a time."""
+        start = datetime.datetime.strptime(self.start_date, '%Y-%m-%d')
+        for i in range(self.get_days()):
+            yield (start + datetime.timedelta(days=i)).strftime('%Y-%m-%d')
+
+
+class EventsRequest(BaseModel):
+    """
+    Schema for the event finder: exact sign, nakshatra, pada and house changes
+    over an inclusive date range. House events need `chart_data` (natal lagna).
+    """
+    start_date: str
+    end_date: str
+    planets: Optional[List[str]] = None
+    event_types: List[str] = ["sign", "nakshatra", "pada"]
+    chart_data: Optional[dict] = None
+
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def validate_range_format(cls, v):
+        try:
+            datetime.datetime.strptime(v, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError("Incorrect data format, should be YYYY-MM-DD")
+        return v
+
+    @field_validator('planets')
+    @classmethod
+    def validate_planets(cls, v):
+        if v is not None:
+            unknown = [p for p in v if p not in GRAHAS]
+            if unknown:
+                raise ValueError(f"Unknown planets: {unknown}")
+        return v
+
+    @field_validator('event_types')
+    @classmethod
+    def validate_event_types(cls, v):
+        unknown = [t for t in v if t not in EVENT_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown event types: {unknown}, expected {list(EVENT_TYPES)}")
+        return v
+
+    @model_validator(mode='after')
+    def validate_request(self):
+        start = datetime.datetime.strptime(self.start_date, '%Y-%m-%d')
+        end = datetime.datetime.strptime(self.end_date, '%Y-%m-%d')
+        days = (end - start).days + 1
+        if days <= 0:
+            raise ValueError("'end_date' must not be earlier than 'start_date'")
+        if days > MAX_EVENT_DAYS:
+            raise ValueError(f"Range too long: {days} days (maximum {MAX_EVENT_DAYS})")
+        if "house" in self.event_types and (not self.chart_data or self.chart_data.get("lagna") is None):
+            raise ValueError("House events require 'chart_data' with 'lagna'")
+        return self
+
+
+class StationsRequest(BaseModel):
+    """
+    Schema for the station finder: station-retrograde / station-direct instants
+    of Mercury through Saturn over an inclusive date range.
+    """
+    start_date: str
+    end_date: str
+    planets: Optional[List[str]] = None
+
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def validate_range_format(cls, v):
+        try:
+            datetime.datetime.strptime(v, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError("Incorrect data format, should be YYYY-MM-DD")
+        return v
+
+    @field_validator('planets')
+    @classmethod
+    def validate_planets(cls, v):
+        if v is not None:
+            unknown = [p for p in v if p not in STATION_PLANETS]
+            if unknown:
+                raise ValueError(f"No stations for: {unknown}, expected {STATION_PLANETS}")
+        return v
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        start = datetime.datetime.strptime(self.start_date, '%Y-%m-%d')
+        end = datetime.datetime.strptime(self.end_date, '%Y-%m-%d')
+        days = (end - start).days + 1
+        if days <= 0:
+            raise ValueError("'end_date' must not be earlier than 'start_date'")
+        if days > MAX_STATION_DAYS:
+            raise ValueError(f"Range too long: {days} days (maximum {MAX_STATION_DAYS})")
+        return self
+
 
 # ---------- OUTPUT ----------
 
-class TransitResponse(BaseModel):
+class PayloadModel(BaseModel):
+    """
+    Base of the typed payload blocks. Payloads are serialized directly
+    (app.responses), so these models document the schema and are not applied
+    to every response; unknown fields are allowed for forward compatibility.
+    """
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="allow"
+    )
+
+
+class Meta(PayloadModel):
+    engine: str
+    engine_version: str
+    calculation_timestamp: str
+    transit_date: Optional[str] = None
+    sidereal_ayanamsa: str
+    # Present in scores_only responses
+    scores_only: Optional[bool] = None
+    # Present in batch responses
+    dates_count: Optional[int] = None
+
+
+class TransitPosition(PayloadModel):
+    """Transit position of one graha (sign, degree within the sign and whole-sign house)."""
+    degree: str
+    sidereal_longitude: float
+    speed: float
+    sign: str
+    house: Optional[int] = None
+    nakshatra: str
+    pada: int
+    retrograde: bool
+
+
+class Transits(PayloadModel):
+    positions: Dict[str, TransitPosition]
+    # Present with stationary_motion=True
+    stationary: Optional[List[str]] = None
+
+
+class HouseScore(PayloadModel):
+    """Scores of one house ("1".."12"); reasons need the house_reasons section (not in scores_only mode)."""
+    total_score: float
+    score_ruler: float
+    score_planets: float
+    score_aspects: float
+    score_double_aspects: float
+    status: str
+    reasons: Optional[List[str]] = None
+
+
+class HouseScores(PayloadModel):
+    scores: Dict[str, HouseScore]
+
+
+class TransitAspect(PayloadModel):
+    transit_planet: str
+    transit_house: int
+    natal_planet: str
+    natal_house: int
+    aspect_type: str
+    description: str
+
+
+class Aspects(PayloadModel):
+    single: List[TransitAspect]
+    # {house or "same_sign": [descriptions]}
+    double: Dict[str, List[str]]
+
+
+class DashaPeriod(PayloadModel):
+    level: str
+    planet: str
+    mahadasha: Optional[str] = None
+    antara: Optional[str] = None
+    start_jd: float
+    end_jd: float
+    duration_days: float
+    start_date: datetime.date
+    end_date: datetime.date
+
+
+class Periods(PayloadModel):
+    # {"mahadasha", "antara", "pratyantara"}; None when the Moon is missing from the chart
+    vimshottari: Optional[Dict[str, DashaPeriod]] = None
+
+
+class DerivedTables(PayloadModel):
+    """Analysis tables; only `houses` is present in scores_only mode, only the requested ones with `include`."""
+    houses: Optional[HouseScores] = None
+    # {house: [ruler, ruler's transit house]}
+    house_rulers: Optional[Dict[str, List[Optional[Union[str, int]]]]] = None
+    aspects: Optional[Aspects] = None
+    planets_detailed: Optional[Dict[str, Dict[str, Any]]] = None
+    special_conditions: Optional[Dict[str, Any]] = None
+    periods: Optional[Periods] = None
+
+
+class RawLogs(PayloadModel):
+    engine_report: str
+
+
+class TransitResponse(PayloadModel):
     """
     Full JSON response schema for the transit engine.
-    Types are intentionally flexible (Dict[str, Any])
-    to accommodate dynamic and numeric keys.
+    House-indexed tables are keyed by the house number as a string ("1".."12").
+    """
+
+    meta: Meta
+
+    # Echo of the request chart; omitted in scores_only mode and for charts analysed by reference
+    natal_chart: Optional[Dict[str, Any]] = None
+
+    # Omitted in scores_only mode
+    transits: Optional[Transits] = None
+
+    derived_tables: DerivedTables
+
+    raw_logs: Optional[RawLogs] = None
+
+
+class BatchHouse(PayloadModel):
+    total_score: float
+    status: str
+
+
+class TransitBatchResult(PayloadModel):
+    """Compact analysis of one date."""
+    date: str
+    positions: Dict[str, TransitPosition]
+    houses: Dict[str, BatchHouse]
+    sade_sati: Optional[bool] = None
+    # {"mahadasha": planet, "antara": planet, "pratyantara": planet}
+    dasha: Optional[Dict[str, str]] = None
+    # Forecast with include_report=True
+    report: Optional[str] = None
+
+
+class TransitBatchResponse(PayloadModel):
+    """
+    Batch response: the natal chart once plus compact per-date results.
+    """
+
+    meta: Meta
+
+    # Omitted for charts analysed by reference
+    natal_chart: Optional[Dict[str, Any]] = None
+
+    results: List[TransitBatchResult]
+
+
+class EventsResponse(BaseModel):
+    """
+    Event finder response: events sorted by time.
     """
 
     model_config = ConfigDict(
@@ -42,10 +481,54 @@ class TransitResponse(BaseModel):
 
     meta: Dict[str, Any]
 
-    natal_chart: Dict[str, Any]
+    events: List[Dict[str, Any]]
+
+
+class StationsResponse(BaseModel):
+    """
+    Station finder response: stations sorted by time.
+    """
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="allow"
+    )
+
+    meta: Dict[str, Any]
+
+    stations: List[Dict[str, Any]]
+
+
+class ChartRegistrationResponse(BaseModel):
+    """
+    Registered chart reference: use `chart_id` in analysis requests.
+    """
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="allow"
+    )
+
+    chart_id: str
+
+    chart_hash: str
+
+    # False when the same chart content was registered before
+    created: bool
+
+
+class StoredChartResponse(BaseModel):
+    """
+    A registered chart.
+    """
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="allow"
+    )
 
-    transits: Dict[str, Any]
+    chart_id: str
 
-    derived_tables: Dict[str, Any]
+    chart_hash: str
 
-    raw_logs: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    chart_data: Dict[str, Any]
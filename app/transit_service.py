@@ -1,18 +1,125 @@
 # transit_service.py
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+
+import orjson
+
+from app.codes import CODES_VERSION, encode_batch_result
+from app.responses import dumps
+from app.schemas import ANALYSIS_SECTIONS
 from core import calculate_julian_day
 from core_files.transit_analys import (
     calculate_transit_positions,
     analyze_transits_full,
+    analyze_transits_scores,
     check_sade_sati,
+    is_sade_sati_active,
     get_house_rulers,
     analyze_transit_planets_detailed,
     transit_aspect_analysis,
     analyze_double_aspects_from_aspects
 )
-from core_files.vimshottari import get_vimshottari_dasha_states
+from core_files.natal_context import get_natal_context, chart_content_hash, NATAL_CONTEXT_CACHE_SIZE
+from core_files.chart_store import get_chart_store, API_CHARTS
+from core_files.forecast import FORECAST_CHUNK_DAYS, iter_chunks, iter_daily_forecast
+from core_files.events import find_events
+from core_files.stations import find_stations, stationary_planets
+from core_files.constants import HOUSE_STATUSES
+
+
+def get_house_status(score: float) -> str:
+    """Helper to assign human-readable status based on numerical score."""
+    if score >= 3:
+        return HOUSE_STATUSES[0]
+    elif score >= 1:
+        return HOUSE_STATUSES[1]
+    elif score > -1:
+        return HOUSE_STATUSES[2]
+    elif score > -3:
+        return HOUSE_STATUSES[3]
+    else:
+        return HOUSE_STATUSES[4]
+
+
+class ChartNotFound(LookupError):
+    """Raised for an unknown chart_id; the API maps it to 404."""
+
+
+def register_chart(chart_data: dict) -> dict:
+    """
+    Stores a chart for analysis by reference and precomputes its NatalContext.
+    The chart id is the content hash: opaque (stored charts cannot be enumerated
+    by counting ids) and the same for the same content registered again.
+    """
+    _, created = get_chart_store().add_if_absent(chart_data, collection=API_CHARTS)
+    chart_hash = chart_content_hash(chart_data)
+    get_natal_context(chart_data, chart_hash)
+    return {"chart_id": chart_hash, "chart_hash": chart_hash, "created": created}
+
+
+@lru_cache(maxsize=NATAL_CONTEXT_CACHE_SIZE)
+def get_stored_chart_json(chart_id: str) -> str:
+    """JSON document of a registered chart. Stored charts never change, so lookups are cached."""
+    data = get_chart_store().get_json_by_hash(chart_id, API_CHARTS)
+    if data is None:
+        raise ChartNotFound(f"Chart {chart_id} not found")
+    return data
+
+
+def get_stored_chart(chart_id: str) -> tuple:
+    """
+    (chart_data, chart_hash) of a registered chart. Every call parses a fresh
+    chart from the cached document, so callers cannot corrupt it for later requests.
+    """
+    return orjson.loads(get_stored_chart_json(chart_id)), chart_id
+
+
+def str_keys(table: dict) -> dict:
+    """
+    House-indexed table with the JSON string keys ("1".."12"). Converted once
+    when the payload is built, so cached payloads serialize as they are.
+    """
+    return {str(key): value for key, value in table.items()}
+
+
+def iso_dates(dasha_states):
+    """
+    Dasha states with ISO date strings, as in the JSON response, so every
+    encoding (JSON, MessagePack, CBOR, cache backends) sees the same plain values.
+    The timeline's cached period dicts are not modified.
+    """
+    if dasha_states is None:
+        return None
+    return {
+        level: {key: value.isoformat() if isinstance(value, date) else value for key, value in period.items()}
+        for level, period in dasha_states.items()
+    }
 
-def get_transit_analysis_payload(chart_data: dict, date_str: str) -> dict:
+
+def build_meta(date_str: str) -> dict:
+    """Common meta block for analysis payloads."""
+    return {
+        "engine": "AstroMind",
+        "engine_version": "2.1.0",
+        "calculation_timestamp": datetime.utcnow().isoformat(),
+        "transit_date": date_str,
+        "sidereal_ayanamsa": "Lahiri"
+    }
+
+
+def build_natal_block(chart_data: dict) -> dict:
+    """Natal chart section echoed back to the client."""
+    return {
+        "lagna": chart_data.get("lagna"),
+        "planets": chart_data.get("planets", {}),
+        "coordinates": {"latitude": chart_data.get("latitude"), "longitude": chart_data.get("longitude")},
+        "julian_day": chart_data.get("julian_day")
+    }
+
+
+def get_transit_analysis_payload(chart_data: dict, date_str: str, scores_only: bool = False,
+                                 stationary_motion: bool = False, include_natal: bool = True,
+                                 chart_hash: str = None, include=None) -> dict:
     """
     Generates a full JSON payload with transit analysis based on the natal chart.
     Includes:
@@ -23,29 +130,21 @@ def get_transit_analysis_payload(chart_data: dict, date_str: str) -> dict:
       - Detailed house and planet analysis
       - Sade Sati check
       - Vimshottari Dasha state
+    With scores_only=True only the numeric house scores are calculated and returned.
+    With stationary_motion=True house rulers standing at a station score 0 for motion.
+    With include_natal=False the natal chart is not echoed back.
+    `include` limits the payload to the listed ANALYSIS_SECTIONS (None = all);
+    sections that are not requested are not calculated either.
+    House-indexed tables are keyed by strings ("1".."12"), as in the JSON response.
     """
-
-    def get_house_status(score: float) -> str:
-        """Helper to assign human-readable status based on numerical score."""
-        if score >= 3:
-            return "Очень благоприятно"
-        elif score >= 1:
-            return "Благоприятно"
-        elif score > -1:
-            return "Нейтрально"
-        elif score > -3:
-            return "Неблагоприятно"
-        else:
-            return "Критически неблагоприятно"
+    sections = set(ANALYSIS_SECTIONS if include is None else include)
+    if not include_natal:
+        sections.discard("natal_chart")
 
     # ------------------------------------------------------------------
-    # 1. Natal Data Extraction
+    # 1. Natal Data Extraction (cached per chart content)
     # ------------------------------------------------------------------
-    natal_planets = chart_data.get("planets", {})
-    lagna_deg = chart_data.get("lagna")
-    lat = chart_data.get("latitude")
-    lon = chart_data.get("longitude")
-    jd_birth = chart_data.get("julian_day")
+    natal = get_natal_context(chart_data, chart_hash)
 
     # ------------------------------------------------------------------
     # 2. Transit Date Handling
@@ -56,87 +155,262 @@ def get_transit_analysis_payload(chart_data: dict, date_str: str) -> dict:
     # ------------------------------------------------------------------
     # 3. Calculate Transit Positions
     # ------------------------------------------------------------------
-    transit_positions = calculate_transit_positions(jd_transit, lagna_deg, lat, lon)
+    transit_positions = calculate_transit_positions(jd_transit, natal.lagna_degree, natal.latitude, natal.longitude)
+    stationary = stationary_planets(jd_transit) if stationary_motion else None
 
     # ------------------------------------------------------------------
     # 4. House Analysis (Scores and Conclusions)
     # ------------------------------------------------------------------
-    raw_report, houses_scores = analyze_transits_full(natal_planets, transit_positions)
+    if scores_only:
+        return build_scores_only_payload(natal, transit_positions, date_str, stationary)
 
-    # Apply readable statuses once houses_scores dictionary is generated
-    for house_id in houses_scores:
-        score = houses_scores[house_id].get("total_score", 0)
-        houses_scores[house_id]["status"] = get_house_status(score)
+    raw_report, houses_scores = None, None
+    if sections & {"house_reasons", "raw_logs"}:
+        # Reasons (and the report assembled from them) need the full analysis
+        raw_report, houses_scores = analyze_transits_full(
+            natal, transit_positions, stationary=stationary, with_report="raw_logs" in sections
+        )
+        if "house_reasons" not in sections:
+            for data in houses_scores.values():
+                del data["reasons"]
+    elif "houses" in sections:
+        houses_scores = analyze_transits_scores(natal, transit_positions, stationary=stationary)
 
-    # ------------------------------------------------------------------
-    # 5. Aspect Analysis
-    # ------------------------------------------------------------------
-    single_aspects = transit_aspect_analysis(transit_positions, natal_planets)
-    double_aspects = analyze_double_aspects_from_aspects(transit_positions, single_aspects)
+    if houses_scores is not None:
+        # Apply readable statuses once houses_scores dictionary is generated
+        for house_id in houses_scores:
+            score = houses_scores[house_id].get("total_score", 0)
+            houses_scores[house_id]["status"] = get_house_status(score)
 
     # ------------------------------------------------------------------
-    # 6. House Rulers Analysis
+    # 5. Derived Tables (only the requested ones are calculated)
     # ------------------------------------------------------------------
-    house_rulers = get_house_rulers(natal_planets, transit_positions)
+    derived_tables = {}
+    if sections & {"houses", "house_reasons"}:
+        derived_tables["houses"] = {
+            "scores": str_keys(houses_scores)  # Dict with houses and their calculated scores
+        }
+    if "house_rulers" in sections:
+        derived_tables["house_rulers"] = str_keys(get_house_rulers(natal, transit_positions))
+    if "aspects" in sections:
+        single_aspects = transit_aspect_analysis(transit_positions, natal)
+        double_aspects = analyze_double_aspects_from_aspects(transit_positions, single_aspects)
+        derived_tables["aspects"] = {
+            "single": single_aspects,
+            "double": str_keys(double_aspects)
+        }
+    if "planets_detailed" in sections:
+        derived_tables["planets_detailed"] = analyze_transit_planets_detailed(transit_positions)
+    if "special_conditions" in sections:
+        derived_tables["special_conditions"] = {
+            "sade_sati": check_sade_sati(transit_positions, natal)
+        }
+    if "periods" in sections:
+        # Vimshottari Dasha Periods
+        derived_tables["periods"] = {
+            "vimshottari": iso_dates(natal.dasha_states(jd_transit))
+        }
 
     # ------------------------------------------------------------------
-    # 7. Detailed Planet and House Insights
+    # 6. Final Payload Construction
     # ------------------------------------------------------------------
-    planets_detailed = analyze_transit_planets_detailed(transit_positions)
+    payload = {"meta": build_meta(date_str)}
+    if "natal_chart" in sections:
+        payload["natal_chart"] = build_natal_block(chart_data)
+    if "transits" in sections:
+        payload["transits"] = {"positions": transit_positions}
+        if stationary is not None:
+            payload["transits"]["stationary"] = sorted(stationary)
+    payload["derived_tables"] = derived_tables
+    if "raw_logs" in sections:
+        payload["raw_logs"] = {"engine_report": raw_report}
 
-    # ------------------------------------------------------------------
-    # 8. Sade Sati Calculation
-    # ------------------------------------------------------------------
-    sade_sati_data = check_sade_sati(transit_positions, natal_planets)
+    return payload
 
-    # ------------------------------------------------------------------
-    # 9. Vimshottari Dasha Periods
-    # ------------------------------------------------------------------
-    dashas = None
-    moon_data = natal_planets.get("Луна")
-    if jd_birth and moon_data:
-        dashas = get_vimshottari_dasha_states(jd_transit, jd_birth, moon_data)
 
-    # ------------------------------------------------------------------
-    # 10. Final Payload Construction
-    # ------------------------------------------------------------------
-    payload = {
-        "meta": {
-            "engine": "AstroMind",
-            "engine_version": "2.0.0",
-            "calculation_timestamp": datetime.utcnow().isoformat(),
-            "transit_date": date_str,
-            "sidereal_ayanamsa": "Lahiri"
-        },
-        "natal_chart": {
-            "lagna": lagna_deg,
-            "planets": natal_planets,
-            "coordinates": {"latitude": lat, "longitude": lon},
-            "julian_day": jd_birth
-        },
-        "transits": {
-            "positions": transit_positions
-        },
+def build_scores_only_payload(natal, transit_positions: dict, date_str: str, stationary=None) -> dict:
+    """
+    Lean payload with numeric house scores only (no reasons, report or echoed chart).
+    """
+    houses_scores = analyze_transits_scores(natal, transit_positions, stationary=stationary)
+    for data in houses_scores.values():
+        data["status"] = get_house_status(data["total_score"])
+
+    meta = build_meta(date_str)
+    meta["scores_only"] = True
+
+    return {
+        "meta": meta,
         "derived_tables": {
             "houses": {
-                "scores": houses_scores  # Dict with houses and their calculated scores
-            },
-            "house_rulers": house_rulers,  # Dict with house ruling planets
-            "aspects": {
-                "single": single_aspects,
-                "double": double_aspects
-            },
-            "planets_detailed": planets_detailed,
-            "special_conditions": {
-                "sade_sati": sade_sati_data
-            },
-            "periods": {
-                "vimshottari": dashas
+                "scores": str_keys(houses_scores)
             }
-        },
-        "raw_logs": {
-            "engine_report": raw_report
         }
     }
 
-    return payload
\ No newline at end of file
+
+def iter_transit_batch_results(chart_data: dict, dates, include_report: bool = False, chart_hash: str = None):
+    """
+    Yields a compact analysis for each date of a batch or forecast.
+    `dates` may be any iterable (consumed lazily); ephemeris is calculated
+    in chunks of FORECAST_CHUNK_DAYS, so memory does not grow with the range.
+    Natal-invariant data comes from the cached NatalContext.
+    With include_report=True each result also carries the engine report text.
+    A known chart_hash (stored charts) skips hashing the chart.
+    """
+    natal = get_natal_context(chart_data, chart_hash)
+
+    for chunk in iter_chunks(dates, FORECAST_CHUNK_DAYS):
+        jds = [calculate_julian_day(datetime.strptime(d, "%Y-%m-%d"), 0.0) for d in chunk]
+
+        for date_str, day in zip(chunk, iter_daily_forecast(natal, jds, with_report=include_report)):
+            transit_positions = day["transit_positions"]
+
+            dasha = None
+            if natal.dasha_timeline is not None:
+                dasha = natal.dasha_timeline.active_planets(day["jd"])
+
+            result = {
+                "date": date_str,
+                "positions": transit_positions.to_dict(),
+                "houses": {
+                    str(house_id): {
+                        "total_score": data["total_score"],
+                        "status": get_house_status(data["total_score"])
+                    }
+                    for house_id, data in day["houses_analysis"].items()
+                },
+                "sade_sati": is_sade_sati_active(transit_positions, natal),
+                "dasha": dasha
+            }
+            if include_report:
+                result["report"] = day["report"]
+            yield result
+
+
+def get_transit_batch_results(chart_data: dict, dates: list, include_report: bool = False,
+                              chart_hash: str = None) -> list:
+    """
+    Results of iter_transit_batch_results for one chunk of dates: a single
+    executor job of a streamed response (arguments and results pickle, so it
+    also runs on process workers).
+    """
+    return list(iter_transit_batch_results(chart_data, dates, include_report, chart_hash))
+
+
+def prepare_natal_context(chart_data: dict, chart_hash: str = None) -> str:
+    """
+    Builds (or reuses) the chart's NatalContext in the calling worker, so an
+    invalid chart fails before a stream starts. Returns the chart hash for the
+    stream's jobs, which then skip hashing the chart.
+    """
+    return get_natal_context(chart_data, chart_hash).chart_hash
+
+
+async def iter_transit_batch_results_async(run, chart_data: dict, dates, include_report: bool = False,
+                                           chart_hash: str = None):
+    """
+    Streamed counterpart of iter_transit_batch_results: every FORECAST_CHUNK_DAYS
+    dates are one job of `run` (AnalysisExecutor.run or ExecutorLease.run), so the
+    event loop only serializes results.
+    """
+    for chunk in iter_chunks(dates, FORECAST_CHUNK_DAYS):
+        for result in await run(get_transit_batch_results, chart_data, chunk, include_report, chart_hash):
+            yield result
+
+
+def get_transit_batch_payload(chart_data: dict, dates: list, include_natal: bool = True, codes: bool = False,
+                              chart_hash: str = None) -> dict:
+    """
+    Transit analysis of one natal chart for many dates.
+    The natal chart is echoed once (unless include_natal=False); per-date results are compact.
+    With codes=True results use the compact numeric schema (app.codes).
+    """
+    meta = build_meta(dates[0] if dates else None)
+    meta["dates_count"] = len(dates)
+    if codes:
+        meta["codes"] = CODES_VERSION
+
+    payload = {"meta": meta}
+    if include_natal:
+        payload["natal_chart"] = build_natal_block(chart_data)
+    results = iter_transit_batch_results(chart_data, dates, chart_hash=chart_hash)
+    payload["results"] = [encode_batch_result(result) for result in results] if codes else list(results)
+    return payload
+
+
+async def iter_transit_batch_json(run, chart_data: dict, dates: list, include_natal: bool = True,
+                                  codes: bool = False, chart_hash: str = None):
+    """
+    Streams the batch payload as a JSON document, one result at a time; results
+    are computed by `run` jobs (see iter_transit_batch_results_async).
+    With codes=True results use the compact numeric schema (app.codes).
+    """
+    meta = build_meta(dates[0] if dates else None)
+    meta["dates_count"] = len(dates)
+    if codes:
+        meta["codes"] = CODES_VERSION
+
+    natal_block = ""
+    if include_natal:
+        natal_block = ',"natal_chart":' + dumps(build_natal_block(chart_data))
+    yield '{"meta":' + dumps(meta) + natal_block + ',"results":['
+    separator = ""
+    async for result in iter_transit_batch_results_async(run, chart_data, dates, chart_hash=chart_hash):
+        yield separator + dumps(encode_batch_result(result) if codes else result)
+        separator = ","
+    yield "]}"
+
+
+async def iter_forecast_ndjson(run, chart_data: dict, dates, include_report: bool = False, chart_hash: str = None):
+    """
+    Forecast as NDJSON: one JSON object per line, one line per day.
+    Results are computed by `run` jobs (see iter_transit_batch_results_async).
+    """
+    async for result in iter_transit_batch_results_async(run, chart_data, dates, include_report, chart_hash):
+        yield dumps(result) + "\n"
+
+
+async def iter_forecast_sse(run, chart_data: dict, dates, include_report: bool = False, chart_hash: str = None):
+    """
+    Forecast as Server-Sent Events: a `day` event per date (id = date),
+    then an `end` event with the number of days sent.
+    Results are computed by `run` jobs (see iter_transit_batch_results_async).
+    """
+    count = 0
+    async for result in iter_transit_batch_results_async(run, chart_data, dates, include_report, chart_hash):
+        count += 1
+        yield f"event: day\nid: {result['date']}\ndata: {dumps(result)}\n\n"
+    yield f"event: end\ndata: {dumps({'days': count})}\n\n"
+
+
+def get_events_payload(start_date: str, end_date: str, planets=None, event_types=("sign", "nakshatra", "pada"),
+                       chart_data: dict = None) -> dict:
+    """
+    Exact sign / nakshatra / pada / house change instants between the start of
+    start_date and the end of end_date (UTC).
+    """
+    start_jd = calculate_julian_day(datetime.strptime(start_date, "%Y-%m-%d"), 0.0)
+    end_jd = calculate_julian_day(datetime.strptime(end_date, "%Y-%m-%d"), 0.0) + 1
+    lagna = chart_data.get("lagna") if chart_data else None
+
+    events = find_events(start_jd, end_jd, planets, event_types, lagna)
+
+    meta = build_meta(start_date)
+    meta.update({"end_date": end_date, "events_count": len(events)})
+    return {"meta": meta, "events": events}
+
+
+def get_stations_payload(start_date: str, end_date: str, planets=None) -> dict:
+    """
+    Station-retrograde and station-direct instants between the start of
+    start_date and the end of end_date (UTC).
+    """
+    start_jd = calculate_julian_day(datetime.strptime(start_date, "%Y-%m-%d"), 0.0)
+    end_jd = calculate_julian_day(datetime.strptime(end_date, "%Y-%m-%d"), 0.0) + 1
+
+    stations = find_stations(start_jd, end_jd, planets)
+
+    meta = build_meta(start_date)
+    meta.update({"end_date": end_date, "stations_count": len(stations)})
+    return {"meta": meta, "stations": stations}
@@ -3,37 +3,25 @@ from datetime import datetime
 from core_files.location_lookup import get_location_data
 from core_files.russian_cities import get_city_info
 from core_files.birth_chart_storage import save_birth_chart, list_birth_charts
-from core_files.astro_report import get_planet_positions_and_houses  # Lagna is calculated internally
+from core_files.chart_builder import build_birth_chart, local_utc_offset, julian_day_utc
 from core_files.lunar_module import nakshatra_lords
-from core_files.jaimini import get_karakas_by_longitudes
 from core_files.constants import HOUSE_MEANINGS
 from core_files.transit_analys import analyze_transits_full, analyze_double_aspects_from_aspects, get_aspected_houses, \
     transit_aspect_analysis, get_house_rulers, evaluate_house_ruler, check_sade_sati
 from core_files.vimshottari import print_vimshottari_main_periods, print_vimshottari_with_antara_and_pratyantara, \
     get_vimshottari_dasha_states, print_dashas
 from core_files.constants import ZODIAC_SIGNS, nakshatra_name, NAKSHATRA_LENGTH
-from core_files.arudha import calculate_arudha_table, get_nakshatra_and_pada_by_degree
+from core_files.arudha import get_nakshatra_and_pada_by_degree
 from core_files.transit_analys import calculate_transit_positions
+from core_files.forecast import iter_daily_forecast, iter_julian_days
+from core_files.natal_context import NatalContext
 from core_files.transit_analys import analyze_transit_planets_detailed, format_transit_planets_detailed  # Import required
 from core_files.vimshottari import print_vimshottari_with_antara
+from core_files.swiss_ephemeris import calc_ut
+from core_files.degrees import degree_str_to_float  # noqa: F401
 
 # --- Local utility functions ---
 
-def degree_str_to_float(degree_str: str) -> float:
-    """Parses a degree string (e.g., 10°20'30'') into a decimal float."""
-    try:
-        parts = degree_str.replace("''", "").split("°")
-        deg = float(parts[0])
-        min_sec = parts[1]
-        minutes, seconds = min_sec.split("'")
-        minutes = float(minutes)
-        seconds = float(seconds)
-        return deg + minutes / 60 + seconds / 3600
-    except Exception as e:
-        print(f"Ошибка при парсинге градусов '{degree_str}': {e}")
-        return 0.0
-
-
 def calculate_julian_day(dt: datetime, utc_offset: float) -> float:
     """Calculates Julian Day from local datetime and UTC offset using Swiss Ephemeris."""
     import swisseph as swe
@@ -121,10 +109,8 @@ def create_birth_chart():
             print(f"Ошибка при определении местоположения: {e}")
             return None
 
-    # Timezone localization and automatic UTC offset detection
-    tz = pytz.timezone(tz_name)
-    dt_localized = tz.localize(dt)
-    auto_utc_offset = dt_localized.utcoffset().total_seconds() / 3600
+    # Automatic UTC offset detection (timezone offset at the birth moment)
+    auto_utc_offset = local_utc_offset(tz_name, dt)
 
     print(f"\nГород: {city.title()}")
     print(f"Широта: {lat}")
@@ -137,19 +123,12 @@ def create_birth_chart():
     user_utc_offset = float(user_input) if user_input else auto_utc_offset
     print(f"Используемое UTC-смещение: UTC{user_utc_offset:+.0f}")
 
-    jd = calculate_julian_day(dt, user_utc_offset)
-
-    # Calculate planetary positions and houses
-    planet_data, lagna_degree = get_planet_positions_and_houses(jd, lat, lon)
-
-    # Convert degrees for Jaimini Karaka calculations
-    planet_longitudes = {
-        name: degree_str_to_float(data['degree']) for name, data in planet_data.items()
-        if name not in ["Раху", "Кету", "Лагна"]
-    }
-
-    karakas = get_karakas_by_longitudes(planet_longitudes)
-    sign = get_zodiac_sign(lagna_degree)
+    # Planets and houses, karakas, arudha padas: the same calculation as the bulk import
+    chart = build_birth_chart(name, dt, city, lat, lon, tz_name, user_utc_offset)
+    planet_data = chart["planets"]
+    karakas = chart["karakas"]
+    sign = chart["sign"]
+    jd = julian_day_utc(dt, user_utc_offset)
 
     # Display Natal Chart basic info
     print("\n=== НАТАЛЬНАЯ КАРТА ===")
@@ -162,7 +141,7 @@ def create_birth_chart():
 
     print("\n=== РЕЗУЛЬТАТ ===")
     print(f"Юлианская дата (UTC): {jd:.5f}")
-    print(f"Сидерическая лагна: {lagna_degree:.2f}° ({sign})")
+    print(f"Сидерическая лагна: {chart['lagna']:.2f}° ({sign})")
     print("\n=== ПЛАНЕТЫ И ДОМА ===")
     header = f"{'Планета':12} | {'Карака':6} | {'Градусы':12} | {'Знак':8} | {'Дом':5} | {'Накшатра (Пада)':20} | {'Управитель накшатры'}"
     print(header)
@@ -186,10 +165,7 @@ def create_birth_chart():
     print(f"{'Дом':3} | {'Метка':4} | {'Знак Арудхи':12} | {'Градусы':8} | {'Накшатра (Пада)':20}")
     print("-" * 60)
 
-    lagna_sign_index = ZODIAC_SIGNS.index(sign)
-    arudha_data = calculate_arudha_table(planet_data, lagna_sign_index)
-
-    for entry in arudha_data:
+    for entry in chart["arudhas"]:
         arudha_sign = entry['Знак Арудхи']
         sign_index = ZODIAC_SIGNS.index(arudha_sign)
         sign_start_deg = sign_index * 30.0
@@ -198,30 +174,12 @@ def create_birth_chart():
 
         print(f"{entry['Дом']:>3} | {entry['Метка']:4} | {arudha_sign:12} | {sign_start_deg:>8.2f}° | {nak} ({pada})")
 
-    # Add longitude field for the Moon for Vimshottari Dasha calculations
-    planet_data["Луна"]["longitude"] = degree_str_to_float(planet_data["Луна"]["degree"])
-
     print_vimshottari_main_periods(jd, planet_data["Луна"])
     print_vimshottari_with_antara(jd, planet_data["Луна"])
     print_vimshottari_with_antara_and_pratyantara(jd, planet_data["Луна"])
 
-
-    # Construct and save the final chart dictionary
-    chart_data = {
-        "name": name,
-        "date": dt.strftime("%Y-%m-%d"),
-        "time": dt.strftime("%H:%M"),
-        "city": city.title(),
-        "latitude": lat,
-        "longitude": lon,
-        "timezone": tz_name,
-        "utc_offset": user_utc_offset,
-        "julian_day": round(jd, 5),
-        "lagna": round(lagna_degree, 2),
-        "sign": sign,
-        "planets": planet_data
-    }
-
+    # Save the chart in the birth_charts.json format (derived tables are recalculated on demand)
+    chart_data = {key: value for key, value in chart.items() if key not in ("karakas", "arudhas", "vimshottari")}
     save_birth_chart(chart_data)
     print(f"\nКарта сохранена для {name}.")
 
@@ -232,7 +190,7 @@ def calculate_moon_data(jd_birth, lat, lon):
     import swisseph as swe
 
     # Calculate Moon position in degrees
-    moon_pos, ret = swe.calc_ut(jd_birth, swe.MOON)[:2]
+    moon_pos, ret = calc_ut(jd_birth, swe.MOON)[:2]
     # Calculate Nakshatra and Pada (moon_pos is 0-360)
     nakshatra, pada = get_nakshatra_and_pada_by_degree(moon_pos)
 
@@ -416,10 +374,8 @@ def run_monthly_transit_analysis():
     choice = int(input("> "))
     selected_chart = charts[choice - 1]
 
-    natal_positions = selected_chart.get("planets")
-    natal_lagna_degree = selected_chart.get("lagna")
-    lat = selected_chart.get("latitude")
-    lon = selected_chart.get("longitude")
+    natal = NatalContext(selected_chart)
+    natal_positions = natal.planets
 
     year = input_int("Введите год для анализа (например, 2025): ", 1900, 2100)
     month = input_int("Введите месяц для анализа (1-12): ", 1, 12)
@@ -427,18 +383,20 @@ def run_monthly_transit_analysis():
     from calendar import monthrange
     days_in_month = monthrange(year, month)[1]
 
-    daily_reports = []
+    # Only running totals, key dates and the last day are kept (days are streamed one at a time)
     houses_scores = {h: 0 for h in range(1, 13)}
     houses_counts = {h: 0 for h in range(1, 13)}
+    high_influence_days = []
+    last_day_report = None
 
     print(f"\nЗапускаем анализ транзитов с {year}-{month:02d}-01 по {year}-{month:02d}-{days_in_month}")
 
-    # Loop through each day of the selected month
-    for day in range(1, days_in_month + 1):
-        transit_date = datetime(year, month, day)
-        jd_transit = calculate_julian_day(transit_date, 0.0)
-        transit_positions = calculate_transit_positions(jd_transit, natal_lagna_degree, lat, lon)
-        report, houses_analysis = analyze_transits_full(natal_positions, transit_positions)
+    first_jd = calculate_julian_day(datetime(year, month, 1), 0.0)
+    month_jds = iter_julian_days(first_jd, days_in_month)
+
+    # Per-day report text is not printed here, numeric scores are enough
+    for day, day_report in enumerate(iter_daily_forecast(natal, month_jds, with_report=False), 1):
+        houses_analysis = day_report["houses_analysis"]
 
         for house_num in range(1, 13):
             house_data = houses_analysis.get(house_num, {})
@@ -447,13 +405,11 @@ def run_monthly_transit_analysis():
             if score != 0:
                 houses_counts[house_num] += 1
 
-        daily_reports.append({
-            "date": transit_date.strftime("%Y-%m-%d"),
-            "report": report,
-            "houses_analysis": houses_analysis,
-            "transit_positions": transit_positions,
-            "jd_transit": jd_transit,
-        })
+        high_influence_houses = [h for h, data in houses_analysis.items() if data.get("total_score", 0) >= 2]
+        if high_influence_houses:
+            high_influence_days.append((datetime(year, month, day).strftime("%Y-%m-%d"), high_influence_houses))
+
+        last_day_report = day_report
 
     # Calculate average scores for the month
     average_scores = {}
@@ -488,19 +444,14 @@ def run_monthly_transit_analysis():
         print(f"{house_num:>3} | {theme:28} | {avg_score:12.2f} | {interp}")
 
     print("\n=== КЛЮЧЕВЫЕ ДАТЫ С ВЫСОКИМ ВЛИЯНИЕМ ===")
-    for day_report in daily_reports:
-        date = day_report["date"]
-        high_influence_houses = [h for h, data in day_report["houses_analysis"].items()
-                                 if data.get("total_score", 0) >= 2]
-        if high_influence_houses:
-            houses_str = ", ".join(str(h) for h in high_influence_houses)
-            print(f"{date}: Высокое влияние в домах {houses_str}")
+    for date, high_influence_houses in high_influence_days:
+        houses_str = ", ".join(str(h) for h in high_influence_houses)
+        print(f"{date}: Высокое влияние в домах {houses_str}")
 
     # --- Detailed analysis for the last day of the month ---
     print("\n=== ПОДРОБНЫЙ АНАЛИЗ ПОСЛЕДНЕГО ДНЯ МЕСЯЦА ===")
-    last_day_report = daily_reports[-1]
-    transit_positions = last_day_report["transit_positions"]
-    jd_transit = last_day_report["jd_transit"]
+    transit_positions = last_day_report["transit_positions"].to_dict()
+    jd_transit = last_day_report["jd"]
 
     # House Rulers
     house_rulers = get_house_rulers(natal_positions, transit_positions)
@@ -1,15 +1,5 @@
 from core_files.constants import SIGN_RULERS, ZODIAC_SIGNS, NAKSHATRA_LENGTH, NAKSHATRAS
-
-
-def degree_str_to_float(degree_str: str) -> float:
-    try:
-        parts = degree_str.replace("''", "").split("°")
-        deg = float(parts[0])
-        minutes, seconds = parts[1].split("'")
-        return deg + float(minutes) / 60 + float(seconds) / 3600
-    except Exception as e:
-        print(f"Ошибка при парсинге '{degree_str}': {e}")
-        return 0.0
+from core_files.degrees import position_longitude
 
 
 def get_nakshatra_and_pada_by_degree(degree: float):
@@ -27,13 +17,9 @@ def calculate_arudha_table(planet_data, lagna_sign_index):
     planet_degrees = {}
     planet_signs = {}
 
+    # Абсолютные сидерические долготы (0–360)
     for planet, data in planet_data.items():
-        deg_str = data.get("degree")
-        if isinstance(deg_str, str):
-            deg = degree_str_to_float(deg_str)
-        else:
-            deg = deg_str
-        planet_degrees[planet] = deg
+        planet_degrees[planet] = position_longitude(data)
         planet_signs[planet] = data.get("sign")
 
     for house in range(1, 13):
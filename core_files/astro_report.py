@@ -1,11 +1,9 @@
 import swisseph as swe
-from math import floor
 from core_files.lunar_module import nakshatra_lords, get_nakshatra_lord
 from core_files.constants import ZODIAC_SIGNS, nakshatra_name
-
-# Устанавливаем сидерическую систему Лахири
-swe.set_sid_mode(swe.SIDM_LAHIRI)
-swe.set_ephe_path(".")
+from core_files.degrees import format_dms
+# Сидерическая система Лахири и путь к эфемеридам задаются в swiss_ephemeris (один раз на поток)
+from core_files.swiss_ephemeris import calc_ut, get_ayanamsa_ut, houses_ex
 
 
 def get_nakshatra_and_pada(degree):
@@ -14,23 +12,6 @@ def get_nakshatra_and_pada(degree):
     return nakshatra_name[nakshatra_index], pada
 
 
-def deg_to_dms(deg_float):
-    deg = floor(deg_float)
-    minutes_float = (deg_float - deg) * 60
-    minutes = floor(minutes_float)
-    seconds = round((minutes_float - minutes) * 60)
-    return deg, minutes, seconds
-
-
-def deg_to_dms_within_house(planet_deg, house_start_deg):
-    relative_deg = (planet_deg - house_start_deg) % 30
-    deg = floor(relative_deg)
-    minutes_float = (relative_deg - deg) * 60
-    minutes = floor(minutes_float)
-    seconds = round((minutes_float - minutes) * 60)
-    return deg, minutes, seconds
-
-
 def get_zodiac_sign(degree):
     sign_index = int(degree // 30) % 12
     return ZODIAC_SIGNS[sign_index]
@@ -44,9 +25,9 @@ def get_house_whole_sign(planet_degree, ascendant_degree):
 
 
 def calculate_lagna_sidereal(jd_ut, latitude, longitude):
-    house_cusps, ascmc = swe.houses_ex(jd_ut, latitude, longitude, b'P')
+    house_cusps, ascmc = houses_ex(jd_ut, latitude, longitude, b'P')
     asc_tropical = ascmc[0]
-    ayanamsa = swe.get_ayanamsa_ut(jd_ut)
+    ayanamsa = get_ayanamsa_ut(jd_ut)
     asc_sidereal = asc_tropical - ayanamsa
     if asc_sidereal < 0:
         asc_sidereal += 360
@@ -54,11 +35,8 @@ def calculate_lagna_sidereal(jd_ut, latitude, longitude):
 
 
 def get_planet_positions_and_houses(jd_ut, latitude, longitude):
-    swe.set_sid_mode(swe.SIDM_LAHIRI)
-    swe.set_ephe_path('.')  # путь к эфемеридам
-
     lagna, _ = calculate_lagna_sidereal(jd_ut, latitude, longitude)
-    ayanamsa = swe.get_ayanamsa_ut(jd_ut)
+    ayanamsa = get_ayanamsa_ut(jd_ut)
 
     planets = {
         "Лагна": None,
@@ -76,14 +54,14 @@ def get_planet_positions_and_houses(jd_ut, latitude, longitude):
     results = {}
 
     # Обработка Лагны (Асцендента)
-    house_start = (int(lagna // 30)) * 30
-    deg, minute, sec = deg_to_dms_within_house(lagna, house_start)
     sign = get_zodiac_sign(lagna)
     nakshatra, pada = get_nakshatra_and_pada(lagna)
     lord = nakshatra_lords.get(nakshatra, "Неизвестен")
 
+    # Расчёты используют sidereal_longitude (0–360) и speed; строка degree — только для отображения
     results["Лагна"] = {
-        "degree": f"{deg}°{minute}'{sec}''",
+        "degree": format_dms(lagna),
+        "sidereal_longitude": round(lagna, 6),
         "sign": sign,
         "house": 1,
         "nakshatra": nakshatra,
@@ -98,13 +76,13 @@ def get_planet_positions_and_houses(jd_ut, latitude, longitude):
             continue
 
         if planet_id >= 0:
-            data, flag = swe.calc_ut(jd_ut, planet_id)
+            data, flag = calc_ut(jd_ut, planet_id)
             lon = data[0]
             speed = data[3]  # скорость по долготе
             is_retrograde = speed < 0
         else:
             # Для Кету берём противоположный узел
-            data, flag = swe.calc_ut(jd_ut, swe.MEAN_NODE)
+            data, flag = calc_ut(jd_ut, swe.MEAN_NODE)
             lon = (data[0] + 180) % 360
             speed = data[3]
             is_retrograde = speed < 0
@@ -114,8 +92,6 @@ def get_planet_positions_and_houses(jd_ut, latitude, longitude):
             sid_lon += 360
 
         house = get_house_whole_sign(sid_lon, lagna)
-        house_start = ((int(lagna // 30) + house - 1) % 12) * 30
-        deg, minute, sec = deg_to_dms_within_house(sid_lon, house_start)
         sign = get_zodiac_sign(sid_lon)
         nakshatra, pada = get_nakshatra_and_pada(sid_lon)
         lord = nakshatra_lords.get(nakshatra, "Неизвестен")
@@ -123,7 +99,9 @@ def get_planet_positions_and_houses(jd_ut, latitude, longitude):
         display_name = name + (" R" if is_retrograde else "")
 
         results[name] = {
-            "degree": f"{deg}°{minute}'{sec}''",
+            "degree": format_dms(sid_lon),
+            "sidereal_longitude": round(sid_lon, 6),
+            "speed": round(speed, 6),
             "sign": sign,
             "house": house,
             "nakshatra": nakshatra,
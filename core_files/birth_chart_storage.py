@@ -1,34 +1,21 @@
-import json
-import os
 from pathlib import Path
 
+from core_files.chart_store import get_chart_store
+
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Старый JSON-файл: импортируется командой `python -m core_files.chart_store migrate`
 DB_PATH = BASE_DIR / "birth_charts.json"
 
 
 
 
 def save_birth_chart(data: dict):
-    if os.path.exists(DB_PATH):
-        with open(DB_PATH, "r", encoding="utf-8") as f:
-            charts = json.load(f)
-    else:
-        charts = []
-
-    charts.append(data)
-
-    with open(DB_PATH, "w", encoding="utf-8") as f:
-        json.dump(charts, f, ensure_ascii=False, indent=4)
+    return get_chart_store().add(data)
 
 
 
 def list_birth_charts():
-    if not os.path.exists(DB_PATH):
-        print("База натальных карт пуста.")
-        return []
-
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        charts = json.load(f)
+    charts = get_chart_store().list_charts()
 
     if not charts:
         print("База натальных карт пуста.")
@@ -40,14 +27,7 @@ def list_birth_charts():
     return charts
 
 def find_birth_chart_by_name(name: str):
-    if not os.path.exists(DB_PATH):
-        print("База пуста.")
-        return
-
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        charts = json.load(f)
-
-    found = [c for c in charts if c["name"].lower() == name.lower()]
+    found = get_chart_store().find_by_name(name)
     if not found:
         print(f"Карта с именем '{name}' не найдена.")
     else:
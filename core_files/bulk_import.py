@@ -0,0 +1,213 @@
+"""
+Bulk natal chart computation: CSV / JSONL birth records -> JSONL charts.
+
+    python -m core_files.bulk_import births.csv --out charts.jsonl --workers 8
+
+Input fields: name, date (YYYY-MM-DD), time (HH:MM), city and optionally id,
+latitude, longitude, timezone, utc_offset. Records without coordinates are
+resolved with get_city_info and then the geocoder, once per city, in the parent
+process. Charts are built in a process pool in chunks and appended to the
+output as each chunk completes, one JSON object per line with its "id".
+
+Resumable: ids already present in the output are skipped on the next run, so
+an interrupted import continues where it stopped. Failed records go to the
+errors file (<out>.errors.jsonl, rewritten by each run, so it lists only the
+failures of the last run) and are retried on the next run.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+
+from core_files.chart_builder import build_birth_chart, resolve_location
+from core_files.forecast import iter_chunks
+from core_files.location_lookup import get_location_data
+
+INPUT_FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 200
+
+
+def iter_birth_records(path, input_format: str = None):
+    """
+    Lazily reads birth records from a CSV (with header) or JSONL file.
+    Records without an "id" get their 1-based position in the file.
+    """
+    path = Path(path)
+    input_format = input_format or path.suffix.lstrip(".").lower()
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format '{input_format}', expected one of {INPUT_FORMATS}")
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if input_format == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for position, row in enumerate(rows, 1):
+            record = {key: value for key, value in row.items() if value not in (None, "")}
+            record["id"] = str(record.get("id", position))
+            yield record
+
+
+def completed_ids(out_path) -> set:
+    """
+    Ids already written to the output. A partially written last line
+    (interrupted run) is cut off so that new lines are appended cleanly.
+    """
+    out_path = Path(out_path)
+    if not out_path.exists():
+        return set()
+
+    with open(out_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+
+    return {json.loads(line)["id"] for line in data.decode("utf-8").splitlines() if line.strip()}
+
+
+def parse_birth_datetime(record: dict) -> datetime:
+    return datetime.strptime(f"{record['date']} {record['time']}", "%Y-%m-%d %H:%M")
+
+
+class LocationResolver:
+    """Resolves record locations once per city for the whole run."""
+
+    def __init__(self, geocoder=get_location_data):
+        self.geocoder = geocoder
+        self._cache = {}
+
+    def resolve(self, record: dict) -> dict:
+        """Adds latitude, longitude and timezone to the record (explicit values are kept)."""
+        if all(key in record for key in ("latitude", "longitude", "timezone")):
+            return record
+
+        city = record["city"].strip().lower()
+        if city not in self._cache:
+            try:
+                self._cache[city] = resolve_location(city, parse_birth_datetime(record), self.geocoder)
+            except Exception as e:
+                self._cache[city] = e
+        location = self._cache[city]
+        if isinstance(location, Exception):
+            raise ValueError(f"Location not found for '{record['city']}': {location}")
+
+        return {**location, **record}
+
+
+def build_chart_record(record: dict) -> dict:
+    """Chart for one resolved record: {"id", ...chart} or {"id", "error"}."""
+    try:
+        chart = build_birth_chart(
+            record["name"],
+            parse_birth_datetime(record),
+            record["city"],
+            float(record["latitude"]),
+            float(record["longitude"]),
+            record["timezone"],
+            float(record["utc_offset"]) if "utc_offset" in record else None,
+        )
+        return {"id": record["id"], **chart}
+    except Exception as e:
+        return {"id": record["id"], "error": f"{type(e).__name__}: {e}"}
+
+
+def build_chart_chunk(records: list) -> list:
+    """Process-pool task: charts for a chunk of records."""
+    return [build_chart_record(record) for record in records]
+
+
+def run_bulk_import(input_path, out_path, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    input_format: str = None, geocoder=get_location_data, progress=print) -> dict:
+    """
+    Builds charts for all records not yet in out_path. workers=0 runs in the
+    calling process. Returns run statistics with the throughput in charts/s.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    errors_path = Path(f"{out_path}.errors.jsonl")
+    done = completed_ids(out_path)
+    resolver = LocationResolver(geocoder)
+    stats = {"skipped": 0, "written": 0, "errors": 0}
+
+    def pending_chunks():
+        """Chunks of resolved records; location failures are reported immediately."""
+        for chunk in iter_chunks(iter_birth_records(input_path, input_format), chunk_size):
+            ready = []
+            for record in chunk:
+                if record["id"] in done:
+                    stats["skipped"] += 1
+                    continue
+                try:
+                    ready.append(resolver.resolve(record))
+                except Exception as e:
+                    write_results([{"id": record["id"], "error": str(e)}])
+            if ready:
+                yield ready
+
+    started = time.perf_counter()
+
+    # Failed ids are retried on every run: the errors file describes the last run only
+    with open(out_path, "a", encoding="utf-8") as out, open(errors_path, "w", encoding="utf-8") as errors:
+
+        def write_results(results):
+            for result in results:
+                target = errors if "error" in result else out
+                target.write(json.dumps(result, ensure_ascii=False) + "\n")
+                stats["errors" if "error" in result else "written"] += 1
+            out.flush()
+            errors.flush()
+
+            processed = stats["written"] + stats["errors"]
+            elapsed = time.perf_counter() - started
+            progress(f"{processed} обработано ({stats['written']} карт, {stats['errors']} ошибок), "
+                     f"{processed / elapsed if elapsed else 0:.1f} карт/с")
+
+        if workers == 0:
+            for chunk in pending_chunks():
+                write_results(build_chart_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Не больше двух чанков на воркер в очереди: память не растёт с размером входа
+                in_flight = set()
+                for chunk in pending_chunks():
+                    if len(in_flight) >= workers * 2:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            write_results(future.result())
+                    in_flight.add(pool.submit(build_chart_chunk, chunk))
+                for future in in_flight:
+                    write_results(future.result())
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["charts_per_second"] = round(stats["written"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build natal charts in bulk from CSV or JSONL birth records.")
+    parser.add_argument("input", help="CSV (with header) or JSONL file with birth records")
+    parser.add_argument("--out", default="charts.jsonl", help="Output JSONL file (appended, resumable)")
+    parser.add_argument("--format", choices=INPUT_FORMATS, help="Input format (default: by file extension)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0 = inline)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per worker task")
+    args = parser.parse_args(argv)
+
+    stats = run_bulk_import(
+        args.input, args.out, workers=args.workers, chunk_size=args.chunk_size,
+        input_format=args.format, progress=lambda line: print(line, file=sys.stderr)
+    )
+    print(f"Готово: {stats['written']} карт, {stats['errors']} ошибок, {stats['skipped']} пропущено "
+          f"за {stats['seconds']} с ({stats['charts_per_second']} карт/с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Non-interactive natal chart construction.
+
+Planets and houses, Jaimini karakas, arudha padas and Vimshottari roots without
+prompts or printing, so charts can be built in bulk and in worker processes.
+core.create_birth_chart uses the same builder and only adds the prompts and
+the printed tables.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytz
+import swisseph as swe
+
+from core_files.arudha import calculate_arudha_table
+from core_files.astro_report import get_planet_positions_and_houses
+from core_files.constants import ZODIAC_SIGNS
+from core_files.jaimini import get_karakas_by_longitudes
+from core_files.location_lookup import get_location_data
+from core_files.russian_cities import get_city_info
+from core_files.vimshottari import calculate_vimshottari_dasha_full
+
+
+def resolve_location(city: str, dt: datetime, geocoder=get_location_data) -> dict:
+    """
+    Coordinates and timezone of a city: the local directory first, then the geocoder
+    (get_location_data by default). Raises ValueError when the city is not found.
+    """
+    city_info = get_city_info(city)
+    if city_info:
+        return {
+            "latitude": city_info["latitude"],
+            "longitude": city_info["longitude"],
+            "timezone": city_info["timezone"],
+        }
+
+    loc_data = geocoder(city, dt)
+    return {
+        "latitude": loc_data["latitude"],
+        "longitude": loc_data["longitude"],
+        "timezone": loc_data["timezone"],
+    }
+
+
+def local_utc_offset(tz_name: str, dt: datetime) -> float:
+    """UTC offset in hours of a local birth time in the given timezone (DST aware)."""
+    return pytz.timezone(tz_name).localize(dt).utcoffset().total_seconds() / 3600
+
+
+def julian_day_utc(dt: datetime, utc_offset: float) -> float:
+    """Julian Day (UT) of a local datetime with a fixed UTC offset (same as core.calculate_julian_day)."""
+    dt_utc = dt.replace(tzinfo=timezone(timedelta(hours=utc_offset))).astimezone(pytz.utc)
+    hour = dt_utc.hour + dt_utc.minute / 60 + dt_utc.second / 3600
+    return swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, hour)
+
+
+def build_birth_chart(name: str, dt: datetime, city: str, latitude: float, longitude: float,
+                      tz_name: str, utc_offset: float = None) -> dict:
+    """
+    Natal chart in the birth_charts.json format plus "karakas", "arudhas" and
+    "vimshottari" (Mahadasha roots with ISO dates). utc_offset defaults to the
+    timezone offset at the birth moment.
+    """
+    if utc_offset is None:
+        utc_offset = local_utc_offset(tz_name, dt)
+
+    jd = julian_day_utc(dt, utc_offset)
+    planet_data, lagna_degree = get_planet_positions_and_houses(jd, latitude, longitude)
+
+    planet_longitudes = {
+        planet: data["sidereal_longitude"] for planet, data in planet_data.items()
+        if planet not in ["Раху", "Кету", "Лагна"]
+    }
+    karakas = get_karakas_by_longitudes(planet_longitudes)
+
+    sign = ZODIAC_SIGNS[int(lagna_degree // 30)]
+    arudhas = calculate_arudha_table(planet_data, ZODIAC_SIGNS.index(sign))
+
+    vimshottari = [
+        {
+            "planet": maha["planet"],
+            "start_jd": maha["start_jd"],
+            "end_jd": maha["end_jd"],
+            "start_date": maha["start_date"].isoformat(),
+            "end_date": maha["end_date"].isoformat(),
+        }
+        for maha in calculate_vimshottari_dasha_full(jd, planet_data["Луна"])
+    ]
+
+    return {
+        "name": name,
+        "date": dt.strftime("%Y-%m-%d"),
+        "time": dt.strftime("%H:%M"),
+        "city": city.title(),
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": tz_name,
+        "utc_offset": utc_offset,
+        "julian_day": round(jd, 5),
+        "lagna": round(lagna_degree, 2),
+        "sign": sign,
+        "planets": planet_data,
+        "karakas": karakas,
+        "arudhas": arudhas,
+        "vimshottari": vimshottari,
+    }
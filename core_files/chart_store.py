@@ -0,0 +1,262 @@
+"""
+Indexed natal chart store (SQLite) replacing the whole-file JSON rewrites of
+birth_chart_storage and natal_db.
+
+Every chart is one row: the JSON document plus indexed columns for the id, the
+case-insensitive name and the content hash. A save is a single INSERT
+(atomic, O(log N)), lookups by id, name or hash use B-tree indexes, and WAL mode
+lets readers run concurrently with the writer from any thread or process.
+
+Legacy files are imported with:
+
+    python -m core_files.chart_store migrate --charts birth_charts.json --natal-db natal_database.json
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from core_files.natal_context import chart_content_hash
+from core_files.sqlite_db import SQLiteDatabase
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_STORE_PATH = BASE_DIR / "charts.sqlite3"
+LEGACY_CHARTS_PATH = BASE_DIR / "birth_charts.json"
+# Старый natal_db хранил файл относительно рабочего каталога
+LEGACY_NATAL_DB_PATH = "natal_database.json"
+
+# Коллекции: карты core.create_birth_chart, записи старого natal_db и карты, зарегистрированные через API
+BIRTH_CHARTS = "birth_charts"
+NATAL_DATABASE = "natal_database"
+API_CHARTS = "api_charts"
+
+
+class ChartStore(SQLiteDatabase):
+    """
+    Charts in one SQLite file. Connections are per thread; writes are single
+    statements in their own transaction, so a crash never leaves a partial chart.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS charts ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "collection TEXT NOT NULL, "
+        "name TEXT NOT NULL, "
+        "name_key TEXT NOT NULL, "
+        "chart_hash TEXT NOT NULL, "
+        "data TEXT NOT NULL, "
+        "created_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS charts_name ON charts (collection, name_key)",
+        "CREATE INDEX IF NOT EXISTS charts_hash ON charts (chart_hash)",
+        # Коллекции, для которых уже выполнялся автоимпорт старых JSON-файлов
+        "CREATE TABLE IF NOT EXISTS migrations (collection TEXT PRIMARY KEY, migrated_at REAL NOT NULL)",
+    )
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        super().__init__(path)
+
+    def add(self, chart: dict, name: str = None, collection: str = BIRTH_CHARTS) -> int:
+        """Saves a chart and returns its id. The name defaults to chart["name"]."""
+        name = name if name is not None else chart.get("name", "")
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO charts (collection, name, name_key, chart_hash, data, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (collection, name, name.lower(), chart_content_hash(chart),
+                 json.dumps(chart, ensure_ascii=False), time.time())
+            )
+        return cursor.lastrowid
+
+    def add_if_absent(self, chart: dict, name: str = None, collection: str = BIRTH_CHARTS) -> tuple:
+        """
+        Saves a chart unless the collection already holds one with the same content.
+        Returns (id, created). The check and the insert run in one write transaction.
+        """
+        chart_hash = chart_content_hash(chart)
+        return self._add_unless_exists(chart, name, collection, chart_hash, "chart_hash = ?", chart_hash)
+
+    def add_if_name_absent(self, chart: dict, name: str = None, collection: str = BIRTH_CHARTS) -> tuple:
+        """
+        Saves a chart unless the collection already holds one with this name (case-insensitive).
+        Returns (id, created). The check and the insert run in one write transaction.
+        """
+        name = name if name is not None else chart.get("name", "")
+        return self._add_unless_exists(chart, name, collection, chart_content_hash(chart), "name_key = ?",
+                                       name.lower())
+
+    def _add_unless_exists(self, chart: dict, name, collection: str, chart_hash: str, condition: str, value) -> tuple:
+        """
+        Inserts the chart unless a row of the collection matches `condition`.
+        BEGIN IMMEDIATE takes the write lock before the check, so concurrent
+        writers cannot both insert.
+        """
+        name = name if name is not None else chart.get("name", "")
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT id FROM charts WHERE {condition} AND collection = ? ORDER BY id LIMIT 1",
+                (value, collection)
+            ).fetchone()
+            if row is not None:
+                conn.rollback()
+                return row[0], False
+            cursor = conn.execute(
+                "INSERT INTO charts (collection, name, name_key, chart_hash, data, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (collection, name, name.lower(), chart_hash, json.dumps(chart, ensure_ascii=False), time.time())
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return cursor.lastrowid, True
+
+    def get(self, chart_id: int):
+        """Chart by id, or None."""
+        row = self._connection().execute("SELECT data FROM charts WHERE id = ?", (chart_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_json_by_hash(self, chart_hash: str, collection: str = BIRTH_CHARTS):
+        """
+        JSON document of the first chart with this content hash, or None. Returned
+        unparsed for callers that cache it and hand out fresh copies.
+        """
+        row = self._connection().execute(
+            "SELECT data FROM charts WHERE chart_hash = ? AND collection = ? ORDER BY id LIMIT 1",
+            (chart_hash, collection)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_id_by_hash(self, chart_hash: str, collection: str = BIRTH_CHARTS):
+        """Id of the first chart with this content hash (chart_content_hash), or None."""
+        row = self._connection().execute(
+            "SELECT id FROM charts WHERE chart_hash = ? AND collection = ? ORDER BY id LIMIT 1",
+            (chart_hash, collection)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_by_name(self, name: str, collection: str = BIRTH_CHARTS) -> list:
+        """Charts with this name (case-insensitive), oldest first."""
+        rows = self._connection().execute(
+            "SELECT data FROM charts WHERE collection = ? AND name_key = ? ORDER BY id",
+            (collection, name.lower())
+        ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def list_charts(self, collection: str = BIRTH_CHARTS, limit: int = None, offset: int = 0) -> list:
+        """Charts of a collection in insertion order."""
+        rows = self._connection().execute(
+            "SELECT data FROM charts WHERE collection = ? ORDER BY id LIMIT ? OFFSET ?",
+            (collection, -1 if limit is None else limit, offset)
+        ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def names(self, collection: str = BIRTH_CHARTS) -> list:
+        rows = self._connection().execute(
+            "SELECT name FROM charts WHERE collection = ? ORDER BY id", (collection,)
+        ).fetchall()
+        return [name for name, in rows]
+
+    def count(self, collection: str = BIRTH_CHARTS) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM charts WHERE collection = ?", (collection,)
+        ).fetchone()[0]
+
+    def delete(self, chart_id: int) -> bool:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM charts WHERE id = ?", (chart_id,))
+        return cursor.rowcount > 0
+
+    def is_migrated(self, collection: str) -> bool:
+        """Whether the legacy file of the collection was already imported (see get_chart_store)."""
+        row = self._connection().execute(
+            "SELECT 1 FROM migrations WHERE collection = ?", (collection,)
+        ).fetchone()
+        return row is not None
+
+    def mark_migrated(self, collection: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO migrations (collection, migrated_at) VALUES (?, ?)",
+                         (collection, time.time()))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_chart_store() -> ChartStore:
+    """
+    Process-wide store at CHART_STORE_PATH (default charts.sqlite3 in the project root).
+    On first use an empty collection imports its legacy file (birth_charts.json,
+    natal_database.json). The import is recorded in the store, so a collection
+    emptied later on does not bring the file back.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = ChartStore(os.getenv("CHART_STORE_PATH", str(DEFAULT_STORE_PATH)))
+            legacy_paths = {BIRTH_CHARTS: LEGACY_CHARTS_PATH, NATAL_DATABASE: LEGACY_NATAL_DB_PATH}
+            pending = [collection for collection in legacy_paths if not store.is_migrated(collection)]
+            if pending:
+                # Хранилища, заполненные до учёта миграций, только помечаются
+                paths = {collection: legacy_paths[collection] for collection in pending
+                         if store.count(collection) == 0}
+                migrate_json(store, charts_path=paths.get(BIRTH_CHARTS), natal_db_path=paths.get(NATAL_DATABASE))
+                for collection in pending:
+                    store.mark_migrated(collection)
+            _store = store
+        return _store
+
+
+def migrate_json(store: ChartStore, charts_path=None, natal_db_path=None) -> dict:
+    """
+    Imports birth_charts.json (list of charts) and natal_database.json
+    ({name: birth_info}). Charts already in the store (same collection and
+    content hash) are skipped, so the migration can be re-run safely.
+    """
+    imported = {BIRTH_CHARTS: 0, NATAL_DATABASE: 0, "skipped": 0}
+
+    def import_chart(chart, name, collection):
+        if store.find_id_by_hash(chart_content_hash(chart), collection) is not None:
+            imported["skipped"] += 1
+            return
+        store.add(chart, name=name, collection=collection)
+        imported[collection] += 1
+
+    if charts_path and os.path.exists(charts_path):
+        with open(charts_path, "r", encoding="utf-8") as f:
+            for chart in json.load(f):
+                import_chart(chart, chart.get("name", ""), BIRTH_CHARTS)
+
+    if natal_db_path and os.path.exists(natal_db_path):
+        with open(natal_db_path, "r", encoding="utf-8") as f:
+            for name, birth_info in json.load(f).items():
+                import_chart(birth_info, name, NATAL_DATABASE)
+
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Natal chart store maintenance.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser("migrate", help="Import legacy JSON chart files")
+    migrate.add_argument("--charts", default=str(LEGACY_CHARTS_PATH), help="birth_charts.json path")
+    migrate.add_argument("--natal-db", default=LEGACY_NATAL_DB_PATH, help="natal_database.json path")
+    migrate.add_argument("--store", default=os.getenv("CHART_STORE_PATH", str(DEFAULT_STORE_PATH)),
+                         help="SQLite store path")
+    args = parser.parse_args(argv)
+
+    store = ChartStore(args.store)
+    imported = migrate_json(store, args.charts, args.natal_db)
+    print(f"Импортировано: {imported[BIRTH_CHARTS]} карт, {imported[NATAL_DATABASE]} записей natal_db, "
+          f"пропущено {imported['skipped']} (уже в {args.store})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Compiled city index for offline birth place lookup.
+
+Every city name is reduced to one search key: lower case, hyphens as spaces,
+Cyrillic transliterated to Latin and common spelling variants folded
+(ё/е, й/ы/y/j/i, kh/h, ts/tz/c, doubled letters...), so "Йошкар-Ола",
+"йошкар ола" and "Yoshkar-Ola" share a key. The index stores the keys as a
+sorted array (exact lookup is a bisect) and a trigram -> keys posting list for
+misspellings, ranked by edit distance.
+
+The index is a compressed .npz (CITY_INDEX_PATH, default city_index.npz)
+loaded on first use. Without the file it is compiled in memory from the
+russian_cities directory. A large gazetteer (GeoNames cities*.txt dumps, or the
+CSV/JSON formats of location_lookup.load_gazetteer) is compiled with:
+
+    python -m core_files.city_index --gazetteer cities15000.txt --out city_index.npz
+"""
+import argparse
+import csv
+import os
+import re
+import threading
+from bisect import bisect_left
+from pathlib import Path
+
+import numpy as np
+
+from core_files.location_lookup import load_gazetteer
+from core_files.russian_cities import cities
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_INDEX_PATH = BASE_DIR / "city_index.npz"
+
+INDEX_FORMAT_VERSION = 1
+FUZZY_CANDIDATES = 16
+
+TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh",
+    "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}
+
+# Варианты латинской записи, сводимые к одному виду (порядок важен)
+LATIN_FOLDS = (
+    ("shch", "sh"), ("sch", "sh"), ("tch", "ch"), ("kh", "h"), ("tz", "c"), ("ts", "c"),
+    ("w", "v"), ("x", "ks"), ("q", "k"), ("j", "y"), ("iy", "y"), ("yy", "y"), ("y", "i"), ("ie", "e"),
+)
+
+_DOUBLE_LETTERS = re.compile(r"([a-z])\1+")
+_SEPARATORS = re.compile(r"[\s\-‐–—_.,'’`]+")
+
+
+def city_key(name: str) -> str:
+    """Search key of a city name (see module docstring)."""
+    text = _SEPARATORS.sub(" ", name.lower()).strip()
+    text = "".join(TRANSLIT.get(ch, ch) for ch in text)
+    for variant, folded in LATIN_FOLDS:
+        text = text.replace(variant, folded)
+    return _DOUBLE_LETTERS.sub(r"\1", text)
+
+
+def trigrams(key: str) -> set:
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance."""
+    previous = list(range(len(b) + 1))
+    for i, ch_a in enumerate(a, 1):
+        current = [i]
+        for j, ch_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ch_a != ch_b)))
+        previous = current
+    return previous[-1]
+
+
+def max_typos(key: str) -> int:
+    """
+    Edit distance still accepted as a misspelling of a key of this length.
+    Short names get none: "орск" is one edit away from "омск".
+    """
+    return len(key) // 5
+
+
+class CityIndex:
+    """Sorted search keys -> cities, plus a trigram posting list for fuzzy lookup."""
+
+    def __init__(self, arrays: dict):
+        self.names = arrays["names"].tolist()
+        self.latitude = arrays["latitude"].tolist()
+        self.longitude = arrays["longitude"].tolist()
+        self.timezones = arrays["timezones"].tolist()
+        self.tz_index = arrays["tz_index"].tolist()
+        self.keys = arrays["keys"].tolist()
+        self.key_city = arrays["key_city"].tolist()
+        self.trigrams = arrays["trigrams"].tolist()
+        self.trigram_offsets = arrays["trigram_offsets"]
+        self.postings = arrays["postings"]
+
+    @classmethod
+    def build(cls, entries) -> "CityIndex":
+        """
+        entries: iterable of (names, latitude, longitude, timezone) in priority
+        order; the first city claiming a search key keeps it.
+        """
+        names, latitude, longitude, tz_index, timezones = [], [], [], [], {}
+        key_city = {}
+        for city_names, lat, lon, tz_name in entries:
+            city = len(names)
+            names.append(city_names[0])
+            latitude.append(float(lat))
+            longitude.append(float(lon))
+            tz_index.append(timezones.setdefault(tz_name, len(timezones)))
+            for name in city_names:
+                key = city_key(name)
+                if key:
+                    key_city.setdefault(key, city)
+
+        keys = sorted(key_city)
+        postings_by_trigram = {}
+        for key_id, key in enumerate(keys):
+            for trigram in trigrams(key):
+                postings_by_trigram.setdefault(trigram, []).append(key_id)
+        sorted_trigrams = sorted(postings_by_trigram)
+        lengths = [len(postings_by_trigram[t]) for t in sorted_trigrams]
+
+        return cls({
+            "names": np.array(names, dtype=str),
+            "latitude": np.array(latitude, dtype=np.float64),
+            "longitude": np.array(longitude, dtype=np.float64),
+            "timezones": np.array(list(timezones), dtype=str),
+            "tz_index": np.array(tz_index, dtype=np.uint16),
+            "keys": np.array(keys, dtype=str),
+            "key_city": np.array([key_city[k] for k in keys], dtype=np.int32),
+            "trigrams": np.array(sorted_trigrams, dtype=str),
+            "trigram_offsets": np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))),
+            "postings": np.array([k for t in sorted_trigrams for k in postings_by_trigram[t]], dtype=np.int32),
+        })
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            version=np.array(INDEX_FORMAT_VERSION),
+            names=np.array(self.names, dtype=str),
+            latitude=np.array(self.latitude, dtype=np.float64),
+            longitude=np.array(self.longitude, dtype=np.float64),
+            timezones=np.array(self.timezones, dtype=str),
+            tz_index=np.array(self.tz_index, dtype=np.uint16),
+            keys=np.array(self.keys, dtype=str),
+            key_city=np.array(self.key_city, dtype=np.int32),
+            trigrams=np.array(self.trigrams, dtype=str),
+            trigram_offsets=self.trigram_offsets,
+            postings=self.postings,
+        )
+
+    @classmethod
+    def load(cls, path) -> "CityIndex":
+        with np.load(path) as data:
+            version = int(data["version"])
+            if version != INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported city index version {version} in {path}")
+            return cls({name: data[name] for name in data.files})
+
+    def __len__(self):
+        return len(self.names)
+
+    def city(self, city: int) -> dict:
+        return {
+            "name": self.names[city],
+            "latitude": self.latitude[city],
+            "longitude": self.longitude[city],
+            "timezone": self.timezones[self.tz_index[city]],
+        }
+
+    def find_exact(self, name: str):
+        key = city_key(name)
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.key_city[i]
+        return None
+
+    def find_fuzzy(self, name: str):
+        """
+        Closest key within max_typos edits among the keys sharing most trigrams;
+        None when two keys are equally close.
+        """
+        key = city_key(name)
+        if max_typos(key) == 0:
+            return None
+
+        slices = []
+        for trigram in trigrams(key):
+            i = bisect_left(self.trigrams, trigram)
+            if i < len(self.trigrams) and self.trigrams[i] == trigram:
+                slices.append(self.postings[self.trigram_offsets[i]:self.trigram_offsets[i + 1]])
+        if not slices:
+            return None
+
+        candidates, shared = np.unique(np.concatenate(slices), return_counts=True)
+        if len(candidates) > FUZZY_CANDIDATES:
+            top = np.argpartition(-shared, FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]
+            candidates = candidates[top]
+
+        matches = sorted(
+            (distance, key_id) for key_id in candidates.tolist()
+            if (distance := edit_distance(key, self.keys[key_id])) <= max_typos(key)
+        )
+        if not matches or len(matches) > 1 and matches[1][0] == matches[0][0]:
+            return None
+        return self.key_city[matches[0][1]]
+
+    def lookup(self, name: str, fuzzy: bool = True):
+        """City dict (name, latitude, longitude, timezone) or None."""
+        city = self.find_exact(name)
+        if city is None and fuzzy:
+            city = self.find_fuzzy(name)
+        return self.city(city) if city is not None else None
+
+
+def directory_entries():
+    """Cities of the russian_cities directory."""
+    for name, info in cities.items():
+        yield [name], info["latitude"], info["longitude"], info["timezone"]
+
+
+def geonames_entries(path):
+    """
+    Cities of a GeoNames dump (cities500/1000/5000/15000.txt), most populous first;
+    each city is indexed under its name, ASCII name and alternate names.
+    """
+    rows = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            # Коды аэропортов (MOW, LED) и имена с цифрами не индексируются
+            alternate = [n for n in row[3].split(",") if n and not n.isupper() and not any(c.isdigit() for c in n)]
+            rows.append((int(row[14] or 0), [row[1], row[2], *alternate], row[4], row[5], row[17]))
+    rows.sort(key=lambda r: -r[0])
+    for _, names, lat, lon, tz_name in rows:
+        yield names, lat, lon, tz_name
+
+
+def gazetteer_entries(path):
+    """Entries of a GeoNames .txt dump or a load_gazetteer CSV/JSON file."""
+    if Path(path).suffix.lower() == ".txt":
+        yield from geonames_entries(path)
+        return
+    for name, info in load_gazetteer(path).items():
+        yield [name], info["latitude"], info["longitude"], info["timezone"]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_city_index() -> CityIndex:
+    """Process-wide index from CITY_INDEX_PATH, or compiled from the directory when the file is absent."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = os.getenv("CITY_INDEX_PATH", str(DEFAULT_INDEX_PATH))
+            _index = CityIndex.load(path) if os.path.exists(path) else CityIndex.build(directory_entries())
+        return _index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the offline city index.")
+    parser.add_argument("--gazetteer", action="append", default=[],
+                        help="GeoNames .txt dump or CSV/JSON gazetteer (repeatable)")
+    parser.add_argument("--out", default=str(DEFAULT_INDEX_PATH), help="Output .npz file")
+    args = parser.parse_args(argv)
+
+    def entries():
+        yield from directory_entries()
+        for path in args.gazetteer:
+            yield from gazetteer_entries(path)
+
+    index = CityIndex.build(entries())
+    index.save(args.out)
+    print(f"Индекс городов: {len(index)} городов, {len(index.keys)} ключей -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -105,6 +105,8 @@ CHARA_DASHA_YEARS = [
 
 # for transit_analisis
 
+# Порядок грах в транзитных расчётах (колонки массивов в ephemeris.py)
+GRAHAS = ["Солнце", "Луна", "Марс", "Меркурий", "Юпитер", "Венера", "Сатурн", "Раху", "Кету"]
 
 benefic_planets = {"Юпитер", "Венера", "Меркурий", "Луна"}
 malefic_planets = {"Сатурн", "Солнце", "Марс", "Раху", "Кету"}
@@ -168,3 +170,12 @@ HOUSE_MEANINGS = {
     11: "Друзья, Доходы, Желания",
     12: "Потери, Изоляция, Духовные Практики",
 }
+
+# Статусы домов по итоговому баллу, от лучшего к худшему (индекс — код статуса в компактной схеме API)
+HOUSE_STATUSES = ["Очень благоприятно", "Благоприятно", "Нейтрально", "Неблагоприятно", "Критически неблагоприятно"]
+
+# Типы событий поиска переходов (core_files.events); смена дома — это смена знака относительно лагны
+EVENT_TYPES = ("sign", "nakshatra", "pada", "house")
+
+# Планеты, у которых бывают станции (Солнце, Луна и средний узел их не имеют)
+STATION_PLANETS = ["Меркурий", "Венера", "Марс", "Юпитер", "Сатурн"]
@@ -0,0 +1,64 @@
+"""
+Degree parsing and formatting shared by the chart pipeline.
+
+Chart positions carry the absolute sidereal longitude ("sidereal_longitude",
+0-360) and the speed in degrees per day ("speed") as floats. Calculations use
+these; the "degree" string ("dd°mm'ss''" within the sign, seconds rounded) is
+only for display. Charts saved before the float fields existed are read by
+parsing the string once (position_longitude).
+"""
+import re
+from math import floor
+
+from core_files.constants import ZODIAC_SIGNS
+
+_DMS_PATTERN = re.compile(r"^\s*(\d+(?:\.\d*)?)°\s*(\d+(?:\.\d*)?)'\s*(\d+(?:\.\d*)?)'*\s*R?\s*$")
+
+
+def parse_dms(degree_str: str) -> float:
+    """
+    "26°43'38''" -> 26.7272... (a trailing retrograde " R" is ignored).
+    Raises ValueError for anything else.
+    """
+    match = _DMS_PATTERN.match(degree_str) if isinstance(degree_str, str) else None
+    if match is None:
+        raise ValueError(f"Invalid degree string: {degree_str!r}")
+    degrees, minutes, seconds = (float(part) for part in match.groups())
+    return degrees + minutes / 60 + seconds / 3600
+
+
+def degree_str_to_float(degree_str: str) -> float:
+    """Lenient parse_dms for display code: 0.0 for strings that do not parse."""
+    try:
+        return parse_dms(degree_str)
+    except ValueError:
+        return 0.0
+
+
+def dms_within_sign(longitude: float):
+    """(degrees, minutes, rounded seconds) of a longitude within its sign."""
+    relative = longitude % 30
+    degrees = floor(relative)
+    minutes_float = (relative - degrees) * 60
+    minutes = floor(minutes_float)
+    return degrees, minutes, round((minutes_float - minutes) * 60)
+
+
+def format_dms(longitude: float) -> str:
+    """Display string of a longitude within its sign: "dd°mm'ss''"."""
+    degrees, minutes, seconds = dms_within_sign(longitude)
+    return f"{degrees}°{minutes}'{seconds}''"
+
+
+def position_longitude(data: dict):
+    """
+    Absolute sidereal longitude of a chart position: the float field, or for
+    older charts sign * 30 + the parsed degree string. None without a sign.
+    """
+    longitude = data.get("sidereal_longitude")
+    if longitude is not None:
+        return float(longitude)
+    sign = data.get("sign")
+    if sign not in ZODIAC_SIGNS or data.get("degree") is None:
+        return None
+    return ZODIAC_SIGNS.index(sign) * 30 + parse_dms(data["degree"])
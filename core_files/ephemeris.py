@@ -0,0 +1,109 @@
+import numpy as np
+import swisseph as swe
+
+from core_files.constants import GRAHAS, NAKSHATRA_LENGTH
+from core_files.swiss_ephemeris import tropical_positions
+
+# Swiss Ephemeris bodies in GRAHAS order; Кету is derived from the mean node
+BODY_IDS = [swe.SUN, swe.MOON, swe.MARS, swe.MERCURY, swe.JUPITER, swe.VENUS, swe.SATURN, swe.MEAN_NODE]
+RAHU_INDEX = GRAHAS.index("Раху")
+KETU_INDEX = GRAHAS.index("Кету")
+
+# Optional precomputed table (see ephemeris_table.py), shared by the whole process
+_active_table = None
+
+
+def use_ephemeris_table(table):
+    """
+    Routes calculate_graha_arrays through a precomputed EphemerisTable (None disables it).
+    """
+    global _active_table
+    _active_table = table
+
+
+def get_ephemeris_table():
+    """Returns the active EphemerisTable or None."""
+    return _active_table
+
+
+def julian_day_range(start_jd: float, days: int, step: float = 1.0) -> np.ndarray:
+    """
+    Returns an array of Julian days starting at start_jd with the given step (in days).
+    """
+    return start_jd + np.arange(days, dtype=float) * step
+
+
+def calculate_graha_arrays(jd_array, natal_lagna_degree=None) -> dict:
+    """
+    Calculates sidereal (Lahiri) positions of the nine grahas for an array of Julian days.
+
+    The mean node and the ayanamsa are evaluated once per date; everything derived
+    from the longitude (sign, whole-sign house, nakshatra, pada) is computed as an
+    array operation. Arrays have shape (len(jd_array), 9), columns follow GRAHAS.
+    The "house" entry is None when no natal lagna is given.
+    """
+    jds = np.atleast_1d(np.asarray(jd_array, dtype=float))
+
+    # Прекомпилированная таблица эфемерид обходит Swiss Ephemeris целиком
+    if _active_table is not None and _active_table.covers(jds):
+        sidereal, speed = _active_table.interpolate(jds)
+        return build_graha_arrays(jds, sidereal, speed, natal_lagna_degree)
+
+    count = len(jds)
+
+    tropical = np.empty((count, len(GRAHAS)))
+    speed = np.empty((count, len(GRAHAS)))
+    ayanamsa = np.empty(count)
+
+    for i, jd_ut in enumerate(jds):
+        ayanamsa[i], positions = tropical_positions(float(jd_ut), BODY_IDS)
+        for j, (body_longitude, body_speed) in enumerate(positions):
+            tropical[i, j] = body_longitude
+            speed[i, j] = body_speed
+
+    # Кету всегда напротив Раху и движется с той же скоростью
+    tropical[:, KETU_INDEX] = (tropical[:, RAHU_INDEX] + 180) % 360
+    speed[:, KETU_INDEX] = speed[:, RAHU_INDEX]
+
+    return build_graha_arrays(jds, tropical - ayanamsa[:, None], speed, natal_lagna_degree)
+
+
+def calculate_graha_position(jd_ut: float, planet_index: int):
+    """
+    Sidereal (Lahiri) longitude and speed of one graha (index in GRAHAS) directly
+    from Swiss Ephemeris, bypassing the precomputed table. Same formula as
+    calculate_graha_arrays, for callers that need exact values (root finding).
+    """
+    body_id = BODY_IDS[RAHU_INDEX if planet_index == KETU_INDEX else planet_index]
+    ayanamsa, [(tropical, speed)] = tropical_positions(jd_ut, [body_id])
+    longitude = tropical - ayanamsa
+    if planet_index == KETU_INDEX:
+        longitude += 180
+    return longitude % 360, speed
+
+
+def build_graha_arrays(jds, sidereal, speed, natal_lagna_degree=None) -> dict:
+    """
+    Derives sign, house, nakshatra, pada and retrograde arrays from sidereal longitudes.
+    """
+    longitude = np.where(sidereal < 0, sidereal + 360, sidereal)
+    sign = (longitude // 30).astype(int) % 12
+    nakshatra = (longitude // NAKSHATRA_LENGTH).astype(int) % 27
+    pada = ((longitude % NAKSHATRA_LENGTH) // (NAKSHATRA_LENGTH / 4)).astype(int) + 1
+
+    house = None
+    if natal_lagna_degree is not None:
+        lagna_sign = int(natal_lagna_degree // 30) % 12
+        house = (sign - lagna_sign) % 12 + 1
+
+    return {
+        "jd": jds,
+        "planets": GRAHAS,
+        "longitude": longitude,
+        "speed": speed,
+        "retrograde": speed < 0,
+        "sign": sign,
+        "house": house,
+        "nakshatra": nakshatra,
+        "pada": pada,
+    }
@@ -0,0 +1,202 @@
+"""
+Precomputed ephemeris table for hot transit lookups.
+
+The table stores sidereal (Lahiri) longitudes and speeds of the nine grahas at a
+fixed step: one day for all grahas and one hour for the Moon. It is written as
+plain .npy files so it can be memory-mapped by every worker, and queried with
+cubic Hermite interpolation (longitude + speed at both ends of the interval).
+
+Interpolated longitudes stay within TOLERANCE_ARCSEC of the direct swe.calc_ut
+path, speeds within SPEED_TOLERANCE (degrees per day). Typical errors are below
+0.1''; the worst case comes from gravitational light deflection when a slow graha
+is within a day of solar conjunction. Dates outside the table range fall back to
+Swiss Ephemeris.
+
+Build:
+    python -m core_files.ephemeris_table --start 1950-01-01 --end 2050-01-01 --out ephemeris_table
+"""
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import swisseph as swe
+
+from core_files.constants import GRAHAS
+from core_files.ephemeris import BODY_IDS, RAHU_INDEX, KETU_INDEX
+from core_files.swiss_ephemeris import calc_ut, get_ayanamsa_ut
+
+TOLERANCE_ARCSEC = 5.0
+SPEED_TOLERANCE = 0.02
+
+DAILY_STEP = 1.0
+MOON_STEP = 1.0 / 24
+MOON_INDEX = GRAHAS.index("Луна")
+
+TABLE_FORMAT_VERSION = 1
+
+
+def _wrap_delta(delta):
+    """Maps a longitude difference into the (-180, 180] range."""
+    return (delta + 180) % 360 - 180
+
+
+def _hermite(jds, start_jd, step, lon, speed, ayanamsa_rate):
+    """
+    Cubic Hermite interpolation of sidereal longitude and speed at the given Julian days.
+    lon and speed have shape (nodes, bodies); ayanamsa_rate has shape (len(jds),).
+    """
+    position = (jds - start_jd) / step
+    k = np.minimum(np.floor(position).astype(int), len(lon) - 2)
+    t = (position - k)[:, None]
+
+    y0 = lon[k]
+    y1 = y0 + _wrap_delta(lon[k + 1] - y0)
+    # Производная сидерической долготы = скорость минус скорость прецессии аянамши
+    m0 = (speed[k] - ayanamsa_rate[:, None]) * step
+    m1 = (speed[k + 1] - ayanamsa_rate[:, None]) * step
+
+    t2 = t * t
+    t3 = t2 * t
+    value = ((2 * t3 - 3 * t2 + 1) * y0 + (t3 - 2 * t2 + t) * m0
+             + (-2 * t3 + 3 * t2) * y1 + (t3 - t2) * m1)
+    derivative = ((6 * t2 - 6 * t) * y0 + (3 * t2 - 4 * t + 1) * m0
+                  + (-6 * t2 + 6 * t) * y1 + (3 * t2 - 2 * t) * m1) / step
+
+    return value % 360, derivative + ayanamsa_rate[:, None]
+
+
+class EphemerisTable:
+    """
+    Memory-mapped ephemeris table with interpolated lookups.
+    """
+
+    def __init__(self, meta, daily, moon, ayanamsa):
+        self.meta = meta
+        self.start_jd = meta["start_jd"]
+        self.end_jd = meta["end_jd"]
+        self.daily = daily
+        self.moon = moon
+        self.ayanamsa = ayanamsa
+
+    @classmethod
+    def load(cls, path):
+        """Opens a table directory created by build_ephemeris_table (arrays are memory-mapped)."""
+        path = Path(path)
+        with open(path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("format_version") != TABLE_FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия таблицы эфемерид: {meta.get('format_version')}")
+
+        return cls(
+            meta,
+            np.load(path / "daily.npy", mmap_mode="r"),
+            np.load(path / "moon.npy", mmap_mode="r"),
+            np.load(path / "ayanamsa.npy", mmap_mode="r"),
+        )
+
+    def covers(self, jds) -> bool:
+        """True if every Julian day lies inside the table range."""
+        jds = np.asarray(jds, dtype=float)
+        return bool(np.all((jds >= self.start_jd) & (jds <= self.end_jd)))
+
+    def interpolate(self, jds):
+        """
+        Returns (sidereal_longitude, speed) arrays of shape (len(jds), 9), columns follow GRAHAS.
+        """
+        jds = np.atleast_1d(np.asarray(jds, dtype=float))
+        if not self.covers(jds):
+            raise ValueError("Дата вне диапазона таблицы эфемерид.")
+
+        day_position = (jds - self.start_jd) / DAILY_STEP
+        day_index = np.minimum(np.floor(day_position).astype(int), len(self.ayanamsa) - 2)
+        ayanamsa_rate = (self.ayanamsa[day_index + 1] - self.ayanamsa[day_index]) / DAILY_STEP
+
+        longitude, speed = _hermite(
+            jds, self.start_jd, DAILY_STEP,
+            self.daily[:, :, 0], self.daily[:, :, 1], ayanamsa_rate
+        )
+
+        moon_lon, moon_speed = _hermite(
+            jds, self.start_jd, MOON_STEP,
+            self.moon[:, 0:1], self.moon[:, 1:2], ayanamsa_rate
+        )
+        longitude[:, MOON_INDEX] = moon_lon[:, 0]
+        speed[:, MOON_INDEX] = moon_speed[:, 0]
+
+        return longitude, speed
+
+
+def _sidereal_body(jd_ut, body_id, ayanamsa):
+    data, _ = calc_ut(jd_ut, body_id)
+    sid_lon = data[0] - ayanamsa
+    if sid_lon < 0:
+        sid_lon += 360
+    return sid_lon, data[3]
+
+
+def build_ephemeris_table(path, start_jd: float, end_jd: float):
+    """
+    Calculates the table for [start_jd, end_jd] and writes it to the path directory.
+    """
+    days = int(np.ceil((end_jd - start_jd) / DAILY_STEP)) + 1
+    hours = int(round((days - 1) * DAILY_STEP / MOON_STEP)) + 1
+
+    daily = np.empty((days, len(GRAHAS), 2))
+    ayanamsa = np.empty(days)
+    for i in range(days):
+        jd_ut = start_jd + i * DAILY_STEP
+        ayanamsa[i] = get_ayanamsa_ut(jd_ut)
+        for j, body_id in enumerate(BODY_IDS):
+            daily[i, j] = _sidereal_body(jd_ut, body_id, ayanamsa[i])
+
+    daily[:, KETU_INDEX, 0] = (daily[:, RAHU_INDEX, 0] + 180) % 360
+    daily[:, KETU_INDEX, 1] = daily[:, RAHU_INDEX, 1]
+
+    moon = np.empty((hours, 2))
+    for i in range(hours):
+        jd_ut = start_jd + i * MOON_STEP
+        moon[i] = _sidereal_body(jd_ut, swe.MOON, get_ayanamsa_ut(jd_ut))
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    np.save(path / "daily.npy", daily)
+    np.save(path / "moon.npy", moon)
+    np.save(path / "ayanamsa.npy", ayanamsa)
+
+    meta = {
+        "format_version": TABLE_FORMAT_VERSION,
+        "ayanamsa": "Lahiri",
+        "start_jd": start_jd,
+        "end_jd": start_jd + (days - 1) * DAILY_STEP,
+        "daily_step": DAILY_STEP,
+        "moon_step": MOON_STEP,
+        "planets": GRAHAS,
+        "tolerance_arcsec": TOLERANCE_ARCSEC,
+    }
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=4)
+
+    return meta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a precomputed ephemeris table.")
+    parser.add_argument("--start", required=True, help="First date, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="Last date, YYYY-MM-DD")
+    parser.add_argument("--out", default="ephemeris_table", help="Output directory")
+    args = parser.parse_args(argv)
+
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    end = datetime.strptime(args.end, "%Y-%m-%d")
+    start_jd = swe.julday(start.year, start.month, start.day, 0.0)
+    end_jd = swe.julday(end.year, end.month, end.day, 0.0)
+
+    meta = build_ephemeris_table(args.out, start_jd, end_jd)
+    print(f"Таблица эфемерид сохранена в {args.out}: JD {meta['start_jd']} — {meta['end_jd']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Event finder: exact times of sign, nakshatra, pada and whole-sign house changes.
+
+Sidereal longitude is sampled on a coarse per-planet grid. Grid intervals that
+contain a station are split at the station, so every piece is monotonic; each
+segment boundary crossed inside a piece is then refined by root finding
+(Illinois regula falsi) to TIME_TOLERANCE. Retrograde re-crossings are found
+as separate events with "retrograde": True.
+"""
+from datetime import datetime, timedelta
+from math import floor
+
+import swisseph as swe
+
+from core_files.constants import GRAHAS, ZODIAC_SIGNS, nakshatra_name, NAKSHATRA_LENGTH, EVENT_TYPES
+from core_files.ephemeris import calculate_graha_position
+
+# Ширина сегмента (в градусах) для каждого типа события; смена дома — это смена знака
+SEGMENT_WIDTH = {
+    "sign": 30.0,
+    "nakshatra": NAKSHATRA_LENGTH,
+    "pada": NAKSHATRA_LENGTH / 4,
+}
+
+# Шаг сетки в днях: между узлами планета проходит не больше ~2.5° (меньше одной пады)
+SCAN_STEP = {
+    "Солнце": 2.0,
+    "Луна": 0.125,
+    "Марс": 2.0,
+    "Меркурий": 1.0,
+    "Юпитер": 8.0,
+    "Венера": 2.0,
+    "Сатурн": 16.0,
+    "Раху": 32.0,
+    "Кету": 32.0,
+}
+
+TIME_TOLERANCE = 1 / 86400  # одна секунда
+MAX_ITERATIONS = 100
+
+
+def jd_to_utc(jd: float) -> str:
+    """Julian day (UT) -> ISO 8601 UTC string rounded to the second."""
+    year, month, day, hours = swe.revjul(jd)
+    moment = datetime(year, month, day) + timedelta(seconds=round(hours * 3600))
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def signed_arc(to_lon: float, from_lon: float) -> float:
+    """Shortest signed arc from from_lon to to_lon, in [-180, 180)."""
+    return (to_lon - from_lon + 180) % 360 - 180
+
+
+def find_root(func, a: float, b: float, fa: float, fb: float, tolerance: float = TIME_TOLERANCE) -> float:
+    """
+    Root of func on [a, b] where fa = func(a) and fb = func(b) have opposite signs
+    (Illinois variant of regula falsi, stops when the bracket is narrower than tolerance).
+    """
+    side = 0
+    for _ in range(MAX_ITERATIONS):
+        if b - a <= tolerance:
+            break
+        c = (a * fb - b * fa) / (fb - fa)
+        if not a < c < b:
+            c = (a + b) / 2
+        fc = func(c)
+        if fc == 0:
+            return c
+        if (fc > 0) == (fb > 0):
+            b, fb = c, fc
+            if side == -1:
+                fa /= 2
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb /= 2
+            side = 1
+    return (a + b) / 2
+
+
+def iter_monotonic_pieces(position, start_jd: float, end_jd: float, step: float):
+    """
+    Yields (jd_a, lon_a, jd_b, lon_b, retrograde) pieces covering [start_jd, end_jd]
+    on which the longitude moves in one direction. `position(jd)` -> (lon, speed).
+    """
+    t0 = start_jd
+    lon0, speed0 = position(t0)
+    while t0 < end_jd:
+        t1 = min(t0 + step, end_jd)
+        lon1, speed1 = position(t1)
+
+        if (speed0 < 0) != (speed1 < 0):
+            # Станция внутри интервала: делим его в момент нулевой скорости
+            station = find_root(lambda t: position(t)[1], t0, t1, speed0, speed1)
+            lon_station, _ = position(station)
+            yield t0, lon0, station, lon_station, speed0 < 0
+            yield station, lon_station, t1, lon1, speed1 < 0
+        else:
+            yield t0, lon0, t1, lon1, speed0 < 0
+
+        t0, lon0, speed0 = t1, lon1, speed1
+
+
+def crossed_boundaries(lon_a: float, lon_b: float, width: float):
+    """
+    Segment boundaries crossed when moving monotonically from lon_a to lon_b
+    (shortest arc). Yields (boundary_longitude, from_index, to_index).
+    """
+    count = round(360 / width)
+    unwrapped_b = lon_a + signed_arc(lon_b, lon_a)
+    first, last = floor(lon_a / width), floor(unwrapped_b / width)
+
+    if last > first:
+        for k in range(first + 1, last + 1):
+            yield (k * width) % 360, (k - 1) % count, k % count
+    else:
+        for k in range(first, last, -1):
+            yield (k * width) % 360, k % count, (k - 1) % count
+
+
+def describe_segment(event_type: str, index: int):
+    """Readable value of a segment index for the given event type."""
+    if event_type == "sign":
+        return ZODIAC_SIGNS[index]
+    if event_type == "nakshatra":
+        return nakshatra_name[index]
+    return {"nakshatra": nakshatra_name[index // 4], "pada": index % 4 + 1}
+
+
+def find_events(start_jd: float, end_jd: float, planets=None, event_types=("sign", "nakshatra", "pada"),
+                natal_lagna_degree: float = None) -> list:
+    """
+    Finds all sign, nakshatra, pada and whole-sign house changes of the given grahas
+    between start_jd and end_jd. House changes need the natal lagna degree.
+
+    Returns events sorted by time:
+      {"planet", "type", "jd", "utc", "from", "to", "retrograde"}
+    """
+    planets = list(planets or GRAHAS)
+    event_types = list(event_types)
+    for planet in planets:
+        if planet not in GRAHAS:
+            raise ValueError(f"Unknown planet '{planet}'")
+    for event_type in event_types:
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type '{event_type}', expected one of {EVENT_TYPES}")
+    if "house" in event_types and natal_lagna_degree is None:
+        raise ValueError("House events require the natal lagna degree")
+
+    # Смена дома (целые знаки) происходит в момент смены знака
+    widths = {t: SEGMENT_WIDTH["sign" if t == "house" else t] for t in event_types}
+    lagna_sign = int(natal_lagna_degree // 30) % 12 if natal_lagna_degree is not None else None
+
+    events = []
+    for planet in planets:
+        planet_index = GRAHAS.index(planet)
+
+        def position(jd):
+            return calculate_graha_position(jd, planet_index)
+
+        for jd_a, lon_a, jd_b, lon_b, retrograde in iter_monotonic_pieces(
+                position, start_jd, end_jd, SCAN_STEP[planet]):
+            # Границы знаков и накшатр совпадают с границами пад: корень ищется один раз
+            roots = {}
+            for event_type, width in widths.items():
+                for boundary, from_index, to_index in crossed_boundaries(lon_a, lon_b, width):
+                    key = round(boundary, 6)
+                    if key not in roots:
+                        roots[key] = find_root(
+                            lambda t: signed_arc(position(t)[0], boundary), jd_a, jd_b,
+                            signed_arc(lon_a, boundary), signed_arc(lon_b, boundary)
+                        )
+                    jd_event = roots[key]
+                    if event_type == "house":
+                        from_value = (from_index - lagna_sign) % 12 + 1
+                        to_value = (to_index - lagna_sign) % 12 + 1
+                    else:
+                        from_value = describe_segment(event_type, from_index)
+                        to_value = describe_segment(event_type, to_index)
+
+                    events.append({
+                        "planet": planet,
+                        "type": event_type,
+                        "jd": jd_event,
+                        "utc": jd_to_utc(jd_event),
+                        "from": from_value,
+                        "to": to_value,
+                        "retrograde": retrograde,
+                    })
+
+    events.sort(key=lambda event: (event["jd"], GRAHAS.index(event["planet"]), EVENT_TYPES.index(event["type"])))
+    return events
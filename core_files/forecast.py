@@ -0,0 +1,57 @@
+"""
+Generator-based forecast pipeline: transit analysis one day at a time.
+
+Ephemeris is calculated in chunks of FORECAST_CHUNK_DAYS, so memory stays flat
+for any range length and the first day is available after a single chunk.
+"""
+from itertools import islice
+
+from core_files.natal_context import NatalContext
+from core_files.transit_analys import (
+    calculate_transit_chart_positions_range,
+    analyze_transits_full,
+    analyze_transits_scores,
+)
+
+FORECAST_CHUNK_DAYS = 32
+
+
+def iter_chunks(iterable, size: int):
+    """Splits any iterable into lists of at most `size` items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_julian_days(start_jd: float, days: int, step: float = 1.0):
+    """Lazy counterpart of ephemeris.julian_day_range."""
+    for i in range(days):
+        yield start_jd + i * step
+
+
+def iter_daily_forecast(natal: NatalContext, jds, with_report: bool = True,
+                        chunk_days: int = FORECAST_CHUNK_DAYS):
+    """
+    Yields one analysed day per Julian day of `jds` (any iterable, consumed lazily):
+      {"jd", "transit_positions", "houses_analysis", "report"}
+    transit_positions are compact ChartPositions (a read-only mapping in the
+    calculate_transit_positions format; to_dict() for a plain dict).
+    With with_report=False houses get numeric scores only and "report" is None.
+    """
+    for chunk in iter_chunks(jds, chunk_days):
+        positions_by_day = calculate_transit_chart_positions_range(chunk, natal.lagna_degree)
+        for jd_transit, transit_positions in zip(chunk, positions_by_day):
+            if with_report:
+                report, houses_analysis = analyze_transits_full(natal, transit_positions)
+            else:
+                report, houses_analysis = None, analyze_transits_scores(natal, transit_positions)
+
+            yield {
+                "jd": float(jd_transit),
+                "transit_positions": transit_positions,
+                "houses_analysis": houses_analysis,
+                "report": report,
+            }
@@ -1,33 +1,200 @@
+"""
+City -> coordinates and timezone for birth places missing from the local directory.
+
+Lookups go through, in order:
+  1. the offline gazetteer (GAZETTEER_PATH: CSV or JSON file, optional);
+  2. the persistent geocode cache (SQLite, GEOCODE_CACHE_PATH);
+  3. the network geocoder (Nominatim), unless GEOCODER_OFFLINE is set.
+Every network result is written to the cache, so a city is geocoded only once.
+The Nominatim client and the TimezoneFinder (slow to load its polygon data)
+are created once per process.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
 
 from geopy.geocoders import Nominatim
 from timezonefinder import TimezoneFinder
-from zoneinfo import ZoneInfo
-from datetime import datetime
 
-def get_location_data(city_name: str, birth_dt: datetime):
-    geolocator = Nominatim(user_agent="astro_locator")
-    location = geolocator.geocode(city_name)
+from core_files.sqlite_db import SQLiteDatabase
 
-    if not location:
-        raise ValueError("Город не найден.")
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_GEOCODE_CACHE_PATH = BASE_DIR / "geocode_cache.sqlite3"
+
+
+def normalize_city(city_name: str) -> str:
+    """Cache / gazetteer key: lower case, single spaces."""
+    return " ".join(city_name.lower().split())
+
+
+_timezone_finder = None
+_nominatim = None
+_singleton_lock = threading.Lock()
 
-    latitude = location.latitude
-    longitude = location.longitude
 
-    tf = TimezoneFinder()
-    timezone_str = tf.timezone_at(lng=longitude, lat=latitude)
+def get_timezone_finder() -> TimezoneFinder:
+    """Process-wide TimezoneFinder (loading it takes most of a second)."""
+    global _timezone_finder
+    with _singleton_lock:
+        if _timezone_finder is None:
+            _timezone_finder = TimezoneFinder()
+        return _timezone_finder
 
+
+def timezone_at(latitude: float, longitude: float) -> str:
+    timezone_str = get_timezone_finder().timezone_at(lng=longitude, lat=latitude)
     if not timezone_str:
         raise ValueError("Не удалось определить часовой пояс.")
+    return timezone_str
+
+
+def nominatim_geocode(city_name: str):
+    """Default network geocoder: {"latitude", "longitude"} or None."""
+    global _nominatim
+    with _singleton_lock:
+        if _nominatim is None:
+            _nominatim = Nominatim(user_agent="astro_locator")
+    location = _nominatim.geocode(city_name)
+    if not location:
+        return None
+    return {"latitude": location.latitude, "longitude": location.longitude}
+
+
+class GeocodeCache(SQLiteDatabase):
+    """Geocoded cities in one SQLite file, shared by threads and processes."""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS geocodes ("
+        "query TEXT PRIMARY KEY, "
+        "latitude REAL NOT NULL, "
+        "longitude REAL NOT NULL, "
+        "timezone TEXT NOT NULL, "
+        "created_at REAL NOT NULL)",
+    )
+
+    def __init__(self, path=DEFAULT_GEOCODE_CACHE_PATH):
+        super().__init__(path)
+
+    def get(self, city_name: str):
+        """{"latitude", "longitude", "timezone"} or None."""
+        row = self._connection().execute(
+            "SELECT latitude, longitude, timezone FROM geocodes WHERE query = ?", (normalize_city(city_name),)
+        ).fetchone()
+        return {"latitude": row[0], "longitude": row[1], "timezone": row[2]} if row else None
+
+    def put(self, city_name: str, location: dict):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocodes (query, latitude, longitude, timezone, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (normalize_city(city_name), location["latitude"], location["longitude"],
+                 location["timezone"], time.time())
+            )
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM geocodes").fetchone()[0]
+
+
+def load_gazetteer(path) -> dict:
+    """
+    Offline city list: CSV with a name,latitude,longitude[,timezone] header or
+    JSON {name: {"latitude", "longitude", "timezone"}} (the russian_cities format).
+    Entries without a timezone get it from TimezoneFinder.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".json":
+            rows = [{"name": name, **info} for name, info in json.load(f).items()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    gazetteer = {}
+    for row in rows:
+        latitude, longitude = float(row["latitude"]), float(row["longitude"])
+        gazetteer[normalize_city(row["name"])] = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "timezone": row.get("timezone") or timezone_at(latitude, longitude),
+        }
+    return gazetteer
+
+
+_geocode_cache = None
+_gazetteer = None
+_state_lock = threading.Lock()
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """Process-wide cache at GEOCODE_CACHE_PATH (default geocode_cache.sqlite3 in the project root)."""
+    global _geocode_cache
+    with _state_lock:
+        if _geocode_cache is None:
+            _geocode_cache = GeocodeCache(os.getenv("GEOCODE_CACHE_PATH", str(DEFAULT_GEOCODE_CACHE_PATH)))
+        return _geocode_cache
+
+
+def get_gazetteer() -> dict:
+    """Gazetteer from GAZETTEER_PATH, loaded once; empty when the variable is not set."""
+    global _gazetteer
+    with _state_lock:
+        if _gazetteer is None:
+            path = os.getenv("GAZETTEER_PATH")
+            _gazetteer = load_gazetteer(path) if path else {}
+        return _gazetteer
+
+
+def is_offline() -> bool:
+    return os.getenv("GEOCODER_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def resolve_city(city_name: str, geocoder=None) -> dict:
+    """
+    {"latitude", "longitude", "timezone"} of a city via the gazetteer, the cache
+    and then the geocoder (callable city -> {"latitude", "longitude"[, "timezone"]}
+    or None; Nominatim by default). Raises ValueError when the city is not found.
+    """
+    location = get_gazetteer().get(normalize_city(city_name))
+    if location is not None:
+        return location
+
+    cache = get_geocode_cache()
+    location = cache.get(city_name)
+    if location is not None:
+        return location
+
+    if is_offline():
+        raise ValueError("Город не найден (офлайн-режим геокодера).")
+
+    found = (geocoder or nominatim_geocode)(city_name)
+    if not found:
+        raise ValueError("Город не найден.")
+
+    location = {
+        "latitude": found["latitude"],
+        "longitude": found["longitude"],
+        "timezone": found.get("timezone") or timezone_at(found["latitude"], found["longitude"]),
+    }
+    cache.put(city_name, location)
+    return location
+
+
+def get_location_data(city_name: str, birth_dt: datetime, geocoder=None):
+    location = resolve_city(city_name, geocoder)
 
-    tz = ZoneInfo(timezone_str)
+    tz = ZoneInfo(location["timezone"])
     localized_dt = birth_dt.replace(tzinfo=tz)
     utc_offset = localized_dt.utcoffset().total_seconds() / 3600
 
     return {
-        "latitude": latitude,
-        "longitude": longitude,
-        "timezone": timezone_str,
+        "latitude": location["latitude"],
+        "longitude": location["longitude"],
+        "timezone": location["timezone"],
         "utc_offset": utc_offset,
         "localized_dt": localized_dt
     }
@@ -1,5 +1,6 @@
 import swisseph as swe
 from core_files.constants import nakshatra_lords,NAKSHATRAS,TITHIS,PAKSHA_NAMES
+from core_files.swiss_ephemeris import tropical_positions
 
 def get_nakshatra_lord(nakshatra_name: str) -> str:
     return nakshatra_lords.get(nakshatra_name, "Неизвестен")
@@ -8,15 +9,11 @@ def get_nakshatra_lord(nakshatra_name: str) -> str:
 
 
 def get_lunar_details(jd_ut):
-    swe.set_sid_mode(swe.SIDM_LAHIRI)
-    swe.set_ephe_path('.')
-
     # Солнечно-лунные координаты
-    moon, _ = swe.calc_ut(jd_ut, swe.MOON)
-    sun, _ = swe.calc_ut(jd_ut, swe.SUN)
+    ayanamsa, [(moon, _), (sun, _)] = tropical_positions(jd_ut, [swe.MOON, swe.SUN])
 
-    moon_long = (moon[0] - swe.get_ayanamsa_ut(jd_ut)) % 360
-    sun_long = (sun[0] - swe.get_ayanamsa_ut(jd_ut)) % 360
+    moon_long = (moon - ayanamsa) % 360
+    sun_long = (sun - ayanamsa) % 360
 
     # --- Накшатра ---
     nakshatra_index = int(moon_long // (360 / 27))
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+from core_files.constants import ZODIAC_SIGNS, SIGN_RULERS
+from core_files.degrees import position_longitude
+from core_files.vimshottari import get_dasha_timeline
+
+NATAL_CONTEXT_CACHE_SIZE = 1024
+
+
+def chart_content_hash(chart_data: dict) -> str:
+    """
+    Canonical SHA-256 of the chart content (key order and formatting do not matter).
+    """
+    canonical = json.dumps(chart_data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class NatalContext:
+    """
+    Natal chart preprocessed once for the transit pipeline.
+
+    Holds float longitudes, sign and house indexes, the house-ruler table and the
+    Vimshottari timeline, so repeated transit analyses of the same chart skip all
+    parsing of the raw `planets` dict. Instances are shared between requests
+    through get_natal_context and must be treated as read-only.
+    """
+
+    def __init__(self, chart_data: dict, chart_hash: str = None):
+        self.chart_data = chart_data
+        self.chart_hash = chart_hash or chart_content_hash(chart_data)
+
+        self.planets = chart_data.get("planets", {})
+        self.lagna_degree = chart_data.get("lagna")
+        self.latitude = chart_data.get("latitude")
+        self.longitude = chart_data.get("longitude")
+        self.jd_birth = chart_data.get("julian_day")
+
+        # Знаки и дома натальных планет
+        self.sign_index = {}
+        for name, data in self.planets.items():
+            sign = data.get("sign")
+            if sign in ZODIAC_SIGNS:
+                self.sign_index[name] = ZODIAC_SIGNS.index(sign)
+
+        self.house_map = {name: data["house"] for name, data in self.planets.items() if "house" in data}
+
+        # Управители домов по знаку от натальной Лагны
+        self.lagna_sign_index = self.sign_index.get("Лагна")
+        self.house_rulers = {}
+        if self.lagna_sign_index is not None:
+            self.house_rulers = {
+                house: SIGN_RULERS.get(ZODIAC_SIGNS[(self.lagna_sign_index + house - 1) % 12])
+                for house in range(1, 13)
+            }
+
+        # Таймлайн Вимшоттари (махадаши, антары, пратьянтары) строится один раз на карту
+        self.moon = self.planets.get("Луна")
+        self.dasha_timeline = None
+        if self.jd_birth and self.moon:
+            self.dasha_timeline = get_dasha_timeline(self.jd_birth, self.moon)
+
+    @cached_property
+    def longitudes(self) -> dict:
+        """
+        Absolute sidereal longitudes of the natal planets. Positions without a
+        sign or with a degree string that does not parse are left out.
+        """
+        longitudes = {}
+        for name, data in self.planets.items():
+            try:
+                longitude = position_longitude(data)
+            except ValueError:
+                continue
+            if longitude is not None:
+                longitudes[name] = longitude
+        return longitudes
+
+    def dasha_states(self, jd_transit):
+        """
+        Active Maha, Antara and Pratyantara dashas for a transit date
+        (same result as get_vimshottari_dasha_states).
+        """
+        if self.dasha_timeline is None:
+            return None
+        return self.dasha_timeline.states(jd_transit)
+
+
+_context_cache = OrderedDict()
+_context_lock = threading.Lock()
+
+
+def get_natal_context(chart_data: dict, chart_hash: str = None) -> NatalContext:
+    """
+    Returns the cached NatalContext for this chart content, building it on a miss.
+    The cache is a process-wide LRU bounded by NATAL_CONTEXT_CACHE_SIZE.
+    A known chart_hash (e.g. from the chart store) skips hashing the chart.
+    """
+    chart_hash = chart_hash or chart_content_hash(chart_data)
+
+    with _context_lock:
+        context = _context_cache.get(chart_hash)
+        if context is not None:
+            _context_cache.move_to_end(chart_hash)
+            return context
+
+    context = NatalContext(chart_data, chart_hash)
+
+    with _context_lock:
+        _context_cache[chart_hash] = context
+        while len(_context_cache) > NATAL_CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
+
+    return context
+
+
+def clear_natal_context_cache():
+    with _context_lock:
+        _context_cache.clear()
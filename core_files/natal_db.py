@@ -1,34 +1,23 @@
 # natal_db.py
 
-import json
-import os
+from core_files.chart_store import get_chart_store, NATAL_DATABASE, LEGACY_NATAL_DB_PATH
 
-DB_FILE = "natal_database.json"
-
-def load_db():
-    if not os.path.exists(DB_FILE):
-        return {}
-    with open(DB_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def save_db(data):
-    with open(DB_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+# Старый JSON-файл: импортируется в пустое хранилище при первом обращении
+# (или командой `python -m core_files.chart_store migrate`)
+DB_FILE = LEGACY_NATAL_DB_PATH
 
 def add_natal_chart(name, birth_info):
-    data = load_db()
-    if name in data:
+    # Проверка имени и вставка — в одной транзакции, параллельные записи не создают дубликатов
+    _, created = get_chart_store().add_if_name_absent(birth_info, name=name, collection=NATAL_DATABASE)
+    if not created:
         print(f"Запись для '{name}' уже существует.")
         return False
-    data[name] = birth_info
-    save_db(data)
     print(f"Натальная карта для '{name}' сохранена.")
     return True
 
 def get_natal_chart(name):
-    data = load_db()
-    return data.get(name)
+    found = get_chart_store().find_by_name(name, NATAL_DATABASE)
+    return found[0] if found else None
 
 def list_all_names():
-    data = load_db()
-    return list(data.keys())
+    return get_chart_store().names(NATAL_DATABASE)
@@ -0,0 +1,259 @@
+"""
+Compact transit positions.
+
+Grahas, signs and nakshatras are IntEnums over GRAHAS, ZODIAC_SIGNS and
+NAKSHATRAS; their Russian names are looked up only when a position is
+serialized. ChartPositions keeps the nine grahas of one moment as parallel
+arrays (struct of arrays) sliced from calculate_graha_arrays, so a forecast
+day costs a few array views instead of nine dicts of strings. The numeric
+analysis (transit_scoring, Sade Sati) reads the arrays directly.
+
+ChartPositions is also a read-only Mapping {name: position dict} in the
+calculate_transit_positions format, so code written for the dicts keeps
+working; to_dict() materializes a plain dict for JSON output.
+"""
+from collections.abc import Mapping
+from enum import IntEnum
+from typing import NamedTuple
+
+import numpy as np
+
+from core_files.constants import GRAHAS, ZODIAC_SIGNS, NAKSHATRAS
+from core_files.degrees import format_dms
+from core_files.lunar_module import nakshatra_lords
+
+
+class Graha(IntEnum):
+    SUN = 0
+    MOON = 1
+    MARS = 2
+    MERCURY = 3
+    JUPITER = 4
+    VENUS = 5
+    SATURN = 6
+    RAHU = 7
+    KETU = 8
+
+    @property
+    def label(self) -> str:
+        return GRAHAS[self]
+
+
+class Sign(IntEnum):
+    ARIES = 0
+    TAURUS = 1
+    GEMINI = 2
+    CANCER = 3
+    LEO = 4
+    VIRGO = 5
+    LIBRA = 6
+    SCORPIO = 7
+    SAGITTARIUS = 8
+    CAPRICORN = 9
+    AQUARIUS = 10
+    PISCES = 11
+
+    @property
+    def label(self) -> str:
+        return ZODIAC_SIGNS[self]
+
+
+class Nakshatra(IntEnum):
+    ASHWINI = 0
+    BHARANI = 1
+    KRITTIKA = 2
+    ROHINI = 3
+    MRIGASHIRA = 4
+    ARDRA = 5
+    PUNARVASU = 6
+    PUSHYA = 7
+    ASHLESHA = 8
+    MAGHA = 9
+    PURVA_PHALGUNI = 10
+    UTTARA_PHALGUNI = 11
+    HASTA = 12
+    CHITRA = 13
+    SWATI = 14
+    VISHAKHA = 15
+    ANURADHA = 16
+    JYESHTHA = 17
+    MULA = 18
+    PURVA_ASHADHA = 19
+    UTTARA_ASHADHA = 20
+    SHRAVANA = 21
+    DHANISHTHA = 22
+    SHATABHISHA = 23
+    PURVA_BHADRAPADA = 24
+    UTTARA_BHADRAPADA = 25
+    REVATI = 26
+
+    @property
+    def label(self) -> str:
+        return NAKSHATRAS[self]
+
+    @property
+    def lord(self) -> str:
+        return nakshatra_lords[NAKSHATRAS[self]]
+
+
+GRAHA_BY_NAME = {graha.label: graha for graha in Graha}
+
+
+class PlanetPosition(NamedTuple):
+    """One graha at one moment; house is 0 when no natal lagna was given."""
+    graha: Graha
+    longitude: float
+    speed: float
+    sign: Sign
+    house: int
+    nakshatra: Nakshatra
+    pada: int
+    retrograde: bool
+
+    @property
+    def name(self) -> str:
+        return self.graha.label
+
+    @property
+    def degree(self) -> str:
+        return format_dms(self.longitude)
+
+    @property
+    def display_name(self) -> str:
+        return self.name + (" R" if self.retrograde else "")
+
+    def to_dict(self, degree: str = None) -> dict:
+        """Position dict in the calculate_transit_positions format."""
+        return {
+            "degree": degree if degree is not None else self.degree,
+            "sidereal_longitude": round(self.longitude, 6),
+            "speed": round(self.speed, 6),
+            "sign": self.sign.label,
+            "house": self.house or None,
+            "nakshatra": self.nakshatra.label,
+            "pada": self.pada,
+            "retrograde": self.retrograde
+        }
+
+
+class ChartPositions(Mapping):
+    """
+    The nine grahas (GRAHAS order) of one moment as parallel arrays.
+    house holds 0 for every graha until with_houses() is applied.
+    """
+
+    __slots__ = ("jd", "longitude", "speed", "sign", "house", "nakshatra", "pada", "retrograde", "_shared")
+
+    def __init__(self, jd, longitude, speed, sign, house, nakshatra, pada, retrograde, shared=None):
+        self.jd = jd
+        self.longitude = longitude
+        self.speed = speed
+        self.sign = sign
+        self.house = house
+        self.nakshatra = nakshatra
+        self.pada = pada
+        self.retrograde = retrograde
+        # Lazily built chart-independent data, shared with the with_houses() copies:
+        # [serialized rows, houses for each of the 12 lagna signs]
+        self._shared = shared if shared is not None else [None, None]
+
+    @classmethod
+    def from_arrays(cls, arrays, index) -> "ChartPositions":
+        """Row `index` of calculate_graha_arrays (views, no copies)."""
+        house = arrays["house"][index] if arrays["house"] is not None else np.zeros(len(GRAHAS), dtype=int)
+        return cls(
+            float(arrays["jd"][index]), arrays["longitude"][index], arrays["speed"][index], arrays["sign"][index],
+            house, arrays["nakshatra"][index], arrays["pada"][index], arrays["retrograde"][index]
+        )
+
+    @classmethod
+    def from_dict(cls, positions: dict, jd: float = None) -> "ChartPositions":
+        """Adapter from a calculate_transit_positions-style dict (missing grahas are not allowed)."""
+        rows = [positions[graha.label] for graha in Graha]
+        return cls(
+            jd,
+            np.array([row["sidereal_longitude"] for row in rows], dtype=float),
+            np.array([row.get("speed", 0.0) for row in rows], dtype=float),
+            np.array([ZODIAC_SIGNS.index(row["sign"]) for row in rows]),
+            np.array([row.get("house") or 0 for row in rows]),
+            np.array([NAKSHATRAS.index(row["nakshatra"]) for row in rows]),
+            np.array([row["pada"] for row in rows]),
+            np.array([row["retrograde"] for row in rows], dtype=bool),
+        )
+
+    def with_houses(self, natal_lagna_degree) -> "ChartPositions":
+        """Same positions with whole-sign houses counted from the natal lagna sign."""
+        houses = self._shared[1]
+        if houses is None:
+            houses = self._shared[1] = (self.sign[np.newaxis, :] - np.arange(12)[:, np.newaxis]) % 12 + 1
+            houses.flags.writeable = False
+        return ChartPositions(
+            self.jd, self.longitude, self.speed, self.sign, houses[int(natal_lagna_degree // 30) % 12],
+            self.nakshatra, self.pada, self.retrograde, self._shared
+        )
+
+    def _serialized_rows(self) -> tuple:
+        """
+        (name, degree, sidereal_longitude, speed, sign, nakshatra, pada, retrograde)
+        per graha: everything but the house, built once for these positions and
+        all their with_houses() copies.
+        """
+        if self._shared[0] is None:
+            self._shared[0] = tuple(zip(
+                GRAHAS,
+                [format_dms(longitude) for longitude in self.longitude.tolist()],
+                [round(longitude, 6) for longitude in self.longitude.tolist()],
+                [round(speed, 6) for speed in self.speed.tolist()],
+                [ZODIAC_SIGNS[sign] for sign in self.sign.tolist()],
+                [NAKSHATRAS[nakshatra] for nakshatra in self.nakshatra.tolist()],
+                self.pada.tolist(),
+                self.retrograde.tolist(),
+            ))
+        return self._shared[0]
+
+    @property
+    def degrees(self) -> tuple:
+        """DMS display strings (formatted once)."""
+        return tuple(row[1] for row in self._serialized_rows())
+
+    def position(self, graha) -> PlanetPosition:
+        p = int(graha)
+        return PlanetPosition(
+            Graha(p), float(self.longitude[p]), float(self.speed[p]), Sign(int(self.sign[p])), int(self.house[p]),
+            Nakshatra(int(self.nakshatra[p])), int(self.pada[p]), bool(self.retrograde[p])
+        )
+
+    def positions(self):
+        """PlanetPosition of every graha."""
+        return [self.position(graha) for graha in Graha]
+
+    def to_dict(self) -> dict:
+        """Plain {name: position dict} in the calculate_transit_positions format."""
+        return {
+            name: {
+                "degree": degree,
+                "sidereal_longitude": longitude,
+                "speed": speed,
+                "sign": sign,
+                "house": house or None,
+                "nakshatra": nakshatra,
+                "pada": pada,
+                "retrograde": retrograde
+            }
+            for (name, degree, longitude, speed, sign, nakshatra, pada, retrograde), house
+            in zip(self._serialized_rows(), self.house.tolist())
+        }
+
+    # Mapping adapter: {name: position dict}
+    def __getitem__(self, name):
+        graha = GRAHA_BY_NAME[name]
+        return self.position(graha).to_dict(self._serialized_rows()[graha][1])
+
+    def __iter__(self):
+        return iter(GRAHAS)
+
+    def __len__(self):
+        return len(GRAHAS)
+
+    def __repr__(self):
+        return f"ChartPositions(jd={self.jd}, {self.to_dict()})"
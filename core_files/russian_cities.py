@@ -66,7 +66,7 @@ cities = {
     "липецк": {"latitude": 52.6039, "longitude": 39.5703, "timezone": "Europe/Moscow"},
     "курск": {"latitude": 51.7304, "longitude": 36.1921, "timezone": "Europe/Moscow"},
     "белгород": {"latitude": 50.5956, "longitude": 36.5872, "timezone": "Europe/Moscow"},
-    "тулья": {"latitude": 54.1931, "longitude": 37.6177, "timezone": "Europe/Moscow"},
+    "тула": {"latitude": 54.1931, "longitude": 37.6177, "timezone": "Europe/Moscow"},
     "калуга": {"latitude": 54.5061, "longitude": 36.2514, "timezone": "Europe/Moscow"},
     "брянск": {"latitude": 53.2521, "longitude": 34.3717, "timezone": "Europe/Moscow"},
     "муром": {"latitude": 55.5708, "longitude": 42.0426, "timezone": "Europe/Moscow"},
@@ -76,14 +76,21 @@ cities = {
     "ижевск": {"latitude": 56.8522, "longitude": 53.2115, "timezone": "Europe/Samara"},
     "киров": {"latitude": 58.6034, "longitude": 49.668, "timezone": "Europe/Moscow"},
     "пенза": {"latitude": 53.1751, "longitude": 45.0346, "timezone": "Europe/Moscow"},
-    "астрахань": {"latitude": 46.3497, "longitude": 48.0408, "timezone": "Europe/Astrakhan"},
-    "казань": {"latitude": 55.7903, "longitude": 49.1347, "timezone": "Europe/Moscow"},
     "набережные челны": {"latitude": 55.7436, "longitude": 52.3959, "timezone": "Europe/Moscow"}
 }
 
 def get_city_info(city_name: str):
-    key = city_name.strip().lower()
-    return cities.get(key)
+    """
+    Coordinates and timezone of a city from the compiled offline index
+    (core_files.city_index): spelling variants, Latin spellings and small typos
+    are matched. Returns None for unknown cities.
+    """
+    from core_files.city_index import get_city_index  # индекс собирается из этого справочника
+
+    info = get_city_index().lookup(city_name)
+    if info is None:
+        return None
+    return {"latitude": info["latitude"], "longitude": info["longitude"], "timezone": info["timezone"]}
 
 if __name__ == "__main__":
     city = input("Введите город (столицу региона): ").lower()
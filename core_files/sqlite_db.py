@@ -0,0 +1,43 @@
+"""
+Shared SQLite plumbing for the file-backed stores (chart store, geocode cache,
+response cache backend): one connection per thread, WAL mode so readers run
+alongside the writer from any thread or process, schema created on open.
+"""
+import sqlite3
+import threading
+
+
+class SQLiteDatabase:
+    """
+    Base class for a store in one SQLite file. Subclasses list their
+    CREATE statements in SCHEMA and use _connection() in every method.
+    """
+
+    SCHEMA = ()
+    TIMEOUT = 10.0
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Соединения sqlite3 нельзя делить между потоками
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.TIMEOUT)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Closes the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,111 @@
+"""
+Station finder: exact station-retrograde and station-direct instants.
+
+A station is a zero crossing of the planet's longitudinal speed. The speed is
+sampled with an adaptive step |speed| / MAX_ACCELERATION (the speed cannot change
+sign within such a step), so sampling is sparse far from a station and dense only
+close to it; the crossing is then refined by root finding. Stations depend only on
+time, so they are cached per planet per calendar year.
+"""
+from functools import lru_cache
+
+import swisseph as swe
+
+from core_files.constants import GRAHAS, ZODIAC_SIGNS, STATION_PLANETS
+from core_files.ephemeris import calculate_graha_position
+from core_files.events import find_root, jd_to_utc
+
+# Верхняя граница |d(скорость)/dt| в °/сутки² (измерено на 1900–2100 с запасом)
+MAX_ACCELERATION = {
+    "Меркурий": 0.25,
+    "Венера": 0.055,
+    "Марс": 0.02,
+    "Юпитер": 0.0125,
+    "Сатурн": 0.004,
+}
+
+MIN_STEP = 0.25  # дни
+MAX_STEP = 30.0  # дни
+
+# Сколько дней до и после станции планета считается стационарной
+STATION_ORB = {
+    "Меркурий": 1,
+    "Венера": 2,
+    "Марс": 2,
+    "Юпитер": 4,
+    "Сатурн": 5,
+}
+
+
+def scan_stations(planet: str, start_jd: float, end_jd: float) -> list:
+    """
+    Stations of one planet in [start_jd, end_jd):
+      {"planet", "type": "retrograde" | "direct", "jd", "utc", "longitude", "sign"}
+    """
+    if planet not in MAX_ACCELERATION:
+        raise ValueError(f"No stations for '{planet}', expected one of {STATION_PLANETS}")
+
+    planet_index = GRAHAS.index(planet)
+    max_acceleration = MAX_ACCELERATION[planet]
+
+    def speed(jd):
+        return calculate_graha_position(jd, planet_index)[1]
+
+    stations = []
+    t0, speed0 = start_jd, speed(start_jd)
+    while t0 < end_jd:
+        step = min(max(abs(speed0) / max_acceleration, MIN_STEP), MAX_STEP)
+        t1 = min(t0 + step, end_jd)
+        speed1 = speed(t1)
+
+        if (speed0 < 0) != (speed1 < 0):
+            jd_station = find_root(speed, t0, t1, speed0, speed1)
+            longitude, _ = calculate_graha_position(jd_station, planet_index)
+            stations.append({
+                "planet": planet,
+                "type": "retrograde" if speed1 < 0 else "direct",
+                "jd": jd_station,
+                "utc": jd_to_utc(jd_station),
+                "longitude": longitude,
+                "sign": ZODIAC_SIGNS[int(longitude // 30) % 12],
+            })
+
+        t0, speed0 = t1, speed1
+
+    return stations
+
+
+@lru_cache(maxsize=1024)
+def stations_in_year(planet: str, year: int) -> tuple:
+    """Stations of a planet during a calendar year (UTC), cached per process."""
+    return tuple(scan_stations(planet, swe.julday(year, 1, 1, 0.0), swe.julday(year + 1, 1, 1, 0.0)))
+
+
+def find_stations(start_jd: float, end_jd: float, planets=None) -> list:
+    """
+    Stations of the given planets (default STATION_PLANETS) in [start_jd, end_jd), sorted by time.
+    Whole years are taken from the per-year cache.
+    """
+    first_year = swe.revjul(start_jd)[0]
+    last_year = swe.revjul(end_jd)[0]
+
+    stations = [
+        dict(station)
+        for planet in (planets or STATION_PLANETS)
+        for year in range(first_year, last_year + 1)
+        for station in stations_in_year(planet, year)
+        if start_jd <= station["jd"] < end_jd
+    ]
+    stations.sort(key=lambda station: station["jd"])
+    return stations
+
+
+def stationary_planets(jd: float) -> set:
+    """
+    Planets within their STATION_ORB (days) of a station at the given moment.
+    """
+    return {
+        station["planet"]
+        for station in find_stations(jd - max(STATION_ORB.values()), jd + max(STATION_ORB.values()))
+        if abs(station["jd"] - jd) <= STATION_ORB[station["planet"]]
+    }
@@ -0,0 +1,61 @@
+"""
+Swiss Ephemeris façade: the only module that touches pyswisseph configuration.
+
+pyswisseph is built with thread-local library state: the sidereal mode, the
+ephemeris path, open files and the internal position caches belong to the
+calling thread, and a new thread starts with the defaults (Fagan/Bradley
+ayanamsa). Instead of resetting the mode and path on every call, the façade
+configures each thread once, on its first calculation, so threads never share
+or overwrite each other's state and can calculate in parallel. Process pools
+get a separate library per worker and are configured the same way.
+
+Pure calendar functions (swe.julday, swe.revjul) keep no state and are used directly.
+"""
+import threading
+
+import swisseph as swe
+
+EPHE_PATH = "."
+SIDEREAL_MODE = swe.SIDM_LAHIRI
+
+_thread_state = threading.local()
+
+
+def configure():
+    """Sets the sidereal mode and ephemeris path for the calling thread (once per thread)."""
+    if not getattr(_thread_state, "configured", False):
+        swe.set_sid_mode(SIDEREAL_MODE)
+        swe.set_ephe_path(EPHE_PATH)
+        _thread_state.configured = True
+
+
+def calc_ut(jd_ut: float, body_id: int, flags: int = swe.FLG_SWIEPH | swe.FLG_SPEED):
+    """swe.calc_ut in the configured thread state: (position tuple, return flag)."""
+    configure()
+    return swe.calc_ut(jd_ut, body_id, flags)
+
+
+def get_ayanamsa_ut(jd_ut: float) -> float:
+    """Lahiri ayanamsa."""
+    configure()
+    return swe.get_ayanamsa_ut(jd_ut)
+
+
+def houses_ex(jd_ut: float, latitude: float, longitude: float, house_system: bytes = b'P'):
+    """swe.houses_ex in the configured thread state: (cusps, ascmc)."""
+    configure()
+    return swe.houses_ex(jd_ut, latitude, longitude, house_system)
+
+
+def tropical_positions(jd_ut: float, body_ids) -> tuple:
+    """
+    Ayanamsa and tropical (longitude, speed) of several bodies for one date:
+    (ayanamsa, [(longitude, speed), ...]).
+    """
+    configure()
+    ayanamsa = swe.get_ayanamsa_ut(jd_ut)
+    positions = []
+    for body_id in body_ids:
+        data, _ = swe.calc_ut(jd_ut, body_id)
+        positions.append((data[0], data[3]))
+    return ayanamsa, positions
@@ -1,5 +1,15 @@
 import swisseph as swe
-from core_files.astro_report import get_house_whole_sign, deg_to_dms_within_house, get_nakshatra_and_pada, get_zodiac_sign
+from core_files.transit_snapshot import get_transit_snapshot, get_transit_snapshots
+from core_files.natal_context import NatalContext
+from core_files.positions import ChartPositions, Graha
+from core_files.transit_scoring import (
+    planet_house_score,
+    transit_state_arrays,
+    ruler_index_array,
+    score_houses,
+    scores_to_houses,
+    stationary_mask,
+)
 from core_files.constants import (
     benefic_planets,
     malefic_planets,
@@ -25,6 +35,24 @@ planet_id_map = {
     "Лагна": None,
 }
 
+def natal_planets_of(natal_positions):
+    """
+    Натальные планеты из словаря или NatalContext (все функции анализа принимают оба варианта).
+    """
+    if isinstance(natal_positions, NatalContext):
+        return natal_positions.planets
+    return natal_positions
+
+
+def transit_planets_of(transit_positions) -> dict:
+    """
+    Транзитные планеты как словарь {планета: данные} из словаря или ChartPositions.
+    """
+    if isinstance(transit_positions, ChartPositions):
+        return transit_positions.to_dict()
+    return transit_positions
+
+
 def calculate_drishti(planet_name, current_house):
     """
     Возвращает список домов, которые аспектирует планета согласно правилам дришти.
@@ -98,61 +126,25 @@ def get_transit_planets_aspecting_houses(transit_positions):
 def calculate_transit_positions(jd_ut, natal_lagna_degree, latitude, longitude):
     """
     Расчёт положения транзитных планет в сидерическом зодиаке, их домов, накшатр и ретроградности.
+    Положения берутся из общего для всех карт снимка на jd_ut, от карты зависят только дома.
     """
-    swe.set_sid_mode(swe.SIDM_LAHIRI)
-    swe.set_ephe_path('.')
-
-    lagna = natal_lagna_degree
-    ayanamsa = swe.get_ayanamsa_ut(jd_ut)
-
-    planets = {
-        "Солнце": swe.SUN,
-        "Луна": swe.MOON,
-        "Марс": swe.MARS,
-        "Меркурий": swe.MERCURY,
-        "Юпитер": swe.JUPITER,
-        "Венера": swe.VENUS,
-        "Сатурн": swe.SATURN,
-        "Раху": swe.MEAN_NODE,
-        "Кету": -swe.MEAN_NODE
-    }
+    return get_transit_snapshot(jd_ut).project(natal_lagna_degree)
 
-    results = {}
 
-    for name, planet_id in planets.items():
-        if planet_id is not None and planet_id >= 0:
-            data, flag = swe.calc_ut(jd_ut, planet_id)
-            lon = data[0]
-            speed = data[3]
-            is_retrograde = speed < 0
-        else:
-            # Для Кету берем противоположность Раху
-            data, flag = swe.calc_ut(jd_ut, swe.MEAN_NODE)
-            lon = (data[0] + 180) % 360
-            speed = data[3]
-            is_retrograde = speed < 0
-
-        sid_lon = lon - ayanamsa
-        if sid_lon < 0:
-            sid_lon += 360
-
-        house = get_house_whole_sign(sid_lon, lagna)
-        house_start = ((int(lagna // 30) + house - 1) % 12) * 30
-        deg, minute, sec = deg_to_dms_within_house(sid_lon, house_start)
-        degree_str = f"{deg}°{minute}'{sec}''"
-        sign = get_zodiac_sign(sid_lon)
-        nakshatra, pada = get_nakshatra_and_pada(sid_lon)
-
-        results[name] = {
-            "degree": degree_str,
-            "sign": sign,
-            "house": house,
-            "nakshatra": nakshatra,
-            "pada": pada,
-            "retrograde": is_retrograde
-        }
+def calculate_transit_positions_range(jd_array, natal_lagna_degree, latitude, longitude):
+    """
+    Транзитные положения для массива юлианских дней за один проход эфемерид.
+    Возвращает список словарей в формате calculate_transit_positions.
+    """
+    return [snapshot.project(natal_lagna_degree) for snapshot in get_transit_snapshots(jd_array)]
 
-    return results
+
+def calculate_transit_chart_positions_range(jd_array, natal_lagna_degree):
+    """
+    Компактный вариант calculate_transit_positions_range: ChartPositions на каждый день
+    (массивы без словарей; to_dict() — формат calculate_transit_positions).
+    """
+    return [snapshot.chart_positions(natal_lagna_degree) for snapshot in get_transit_snapshots(jd_array)]
 
 def evaluate_planet_in_house(planet, house):
     """
@@ -261,8 +253,33 @@ def analyze_double_aspects_from_aspects(transit_positions, aspects_data):
 
     return result
 
+def get_sade_sati_house_diff(transit_positions, natal_positions):
+    """
+    Расстояние в домах между транзитным Сатурном и натальной Луной (0–6).
+    Возвращает None, если данных недостаточно.
+    """
+    natal_house = (natal_planets_of(natal_positions).get('Луна') or {}).get('house')
+    if isinstance(transit_positions, ChartPositions):
+        saturn_house = int(transit_positions.house[Graha.SATURN]) or None
+    else:
+        saturn_house = (transit_positions.get('Сатурн') or {}).get('house')
+    if natal_house is None or saturn_house is None:
+        return None
+
+    diff = abs(saturn_house - natal_house)
+    return diff if diff <= 6 else 12 - diff
+
+
+def is_sade_sati_active(transit_positions, natal_positions):
+    """
+    True/False — активна ли Саде Сати, None — если данных недостаточно.
+    """
+    diff = get_sade_sati_house_diff(transit_positions, natal_positions)
+    return None if diff is None else diff <= 1
+
+
 def check_sade_sati(transit_positions, natal_positions):
-    natal_moon = natal_positions.get('Луна')
+    natal_moon = natal_planets_of(natal_positions).get('Луна')
     saturn = transit_positions.get('Сатурн')
 
     if not natal_moon or not saturn:
@@ -274,8 +291,7 @@ def check_sade_sati(transit_positions, natal_positions):
     if natal_house is None or saturn_house is None:
         return "=== ОТЧЁТ ПО САДЕ САТИ ===\nНет информации о домах Луны или Сатурна."
 
-    diff = abs(saturn_house - natal_house)
-    diff = diff if diff <= 6 else 12 - diff
+    diff = get_sade_sati_house_diff(transit_positions, natal_positions)
 
     moon_deg = natal_moon.get('degree', '?')
     moon_sign = natal_moon.get('sign', '?')
@@ -394,7 +410,12 @@ def generate_report(houses_analysis):
     return "\n".join(result)
 
 
-def evaluate_house_ruler(ruler, planet_house_map, transit_positions):
+def evaluate_house_ruler(ruler, planet_house_map, transit_positions, stationary=None):
+    """
+    Оценка управителя дома по транзиту: дом, знак, движение и связи.
+    stationary — планеты, стоящие у станции (см. stations.stationary_planets):
+    движение такого управителя оценивается в 0 баллов.
+    """
     reason_parts = []
     score_by_house = 0
     score_by_sign = 0
@@ -432,7 +453,10 @@ def evaluate_house_ruler(ruler, planet_house_map, transit_positions):
 
     # Оценка движения (ретроградность или прямое движение)
     retrograde = ruler_data.get("retrograde", False)
-    if retrograde:
+    if stationary and ruler in stationary:
+        score_by_motion = 0
+        reason_parts.append("Управитель стационарен (0 баллов)")
+    elif retrograde:
         score_by_motion = -1
         reason_parts.append("Управитель ретрограден (-1 балл)")
     else:
@@ -491,23 +515,32 @@ def evaluate_house_ruler(ruler, planet_house_map, transit_positions):
 
 
 
-def analyze_transits_full(natal_positions, transit_positions):
+def analyze_transits_full(natal_positions, transit_positions, natal_rulers=None, stationary=None, with_report=True):
     """
     Основная функция для анализа транзитов.
     Возвращает текстовый отчёт и подробный словарь с анализом домов.
+    natal_positions — словарь натальных планет или NatalContext.
+    natal_rulers — заранее вычисленный get_natal_house_rulers (для серийных расчётов).
+    stationary — стационарные планеты (движение управителя = 0 баллов).
+    transit_positions — словарь транзитных планет или ChartPositions.
+    with_report=False — без текстового отчёта (вместо него None).
     """
+    transit_positions = transit_planets_of(transit_positions)
 
     # Определение управителей домов
-    house_rulers = get_house_rulers(natal_positions, transit_positions)
+    house_rulers = get_house_rulers(natal_positions, transit_positions, natal_rulers)
     house_rulers_map = {house: ruler for house, (ruler, _) in house_rulers.items()}
-    planet_house_map = {p: d["house"] for p, d in natal_positions.items()}
+    if isinstance(natal_positions, NatalContext):
+        planet_house_map = natal_positions.house_map
+    else:
+        planet_house_map = {p: d["house"] for p, d in natal_positions.items()}
 
     # Оценка управителей домов
     rulers_status = {}
     for house_num, (ruler, transit_house) in house_rulers.items():
         if not ruler:
             continue
-        rulers_status[house_num] = evaluate_house_ruler(ruler, planet_house_map, transit_positions)
+        rulers_status[house_num] = evaluate_house_ruler(ruler, planet_house_map, transit_positions, stationary)
 
     # Оценка планет в домах
     planets_scores = {}
@@ -516,8 +549,7 @@ def analyze_transits_full(natal_positions, transit_positions):
         if h is None:
             continue
         reason = evaluate_planet_in_house(planet, h)
-        score = 1 if "благоприятная" in reason else -1 if "вредная" in reason else 0
-        planets_scores.setdefault(h, {})[planet] = {"score": score, "reason": reason}
+        planets_scores.setdefault(h, {})[planet] = {"score": planet_house_score(planet, h), "reason": reason}
 
     # Анализ аспектов транзитных планет
     aspects = transit_aspect_analysis(transit_positions, natal_positions)
@@ -563,14 +595,29 @@ def analyze_transits_full(natal_positions, transit_positions):
         transit_aspecting_houses
     )
 
-    report = generate_report(houses_analysis)
+    report = generate_report(houses_analysis) if with_report else None
     return report, houses_analysis
 
-def get_house_rulers(natal_positions, transit_positions):
+def analyze_transits_scores(natal_positions, transit_positions, natal_rulers=None, stationary=None):
     """
-    Возвращает словарь: дом -> (управитель дома по знаку, дом транзитного положения управителя).
-    Исходит из знака Лагны и порядка знаков.
+    Только числовые баллы по домам (без текстов причин и отчёта).
+    Возвращает {дом: {"total_score", "score_ruler", "score_planets", "score_aspects", "score_double_aspects"}}.
     """
+    if natal_rulers is None:
+        natal_rulers = get_natal_house_rulers(natal_positions)
+
+    houses, retrograde, signs = transit_state_arrays(transit_positions)
+    scores = score_houses(houses, retrograde, signs, ruler_index_array(natal_rulers), stationary_mask(stationary))
+    return scores_to_houses(scores)
+
+
+def get_natal_house_rulers(natal_positions):
+    """
+    Возвращает словарь: дом -> управитель дома по знаку (зависит только от натальной Лагны).
+    """
+    if isinstance(natal_positions, NatalContext):
+        return natal_positions.house_rulers
+
     lagna_data = natal_positions.get("Лагна")
     if not lagna_data:
         return {}
@@ -587,13 +634,22 @@ def get_house_rulers(natal_positions, transit_positions):
     except ValueError:
         return {}
 
-    result = {}
-    for i in range(12):
-        house_num = i + 1
-        sign_idx = (start_idx + i) % 12
-        sign = zodiac_order[sign_idx]
-        ruler = SIGN_RULERS.get(sign)
+    return {
+        i + 1: SIGN_RULERS.get(zodiac_order[(start_idx + i) % 12])
+        for i in range(12)
+    }
+
+
+def get_house_rulers(natal_positions, transit_positions, natal_rulers=None):
+    """
+    Возвращает словарь: дом -> (управитель дома по знаку, дом транзитного положения управителя).
+    Исходит из знака Лагны и порядка знаков.
+    """
+    if natal_rulers is None:
+        natal_rulers = get_natal_house_rulers(natal_positions)
 
+    result = {}
+    for house_num, ruler in natal_rulers.items():
         transit_house = "-"
         if ruler and ruler in transit_positions:
             transit_house = transit_positions[ruler].get("house", "-")
@@ -603,24 +659,6 @@ def get_house_rulers(natal_positions, transit_positions):
     return result
 
 
-
-def degree_str_to_float(degree_str: str) -> float:
-    """
-    Преобразует строку с градусами в число с дробной частью.
-    Формат входа: "dd°mm'ss''"
-    """
-    try:
-        parts = degree_str.replace("''", "").split("°")
-        deg = float(parts[0])
-        minutes, seconds = parts[1].split("'")
-        minutes = float(minutes)
-        seconds = float(seconds)
-        return deg + minutes / 60 + seconds / 3600
-    except Exception as e:
-        print(f"[ОШИБКА] Неверное значение градуса: '{degree_str}': {e}")
-        return 0.0
-
-
 # --------- НОВАЯ ФУНКЦИЯ ДЛЯ ПОДРОБНОГО АНАЛИЗА ТРАНЗИТНЫХ ПЛАНЕТ ---------
 
 def analyze_transit_planets_detailed(transit_positions):
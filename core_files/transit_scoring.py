@@ -0,0 +1,172 @@
+"""
+Numeric scoring core for transit house analysis.
+
+Scores are computed on small integer arrays (12 houses × 9 grahas, columns follow
+GRAHAS) with the same rules as analyze_transits_full, but without building any
+reason text. Grahas outside GRAHAS are ignored.
+"""
+import numpy as np
+
+from core_files.constants import (
+    GRAHAS,
+    ZODIAC_SIGNS,
+    benefic_planets,
+    malefic_planets,
+    dusthana_houses,
+    trikon_houses,
+    kendra_houses,
+    DRISHTI_MAP,
+    friendly_signs_map,
+    enemy_signs_map,
+)
+from core_files.positions import ChartPositions
+
+PLANET_INDEX = {name: i for i, name in enumerate(GRAHAS)}
+
+# +1 благоприятная, -1 вредная планета
+NATURE = np.array([1 if p in benefic_planets else -1 if p in malefic_planets else 0 for p in GRAHAS])
+
+
+def planet_house_score(planet, house):
+    """
+    Балл планеты по положению в доме (правила evaluate_planet_in_house).
+    """
+    if house in dusthana_houses:
+        return -1 if planet in malefic_planets else 1
+    if house in trikon_houses or house in kendra_houses:
+        return 1 if planet in benefic_planets else -1
+    return 0
+
+
+# PLANET_HOUSE_SCORE[h - 1, p] — балл планеты p в доме h
+PLANET_HOUSE_SCORE = np.array([[planet_house_score(p, h) for p in GRAHAS] for h in range(1, 13)])
+
+# Балл управителя по транзитному дому: дустхана, трикона, прочие
+RULER_HOUSE_SCORE = np.array([-1 if h in dusthana_houses else 1 if h in trikon_houses else 0.5 for h in range(1, 13)])
+
+# SIGN_SCORE[p, s] — дружественный (+1) или враждебный (-1) знак для планеты
+SIGN_SCORE = np.array([
+    [1 if s in friendly_signs_map.get(p, []) else -1 if s in enemy_signs_map.get(p, []) else 0 for s in ZODIAC_SIGNS]
+    for p in GRAHAS
+])
+
+# ASPECTS[p, from_house - 1, to_house - 1] — дришти планеты p из дома from_house
+ASPECTS = np.zeros((len(GRAHAS), 12, 12), dtype=int)
+for _p, _planet in enumerate(GRAHAS):
+    for _house in range(1, 13):
+        for _offset in DRISHTI_MAP.get(_planet, [7]):
+            ASPECTS[_p, _house - 1, (_house + _offset - 2) % 12] = 1
+
+SCORE_KEYS = ("score_ruler", "score_planets", "score_aspects", "score_double_aspects")
+
+
+def transit_state_arrays(transit_positions):
+    """
+    Packs transit positions into (houses, retrograde, signs) arrays.
+    ChartPositions already hold them; for a dict missing grahas get house 0 and sign -1.
+    """
+    if isinstance(transit_positions, ChartPositions):
+        return transit_positions.house, transit_positions.retrograde, transit_positions.sign
+
+    houses = np.zeros(len(GRAHAS), dtype=int)
+    retrograde = np.zeros(len(GRAHAS), dtype=bool)
+    signs = np.full(len(GRAHAS), -1)
+
+    for name, data in transit_positions.items():
+        p = PLANET_INDEX.get(name)
+        if p is None:
+            continue
+        house = data.get("house")
+        if house is not None:
+            houses[p] = house
+        retrograde[p] = data.get("retrograde", False)
+        sign = data.get("sign")
+        if sign in ZODIAC_SIGNS:
+            signs[p] = ZODIAC_SIGNS.index(sign)
+
+    return houses, retrograde, signs
+
+
+def ruler_index_array(natal_rulers):
+    """
+    Maps {house: ruler name} to an array of 12 graha indexes (-1 when the ruler is unknown).
+    """
+    return np.array([PLANET_INDEX.get(natal_rulers.get(h), -1) for h in range(1, 13)])
+
+
+def stationary_mask(stationary):
+    """Boolean array over GRAHAS for a collection of stationary planet names (None -> all False)."""
+    return np.array([p in stationary for p in GRAHAS]) if stationary else np.zeros(len(GRAHAS), dtype=bool)
+
+
+def score_houses(houses, retrograde, signs, ruler_index, stationary=None):
+    """
+    Per-house scores by category.
+    Returns a dict of arrays of shape (12,): score_ruler, score_planets,
+    score_aspects, score_double_aspects and total_score.
+    stationary is an optional boolean array: a stationary ruler gets 0 for motion.
+    """
+    present = houses > 0
+    planets = np.flatnonzero(present)
+    h0 = houses - 1
+
+    # Планеты в домах
+    occupancy = np.zeros((12, len(GRAHAS)), dtype=int)
+    occupancy[h0[planets], planets] = 1
+    score_planets = (occupancy * PLANET_HOUSE_SCORE).sum(axis=1)
+
+    # aspected[h, p] — планета p аспектирует дом h
+    aspected = np.zeros((12, len(GRAHAS)), dtype=int)
+    aspected[:, planets] = ASPECTS[planets, h0[planets]].T
+
+    # Аспекты, исключая аспект управителя на свой дом
+    aspect_mask = aspected.copy()
+    has_ruler = ruler_index >= 0
+    aspect_mask[np.flatnonzero(has_ruler), ruler_index[has_ruler]] = 0
+    score_aspects = aspect_mask @ NATURE
+
+    # Состояние каждой планеты как управителя: дом, знак, движение, связи
+    house_part = np.where(present, RULER_HOUSE_SCORE[h0 % 12], 0)
+    sign_part = np.where(signs >= 0, SIGN_SCORE[np.arange(len(GRAHAS)), signs % 12], 0)
+    motion_part = np.where(retrograde, -1, 1)
+    if stationary is not None:
+        motion_part = np.where(stationary, 0, motion_part)
+
+    same_house = (houses[:, None] == houses[None, :]) & present[:, None] & present[None, :]
+    under_aspect = aspected[h0 % 12].astype(bool) & present[:, None]
+    connections = (same_house | under_aspect).astype(int)
+    np.fill_diagonal(connections, 0)
+    connection_part = connections @ NATURE
+
+    ruler_scores = house_part + sign_part + motion_part + connection_part
+    score_ruler = np.where(has_ruler, ruler_scores[ruler_index], 0)
+
+    # Двойные аспекты Юпитера и Сатурна отмечаются в причинах, но баллов не дают
+    score_double_aspects = np.zeros(12, dtype=int)
+
+    return {
+        "score_ruler": score_ruler,
+        "score_planets": score_planets,
+        "score_aspects": score_aspects,
+        "score_double_aspects": score_double_aspects,
+        "total_score": score_ruler + score_planets + score_aspects + score_double_aspects,
+    }
+
+
+def _to_number(value):
+    """numpy scalar -> int when integral (as in the text-based analysis), float otherwise."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def scores_to_houses(scores):
+    """
+    Converts score arrays into {house: {"total_score": ..., "score_ruler": ..., ...}}.
+    """
+    return {
+        h: {
+            "total_score": _to_number(scores["total_score"][h - 1]),
+            **{key: _to_number(scores[key][h - 1]) for key in SCORE_KEYS}
+        }
+        for h in range(1, 13)
+    }
@@ -0,0 +1,98 @@
+"""
+Chart-independent transit snapshots.
+
+Sidereal longitude, sign, DMS within the sign, nakshatra, pada and retrograde
+status of the grahas are the same for every natal chart at a given moment; only
+the whole-sign house depends on the natal lagna. A TransitSnapshot holds the
+former once per Julian day; chart_positions() adds the houses for one chart
+(compact ChartPositions) and project() returns them as a plain dict.
+Snapshots are immutable and shared by all requests through a process-wide LRU.
+"""
+import threading
+from collections import OrderedDict
+
+from core_files.ephemeris import calculate_graha_arrays, get_ephemeris_table
+from core_files.positions import ChartPositions
+
+TRANSIT_SNAPSHOT_CACHE_SIZE = 4096
+
+
+class TransitSnapshot:
+    """
+    Positions of all grahas at one Julian day, without houses (a read-only ChartPositions).
+    """
+
+    __slots__ = ("jd", "positions")
+
+    def __init__(self, jd: float, positions: ChartPositions):
+        object.__setattr__(self, "jd", jd)
+        object.__setattr__(self, "positions", positions)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TransitSnapshot is immutable")
+
+    @classmethod
+    def from_arrays(cls, arrays, index):
+        """Builds a snapshot from one row of calculate_graha_arrays."""
+        positions = ChartPositions.from_arrays(arrays, index)
+        for name in ("longitude", "speed", "sign", "house", "nakshatra", "pada", "retrograde"):
+            getattr(positions, name).flags.writeable = False
+        return cls(positions.jd, positions)
+
+    def chart_positions(self, natal_lagna_degree) -> ChartPositions:
+        """Compact positions for a chart: whole-sign houses counted from the natal lagna sign."""
+        return self.positions.with_houses(natal_lagna_degree)
+
+    def project(self, natal_lagna_degree) -> dict:
+        """Transit positions for a chart as a plain dict (calculate_transit_positions format)."""
+        return self.chart_positions(natal_lagna_degree).to_dict()
+
+
+_snapshot_cache = OrderedDict()
+_snapshot_lock = threading.Lock()
+# Ephemeris table the cached snapshots were calculated with (cache is dropped when it changes)
+_snapshot_source = None
+
+
+def get_transit_snapshots(jd_array) -> list:
+    """
+    Snapshots for a sequence of Julian days. Cached days are reused, the missing
+    ones are calculated together in one calculate_graha_arrays pass.
+    """
+    global _snapshot_source
+    jds = [float(jd) for jd in jd_array]
+
+    with _snapshot_lock:
+        if get_ephemeris_table() is not _snapshot_source:
+            _snapshot_cache.clear()
+            _snapshot_source = get_ephemeris_table()
+
+        found = {}
+        for jd in jds:
+            snapshot = _snapshot_cache.get(jd)
+            if snapshot is not None:
+                _snapshot_cache.move_to_end(jd)
+                found[jd] = snapshot
+
+    missing = list(dict.fromkeys(jd for jd in jds if jd not in found))
+    if missing:
+        arrays = calculate_graha_arrays(missing)
+        computed = {jd: TransitSnapshot.from_arrays(arrays, i) for i, jd in enumerate(missing)}
+        found.update(computed)
+
+        with _snapshot_lock:
+            _snapshot_cache.update(computed)
+            while len(_snapshot_cache) > TRANSIT_SNAPSHOT_CACHE_SIZE:
+                _snapshot_cache.popitem(last=False)
+
+    return [found[jd] for jd in jds]
+
+
+def get_transit_snapshot(jd: float) -> TransitSnapshot:
+    """Snapshot for one Julian day (cached)."""
+    return get_transit_snapshots([jd])[0]
+
+
+def clear_transit_snapshot_cache():
+    with _snapshot_lock:
+        _snapshot_cache.clear()
@@ -1,35 +1,11 @@
 import swisseph as swe
 from core_files.astro_report import get_planet_positions_and_houses  # твой базовый движок
 from core_files.transit_analys import transit_aspect_analysis
-
-# Устанавливаем сидерическую систему Лахири
-swe.set_sid_mode(swe.SIDM_LAHIRI)
-swe.set_ephe_path(".")
-
-
-def dms_str_to_float(dms_str):
-    try:
-        dms_str = dms_str.replace("'''", "''").strip()
-        deg_part, rest = dms_str.split("°")
-
-        # Разбиваем rest на минуты и секунды, при этом по первому апострофу:
-        min_part, sec_part = rest.split("'", 1)  # maxsplit=1
-
-        # Убираем все апострофы и пробелы из секунд
-        sec_part = sec_part.replace("'", "").strip()
-
-        deg = float(deg_part)
-        minute = float(min_part)
-        second = float(sec_part)
-
-        return deg + minute / 60 + second / 3600
-    except Exception as e:
-        print(f"[ОШИБКА] Неверное значение градуса: '{dms_str}' или лагна: {e}")
-        return None
+from core_files.swiss_ephemeris import calc_ut
 
 
 def is_retrograde(jd_ut, planet_id):
-    pos, ret_flag = swe.calc_ut(jd_ut, planet_id, swe.FLG_SPEED)
+    pos, ret_flag = calc_ut(jd_ut, planet_id, swe.FLG_SPEED)
     speed = pos[3]
     return speed < 0
 
@@ -1,41 +1,31 @@
 import swisseph as swe
+from bisect import bisect_left, bisect_right
 from datetime import datetime
+from functools import lru_cache
 
 from core_files.lunar_module import nakshatra_lords, NAKSHATRAS
 from core_files.constants import VIMSHOTTARI_DURATIONS, YEAR_IN_DAYS, NAKSHATRA_LENGTH
+from core_files.degrees import parse_dms
 
 NAKSHATRA_NAMES = NAKSHATRAS
 
-def degree_str_to_float(degree_str: str) -> float:
-    """
-    Converts a string formatted as "26°43'38''" into a decimal degree (float).
-    """
-    try:
-        parts = degree_str.replace("''", "").split("°")
-        deg = float(parts[0])
-        min_sec = parts[1]
-        minutes, seconds = min_sec.split("'")
-        minutes = float(minutes)
-        seconds = float(seconds)
-        return deg + minutes / 60 + seconds / 3600
-    except Exception as e:
-        print(f"Ошибка при парсинге градусов '{degree_str}': {e}")
-        return 0.0
-
-def calculate_fraction_in_nakshatra(degree_str: str, pada: int) -> float:
-    """
-    Calculates the consumed fraction of the Nakshatra based on degree and pada.
-    """
-    total_degrees = degree_str_to_float(degree_str)
-    nakshatra_pos = total_degrees % NAKSHATRA_LENGTH
-    # Accounting for position within the pada (each pada is 1/4 of a Nakshatra)
-    pada_fraction_degrees = (pada - 1) * (NAKSHATRA_LENGTH / 4)
-    precise_pos = nakshatra_pos + pada_fraction_degrees
-    fraction = precise_pos / NAKSHATRA_LENGTH
-    # Correct if position exceeds Nakshatra boundaries
-    if fraction >= 1:
-        fraction -= 1
-    return fraction
+def calculate_fraction_in_nakshatra(moon_data: dict) -> float:
+    """
+    Calculates the consumed fraction of the Moon's Nakshatra.
+    Uses the absolute "sidereal_longitude"; older charts only carry the degree
+    within the sign, which is placed inside the known nakshatra instead.
+    """
+    longitude = moon_data.get("sidereal_longitude")
+    if longitude is not None:
+        return (float(longitude) % NAKSHATRA_LENGTH) / NAKSHATRA_LENGTH
+
+    nakshatra_start = NAKSHATRAS.index(moon_data["nakshatra"]) * NAKSHATRA_LENGTH
+    # Знак неизвестен: накшатра (13°20') короче знака, поэтому смещение от её начала однозначно
+    offset = (parse_dms(moon_data["degree"]) - nakshatra_start) % 30
+    if offset >= NAKSHATRA_LENGTH:
+        # Округление секунд вынесло градус за границу накшатры
+        offset = 0.0 if offset > (30 + NAKSHATRA_LENGTH) / 2 else NAKSHATRA_LENGTH
+    return offset / NAKSHATRA_LENGTH
 
 def jd_to_date(jd):
     """
@@ -51,16 +41,16 @@ def calculate_vimshottari_dasha_full(jd_birth: float, moon_data: dict):
     Calculates the full sequence of Mahadashas starting from birth.
     """
     # Validate required fields
-    if "degree" not in moon_data or "pada" not in moon_data:
-        raise ValueError("В moon_data должны быть поля 'degree' и 'pada'")
-
-    # Calculate precise position within the Nakshatra including pada
-    fraction_in_nakshatra = calculate_fraction_in_nakshatra(moon_data["degree"], moon_data["pada"])
+    if "sidereal_longitude" not in moon_data and "degree" not in moon_data:
+        raise ValueError("В moon_data должно быть поле 'sidereal_longitude' или 'degree'")
 
     nakshatra_name = moon_data.get("nakshatra")
     if nakshatra_name is None:
         raise ValueError("В moon_data отсутствует поле 'nakshatra'")
 
+    # Calculate precise position within the Nakshatra
+    fraction_in_nakshatra = calculate_fraction_in_nakshatra(moon_data)
+
     # Determine Nakshatra Lord
     start_planet = nakshatra_lords.get(nakshatra_name)
     if start_planet is None:
@@ -266,35 +256,229 @@ def find_active_period(periods, current_jd):
     return None
 
 
-def get_vimshottari_dasha_states(jd_transit, jd_birth, moon_data):
+# Level names stored in period["level"] and keys of the active-state dict, from Maha to Prana
+DASHA_LEVEL_NAMES = ("dasha", "antara", "pratyantara", "sookshma", "prana")
+DASHA_STATE_KEYS = ("mahadasha", "antara", "pratyantara", "sookshma", "prana")
+
+# Levels stored in full per chart (9 + 81 + 729 periods); Sookshma and Prana
+# (6561 and 59049 periods) are expanded only for the branch that is queried
+EAGER_DASHA_LEVELS = 3
+
+VIMSHOTTARI_PLANETS = [p[0] for p in VIMSHOTTARI_DURATIONS]
+
+
+def iter_sub_periods(planet: str, start_jd: float, end_jd: float):
     """
-    Determines active Maha, Antara, and Pratyantara dashas for a specific transit date.
+    Lazily yields the 9 sub-periods of a period as (planet, start_jd, end_jd, duration_days):
+    Vimshottari order from the period's own planet, in proportion years / 120
+    (same arithmetic as calculate_antara_dashas).
     """
-    # Calculate Mahadashas
-    mahadashas = calculate_vimshottari_dasha_full(jd_birth, moon_data)
-    # Find active Mahadasha based on transit date
-    active_maha = find_active_period(mahadashas, jd_transit)
-    if not active_maha:
-        return None
+    total_days = end_jd - start_jd
+    start_index = VIMSHOTTARI_PLANETS.index(planet)
+    current_start_jd = start_jd
+    for sub_planet, years in VIMSHOTTARI_DURATIONS[start_index:] + VIMSHOTTARI_DURATIONS[:start_index]:
+        duration_days = total_days * (years / 120)
+        sub_end_jd = current_start_jd + duration_days
+        yield sub_planet, current_start_jd, sub_end_jd, duration_days
+        current_start_jd = sub_end_jd
 
-    # Calculate Antardashas within the active Mahadasha
-    antaradas = calculate_antara_dashas(active_maha['planet'], active_maha['start_jd'], active_maha['end_jd'])
-    active_antara = find_active_period(antaradas, jd_transit)
-    if not active_antara:
-        return None
 
-    # Calculate Pratyantardashas within the active Antardasha
-    pratyantaradas = calculate_antara_dashas(active_antara['planet'], active_antara['start_jd'],
-                                             active_antara['end_jd'])
-    active_pratyantara = find_active_period(pratyantaradas, jd_transit)
-    if not active_pratyantara:
-        return None
+@lru_cache(maxsize=4096)
+def sub_periods(planet: str, start_jd: float, end_jd: float) -> tuple:
+    """Sub-periods of one period (iter_sub_periods), cached per process."""
+    return tuple(iter_sub_periods(planet, start_jd, end_jd))
+
 
-    return {
-        "mahadasha": active_maha,
-        "antara": active_antara,
-        "pratyantara": active_pratyantara,
-    }
+class DashaTimeline:
+    """
+    Vimshottari periods of one chart in flat sorted arrays per level.
+
+    Level k holds 9 ** (k + 1) periods in chronological order; the children of
+    period i are the indexes 9 * i ... 9 * i + 8 of the next level. Maha, Antara
+    and Pratyantara are built once; Sookshma and Prana (depth 4 and 5) are generated
+    on demand only for the parents containing the requested instant or window.
+    Active periods are found with bisect inside the parent's children, and no
+    period dicts are built until they are requested.
+    """
+
+    def __init__(self, jd_birth: float, moon_data: dict, depth: int = 3):
+        if not 1 <= depth <= len(DASHA_LEVEL_NAMES):
+            raise ValueError(f"depth must be between 1 and {len(DASHA_LEVEL_NAMES)}")
+
+        self.depth = depth
+        self.starts = []
+        self.ends = []
+        self.durations = []
+        self.planets = []
+        # Period dicts of the stored levels built on request, by (level, index); shared and read-only
+        self._periods = {}
+
+        mahadashas = calculate_vimshottari_dasha_full(jd_birth, moon_data)
+        self._add_level(
+            [m["start_jd"] for m in mahadashas],
+            [m["end_jd"] for m in mahadashas],
+            [m["duration_days"] for m in mahadashas],
+            [m["planet"] for m in mahadashas],
+        )
+        for _ in range(1, min(depth, EAGER_DASHA_LEVELS)):
+            self._add_level(*self._subdivide(len(self.starts) - 1))
+
+    def _add_level(self, starts, ends, durations, planets):
+        self.starts.append(starts)
+        self.ends.append(ends)
+        self.durations.append(durations)
+        self.planets.append(planets)
+
+    def _subdivide(self, level: int):
+        """Periods of the next level, parent by parent (iter_sub_periods)."""
+        starts, ends, durations, planets = [], [], [], []
+        for parent in zip(self.planets[level], self.starts[level], self.ends[level]):
+            for planet, start_jd, end_jd, duration_days in iter_sub_periods(*parent):
+                starts.append(start_jd)
+                ends.append(end_jd)
+                durations.append(duration_days)
+                planets.append(planet)
+        return starts, ends, durations, planets
+
+    def node(self, level: int, index: int) -> tuple:
+        """
+        (planet, start_jd, end_jd, duration_days) of a period. Levels deeper than the
+        stored ones are derived from the parent chain.
+        """
+        if level < len(self.starts):
+            return self.planets[level][index], self.starts[level][index], self.ends[level][index], \
+                self.durations[level][index]
+        parent = self.node(level - 1, index // 9)
+        return sub_periods(*parent[:3])[index % 9]
+
+    def _children_starts(self, level: int, lo: int, hi: int):
+        """Start times of the periods lo..hi - 1 of a level (one parent's children for lazy levels)."""
+        if level < len(self.starts):
+            return self.starts[level], lo, hi
+        children = sub_periods(*self.node(level - 1, lo // 9)[:3])
+        return [child[1] for child in children], 0, 9
+
+    def active_indexes(self, jd: float, depth: int = None):
+        """
+        Indexes of the active period on each level (up to depth), or None
+        when jd is outside the timeline.
+        """
+        lo, hi = 0, len(self.starts[0])
+        indexes = []
+        for level in range(depth or self.depth):
+            starts, start_lo, start_hi = self._children_starts(level, lo, hi)
+            k = bisect_right(starts, jd, start_lo, start_hi) - 1
+            if k < start_lo:
+                return None
+            i = lo + k - start_lo
+            if not jd < self.node(level, i)[2]:
+                return None
+            indexes.append(i)
+            lo, hi = i * 9, i * 9 + 9
+        return indexes
+
+    def active_planets(self, jd: float, depth: int = None):
+        """{"mahadasha": planet, "antara": planet, ...} without building period dicts."""
+        indexes = self.active_indexes(jd, depth)
+        if indexes is None:
+            return None
+        return {DASHA_STATE_KEYS[level]: self.node(level, i)[0] for level, i in enumerate(indexes)}
+
+    def period(self, level: int, index: int) -> dict:
+        """
+        Period dict in the format of calculate_antara_dashas / calculate_pratyantara_dashas:
+        level name, planets of the enclosing periods, planet, boundaries and dates.
+        """
+        record = self._periods.get((level, index))
+        if record is not None:
+            return record
+
+        record = {"level": DASHA_LEVEL_NAMES[level]}
+        for parent_level in range(level):
+            record[DASHA_STATE_KEYS[parent_level]] = self.node(parent_level, index // 9 ** (level - parent_level))[0]
+
+        planet, start_jd, end_jd, duration_days = self.node(level, index)
+        record.update({
+            "planet": planet,
+            "start_jd": start_jd,
+            "end_jd": end_jd,
+            "duration_days": duration_days,
+            "start_date": jd_to_date(start_jd),
+            "end_date": jd_to_date(end_jd),
+        })
+        if level >= len(self.starts):
+            return record
+        return self._periods.setdefault((level, index), record)
+
+    def states(self, jd: float, depth: int = None):
+        """
+        Active periods for a date: {"mahadasha": {...}, "antara": {...}, "pratyantara": {...}}
+        (plus "sookshma" and "prana" for depth 4 and 5).
+        """
+        indexes = self.active_indexes(jd, depth)
+        if indexes is None:
+            return None
+        return {DASHA_STATE_KEYS[level]: self.period(level, i) for level, i in enumerate(indexes)}
+
+    def iter_overlapping(self, level: int, start_jd: float, end_jd: float):
+        """
+        Lazily yields indexes of the level's periods that overlap [start_jd, end_jd),
+        in chronological order. Lazy levels expand only the overlapping parents.
+        """
+        if level < len(self.starts):
+            first = max(bisect_right(self.starts[level], start_jd) - 1, 0)
+            last = bisect_left(self.starts[level], end_jd)
+            for i in range(first, last):
+                if self.ends[level][i] > start_jd:
+                    yield i
+            return
+
+        for parent_index in self.iter_overlapping(level - 1, start_jd, end_jd):
+            for k, (_, child_start, child_end, _) in enumerate(sub_periods(*self.node(level - 1, parent_index)[:3])):
+                if child_start < end_jd and child_end > start_jd:
+                    yield parent_index * 9 + k
+
+    def iter_periods(self, level: int, start_jd: float, end_jd: float):
+        """Lazily yields period dicts of one level overlapping [start_jd, end_jd)."""
+        for i in self.iter_overlapping(level, start_jd, end_jd):
+            yield self.period(level, i)
+
+    def changes(self, start_jd: float, end_jd: float, depth: int = None) -> list:
+        """
+        All periods (up to depth) that begin within [start_jd, end_jd), sorted by start.
+        """
+        result = [
+            period
+            for level in range(depth or self.depth)
+            for period in self.iter_periods(level, start_jd, end_jd)
+            if start_jd <= period["start_jd"]
+        ]
+        result.sort(key=lambda period: (period["start_jd"], DASHA_LEVEL_NAMES.index(period["level"])))
+        return result
+
+
+def get_dasha_timeline(jd_birth: float, moon_data: dict) -> DashaTimeline:
+    """
+    DashaTimeline for a birth moment and natal Moon, cached per process.
+    """
+    return _cached_dasha_timeline(
+        jd_birth, moon_data.get("sidereal_longitude"), moon_data.get("degree"), moon_data.get("nakshatra")
+    )
+
+
+@lru_cache(maxsize=1024)
+def _cached_dasha_timeline(jd_birth, sidereal_longitude, degree, nakshatra):
+    moon_data = {"degree": degree, "nakshatra": nakshatra}
+    if sidereal_longitude is not None:
+        moon_data["sidereal_longitude"] = sidereal_longitude
+    return DashaTimeline(jd_birth, moon_data)
+
+
+def get_vimshottari_dasha_states(jd_transit, jd_birth, moon_data):
+    """
+    Determines active Maha, Antara, and Pratyantara dashas for a specific transit date.
+    """
+    return get_dasha_timeline(jd_birth, moon_data).states(jd_transit)
 
 
 def print_vimshottari_report_for_date(jd_transit, jd_birth, moon_data):
@@ -0,0 +1,11 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import app
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_lifespan():
+    """Runs the API lifespan (analysis executor) once for all TestClient instances of the session."""
+    with TestClient(app):
+        yield
@@ -1,7 +1,15 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.api import app  # Importing your FastAPI application object
+from app.schemas import TransitResponse, TransitBatchResponse
+import app.transit_service as transit_service
+from app.transit_service import get_transit_analysis_payload, get_transit_batch_payload
+from core_files.forecast import FORECAST_CHUNK_DAYS
+from core_files.natal_context import chart_content_hash
 import json
+import os
+import subprocess
+import sys
 import time
 
 # Initialize the TestClient
@@ -75,6 +83,24 @@ def test_transit_api_contract():
     print(f"\n✅ Contract valid. House 5 score: {houses['5'].get('total_score')}")
 
 
+def test_payloads_match_typed_schema():
+    """Directly serialized payloads conform to the typed response models and equal the plain JSON encoding"""
+    for options in ({}, {"scores_only": True}, {"stationary_motion": True}, {"include_natal": False}):
+        payload = get_transit_analysis_payload(test_chart_data, TRANSIT_DATE, **options)
+        assert all(isinstance(house, str) for house in payload["derived_tables"]["houses"]["scores"])
+        TransitResponse.model_validate(payload)
+
+        response = client.post("/api/v1/analyze", json={"chart_data": test_chart_data, "transit_date": TRANSIT_DATE,
+                                                        **options})
+        assert response.headers["content-type"] == "application/json"
+        result = response.json()
+        payload["meta"].pop("calculation_timestamp")
+        result["meta"].pop("calculation_timestamp")
+        assert result == json.loads(json.dumps(payload, default=str))
+
+    TransitBatchResponse.model_validate(get_transit_batch_payload(test_chart_data, [TRANSIT_DATE, "2026-03-01"]))
+
+
 def test_invalid_date_format():
     """Test protection against incorrect date format (should return 422)"""
     bad_payload = {
@@ -93,6 +119,213 @@ def test_missing_required_fields():
     print("\n✅ API correctly rejected incomplete request.")
 
 
+def test_scores_only_mode():
+    """scores_only returns the same numeric house scores without reasons or the echoed chart"""
+    payload = {"chart_data": test_chart_data, "transit_date": TRANSIT_DATE}
+    full = client.post("/api/v1/analyze", json=payload).json()
+    lean = client.post("/api/v1/analyze", json={**payload, "scores_only": True})
+
+    assert lean.status_code == 200
+    result = lean.json()
+    assert "natal_chart" not in result
+    assert "raw_logs" not in result
+
+    for house, data in full["derived_tables"]["houses"]["scores"].items():
+        lean_house = result["derived_tables"]["houses"]["scores"][house]
+        assert "reasons" not in lean_house
+        assert lean_house == {k: v for k, v in data.items() if k != "reasons"}
+
+
+def test_include_projection(monkeypatch):
+    """Only requested sections are returned and computed; house scores match the full response"""
+    payload = {"chart_data": test_chart_data, "transit_date": TRANSIT_DATE}
+    full = client.post("/api/v1/analyze", json=payload).json()
+
+    monkeypatch.setattr(transit_service, "analyze_transits_full", None)  # reasons and report are not needed
+    result = client.post("/api/v1/analyze", json={**payload, "include": ["houses", "periods"]})
+    assert result.status_code == 200
+    result = result.json()
+    assert set(result) == {"meta", "derived_tables"}
+    assert set(result["derived_tables"]) == {"houses", "periods"}
+    assert result["derived_tables"]["periods"] == full["derived_tables"]["periods"]
+    for house, data in full["derived_tables"]["houses"]["scores"].items():
+        assert result["derived_tables"]["houses"]["scores"][house] == {k: v for k, v in data.items() if k != "reasons"}
+    monkeypatch.undo()
+
+    # `fields` is an alias, a comma-separated string works too
+    reasons = client.post("/api/v1/analyze", json={**payload, "fields": "transits,house_reasons"}).json()
+    assert reasons["transits"] == full["transits"]
+    assert reasons["derived_tables"]["houses"] == full["derived_tables"]["houses"]
+
+    assert client.post("/api/v1/analyze", json={**payload, "include": ["unknown"]}).status_code == 422
+    assert client.post("/api/v1/analyze", json={**payload, "include": ["houses"], "scores_only": True}).status_code == 422
+
+
+def test_schemas_do_not_load_the_engine():
+    """Request schemas import without the service layer and Swiss Ephemeris"""
+    code = "import sys, app.schemas; print(sorted({'app.transit_service', 'swisseph'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == "[]"
+
+
+def test_batch_analysis_range():
+    """Batch endpoint returns one compact result per date of the range"""
+    payload = {
+        "chart_data": test_chart_data,
+        "start_date": "2025-12-29",
+        "end_date": "2026-01-04"
+    }
+    response = client.post("/api/v1/analyze/batch", json=payload)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["meta"]["dates_count"] == 7
+    assert [r["date"] for r in result["results"]][0] == TRANSIT_DATE
+    assert len(result["results"]) == 7
+
+    # Scores agree with the single-date endpoint
+    single = client.post("/api/v1/analyze", json={"chart_data": test_chart_data, "transit_date": TRANSIT_DATE}).json()
+    single_scores = single["derived_tables"]["houses"]["scores"]
+    first = result["results"][0]
+    assert first["houses"]["5"]["total_score"] == single_scores["5"]["total_score"]
+    assert first["positions"] == single["transits"]["positions"]
+    assert first["dasha"]["mahadasha"] == single["derived_tables"]["periods"]["vimshottari"]["mahadasha"]["planet"]
+
+
+def test_batch_analysis_stream_matches_plain():
+    """Streamed batch output is the same JSON document as the plain response"""
+    payload = {"chart_data": test_chart_data, "dates": ["2025-12-29", "2026-03-01"]}
+    plain = client.post("/api/v1/analyze/batch", json=payload).json()
+    streamed = client.post("/api/v1/analyze/batch", json={**payload, "stream": True})
+
+    assert streamed.status_code == 200
+    assert json.loads(streamed.text)["results"] == plain["results"]
+
+
+def test_batch_analysis_stream_reports_failure(monkeypatch):
+    """A failure mid-stream still ends in a parseable document with an error member"""
+    results = transit_service.get_transit_batch_results
+    calls = []
+
+    def failing_results(*args, **kwargs):
+        # The second chunk of dates fails
+        calls.append(args)
+        if len(calls) > 1:
+            raise RuntimeError("ephemeris failure")
+        return results(*args, **kwargs)
+
+    monkeypatch.setattr(transit_service, "get_transit_batch_results", failing_results)
+    payload = {"chart_data": test_chart_data, "start_date": "2025-12-01", "end_date": "2026-01-31", "stream": True}
+    streamed = client.post("/api/v1/analyze/batch", json=payload)
+
+    assert streamed.status_code == 200
+    document = json.loads(streamed.text)
+    assert document["error"] == "Internal Calculation Error"
+    assert len(document["results"]) == FORECAST_CHUNK_DAYS
+    assert document["results"][0]["date"] == "2025-12-01"
+
+
+def test_batch_analysis_rejects_oversized_range():
+    """Ranges longer than a year are rejected with 422"""
+    payload = {"chart_data": test_chart_data, "start_date": "2025-01-01", "end_date": "2026-06-01"}
+    response = client.post("/api/v1/analyze/batch", json=payload)
+    assert response.status_code == 422
+
+
+def test_forecast_ndjson_matches_batch():
+    """NDJSON forecast yields one line per day with the same results as the batch endpoint"""
+    payload = {"chart_data": test_chart_data, "start_date": "2025-12-29", "end_date": "2026-01-02"}
+    response = client.post("/api/v1/forecast", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    batch = client.post("/api/v1/analyze/batch", json=payload).json()
+    assert lines == batch["results"]
+
+
+def test_forecast_sse():
+    """With Accept: text/event-stream each day is an SSE event, followed by an end event"""
+    payload = {"chart_data": test_chart_data, "start_date": "2025-12-29", "end_date": "2025-12-31",
+               "include_report": True}
+    response = client.post("/api/v1/forecast", json=payload, headers={"Accept": "text/event-stream"})
+
+    assert response.status_code == 200
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [e[0] for e in events] == ["event: day"] * 3 + ["event: end"]
+    assert events[0][1] == "id: 2025-12-29"
+    first = json.loads(events[0][2][len("data: "):])
+    assert first["date"] == TRANSIT_DATE and first["report"]
+    assert json.loads(events[-1][1][len("data: "):]) == {"days": 3}
+
+
+@pytest.fixture
+def chart_store(tmp_path, monkeypatch):
+    """Registered charts go to a temporary store."""
+    from core_files import chart_store
+    from app.transit_service import get_stored_chart_json
+
+    monkeypatch.setattr(chart_store, "_store", chart_store.ChartStore(tmp_path / "charts.sqlite3"))
+    get_stored_chart_json.cache_clear()
+    yield chart_store._store
+    get_stored_chart_json.cache_clear()
+
+
+def test_register_chart_and_analyze_by_id(chart_store, monkeypatch):
+    """A registered chart is analysed by id with the same results and without the echoed natal chart"""
+    created = client.post("/api/v1/charts", json={"chart_data": test_chart_data})
+    assert created.status_code == 201
+    chart_id = created.json()["chart_id"]
+
+    # Ids are the opaque content hash, not a counter
+    assert chart_id == created.json()["chart_hash"] == chart_content_hash(test_chart_data)
+
+    again = client.post("/api/v1/charts", json={"chart_data": test_chart_data})
+    assert again.status_code == 200 and again.json()["chart_id"] == chart_id
+    stored = client.get(f"/api/v1/charts/{chart_id}").json()
+    assert stored["chart_data"] == test_chart_data
+
+    # Each lookup gets its own copy of the cached chart
+    chart, _ = transit_service.get_stored_chart(chart_id)
+    chart["planets"].clear()
+    assert transit_service.get_stored_chart(chart_id)[0] == test_chart_data
+
+    inline = client.post("/api/v1/analyze", json={"chart_data": test_chart_data, "transit_date": TRANSIT_DATE}).json()
+    by_id = client.post("/api/v1/analyze", json={"chart_id": chart_id, "transit_date": TRANSIT_DATE}).json()
+    assert "natal_chart" not in by_id
+    assert by_id["transits"] == inline["transits"] and by_id["derived_tables"] == inline["derived_tables"]
+
+    with_natal = client.post("/api/v1/analyze", json={"chart_id": chart_id, "transit_date": TRANSIT_DATE,
+                                                      "include_natal": True}).json()
+    assert with_natal["natal_chart"] == inline["natal_chart"]
+
+    # Batch and forecast reuse the stored hash instead of hashing the chart again
+    from core_files import natal_context
+    monkeypatch.setattr(natal_context, "chart_content_hash", None)
+    batch = client.post("/api/v1/analyze/batch", json={"chart_id": chart_id, "dates": [TRANSIT_DATE]}).json()
+    assert "natal_chart" not in batch and batch["results"][0]["houses"]["5"]["total_score"] == \
+        inline["derived_tables"]["houses"]["scores"]["5"]["total_score"]
+    streamed = client.post("/api/v1/analyze/batch", json={"chart_id": chart_id, "dates": [TRANSIT_DATE],
+                                                           "stream": True})
+    assert json.loads(streamed.text)["results"] == batch["results"]
+    forecast = client.post("/api/v1/forecast", json={"chart_id": chart_id, "start_date": TRANSIT_DATE,
+                                                     "end_date": TRANSIT_DATE})
+    assert json.loads(forecast.text.splitlines()[0])["houses"] == batch["results"][0]["houses"]
+
+
+def test_unknown_chart_id(chart_store):
+    """Unknown ids answer 404, malformed ids 422; a request needs exactly one of chart_data and chart_id"""
+    unknown = "0" * 64
+    assert client.get(f"/api/v1/charts/{unknown}").status_code == 404
+    assert client.post("/api/v1/analyze", json={"chart_id": unknown, "transit_date": TRANSIT_DATE}).status_code == 404
+    assert client.get("/api/v1/charts/1").status_code == 422
+    assert client.post("/api/v1/analyze", json={"chart_id": "1", "transit_date": TRANSIT_DATE}).status_code == 422
+    assert client.post("/api/v1/analyze", json={"transit_date": TRANSIT_DATE}).status_code == 422
+    assert client.post("/api/v1/analyze", json={"chart_data": test_chart_data, "chart_id": unknown,
+                                                "transit_date": TRANSIT_DATE}).status_code == 422
+
+
 @pytest.mark.performance
 def test_performance_benchmark():
     """Performance measurement (at least 10 iterations)"""
@@ -0,0 +1,95 @@
+import json
+from datetime import datetime
+
+from core import calculate_julian_day
+from core_files.astro_report import get_planet_positions_and_houses
+from core_files.bulk_import import run_bulk_import
+from core_files.chart_builder import build_birth_chart
+
+CSV_ROWS = [
+    "name,date,time,city,latitude,longitude,timezone",
+    "Анна,1990-05-17,14:30,москва,,,",
+    "Борис,1985-11-02,06:15,Лиссабон,38.72,-9.14,Europe/Lisbon",
+    "Вера,2001-01-09,23:50,неизвестный город,,,",
+]
+
+
+def failing_geocoder(city, dt):
+    raise ValueError("Город не найден.")
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_build_birth_chart_matches_interactive_calculation():
+    """Chart fields follow create_birth_chart: same Julian day, planets and lagna."""
+    dt = datetime(1990, 5, 17, 14, 30)
+    chart = build_birth_chart("Анна", dt, "москва", 55.7558, 37.6173, "Europe/Moscow")
+
+    jd = calculate_julian_day(dt, 4.0)  # летнее время СССР 1990 года
+    planets, lagna = get_planet_positions_and_houses(jd, 55.7558, 37.6173)
+
+    assert chart["utc_offset"] == 4.0
+    assert chart["julian_day"] == round(jd, 5)
+    assert chart["lagna"] == round(lagna, 2)
+    assert chart["planets"]["Солнце"] == planets["Солнце"]
+    assert chart["city"] == "Москва"
+    assert len(chart["vimshottari"]) == 9
+    assert {entry["Метка"] for entry in chart["arudhas"]} >= {"AL", "UL"}
+    assert "Солнце" in chart["karakas"]
+
+
+def test_interactive_chart_uses_builder(monkeypatch, capsys):
+    """create_birth_chart saves the builder's chart in the birth_charts.json format."""
+    import core
+
+    answers = iter(["Анна", "1990", "5", "17", "14", "30", "москва", ""])
+    saved = []
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    monkeypatch.setattr(core, "save_birth_chart", saved.append)
+
+    core.create_birth_chart()
+
+    chart = build_birth_chart("Анна", datetime(1990, 5, 17, 14, 30), "москва", 55.7558, 37.6173, "Europe/Moscow")
+    assert saved[0]["planets"] == chart["planets"]
+    assert saved[0]["julian_day"] == chart["julian_day"] and saved[0]["utc_offset"] == 4.0
+    assert "karakas" not in saved[0]
+    assert "АРУДХА-ПАДЫ" in capsys.readouterr().out
+
+
+def test_bulk_import_writes_charts_and_resumes(tmp_path):
+    """Charts and errors go to separate files; a second run skips finished ids and retries errors."""
+    source = tmp_path / "births.csv"
+    source.write_text("\n".join(CSV_ROWS) + "\n", encoding="utf-8")
+    out = tmp_path / "charts.jsonl"
+
+    stats = run_bulk_import(source, out, workers=0, geocoder=failing_geocoder, progress=lambda line: None)
+
+    assert (stats["written"], stats["errors"], stats["skipped"]) == (2, 1, 0)
+    assert [chart["id"] for chart in read_jsonl(out)] == ["1", "2"]
+    assert read_jsonl(f"{out}.errors.jsonl")[0]["id"] == "3"
+
+    stats = run_bulk_import(source, out, workers=0, geocoder=failing_geocoder, progress=lambda line: None)
+    assert (stats["written"], stats["errors"], stats["skipped"]) == (0, 1, 2)
+    assert [error["id"] for error in read_jsonl(f"{out}.errors.jsonl")] == ["3"]  # rewritten, not appended
+
+
+def test_bulk_import_process_pool_matches_inline(tmp_path):
+    """Worker processes produce the same charts as the inline run."""
+    source = tmp_path / "births.jsonl"
+    records = [
+        {"id": f"c{i}", "name": f"client{i}", "date": f"19{60 + i}-0{i % 9 + 1}-1{i}", "time": "12:00",
+         "city": "казань"}
+        for i in range(6)
+    ]
+    source.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+
+    run_bulk_import(source, tmp_path / "inline.jsonl", workers=0, progress=lambda line: None)
+    run_bulk_import(source, tmp_path / "pool.jsonl", workers=2, chunk_size=2, progress=lambda line: None)
+
+    def by_id(rows):
+        return {row["id"]: row for row in rows}
+
+    assert by_id(read_jsonl(tmp_path / "pool.jsonl")) == by_id(read_jsonl(tmp_path / "inline.jsonl"))
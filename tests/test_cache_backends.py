@@ -0,0 +1,197 @@
+import socketserver
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api as api
+from app.cache_backends import CacheBackendError, MemoryBackend, RedisBackend, SQLiteBackend
+from app.response_cache import ResponseCache
+from tests.test_api import test_chart_data, TRANSIT_DATE
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Answers the RESP commands used by RedisBackend from a shared dict."""
+
+    def read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            if command == b"GET":
+                value, expires_at = store.get(args[1], (None, None))
+                if value is None or (expires_at and expires_at <= time.time()):
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif command == b"SET":
+                expires_at = time.time() + int(args[4]) / 1000 if len(args) > 4 else None
+                store[args[1]] = (args[2], expires_at)
+                self.wfile.write(b"+OK\r\n")
+            elif command in (b"DEL", b"UNLINK"):
+                removed = sum(store.pop(key, None) is not None for key in args[1:])
+                self.wfile.write(b":%d\r\n" % removed)
+            elif command == b"SCAN":
+                # SCAN cursor MATCH prefix* COUNT n; the cursor is the hex of the last key returned,
+                # so deleting scanned keys does not skip the rest (as with a real server)
+                last, prefix, count = args[1], args[3].rstrip(b"*"), int(args[5])
+                keys = sorted(key for key in store if last == b"0" or key > bytes.fromhex(last.decode()))
+                cursor = keys[count - 1].hex().encode() if len(keys) > count else b"0"
+                keys = [key for key in keys[:count] if key.startswith(prefix)]
+                self.wfile.write(b"*2\r\n$%d\r\n%s\r\n" % (len(cursor), cursor) + b"*%d\r\n" % len(keys) +
+                                 b"".join(b"$%d\r\n%s\r\n" % (len(k), k) for k in keys))
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def fake_redis():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeRedisHandler)
+    server.daemon_threads = True
+    server.store = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    """Two backends on one file (as two uvicorn workers would be) see each other's entries."""
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = SQLiteBackend(path, max_size=2)
+    worker_b = SQLiteBackend(path, max_size=2)
+
+    worker_a.set("k1", {"houses": {"1": 1.5}})
+    assert worker_b.get("k1") == {"houses": {"1": 1.5}}
+
+    worker_b.set("k2", [1, 2])
+    worker_a.get("k1")
+    worker_a.set("k3", "x")  # evicts the least recently used key k2
+    assert worker_b.get("k2") is None
+    assert worker_b.size() == 2
+
+
+def test_sqlite_backend_batches_access_times(tmp_path, monkeypatch):
+    """Hits are read-only until a batch of access times is flushed; errors surface as CacheBackendError."""
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_size=8)
+    monkeypatch.setattr(backend, "TOUCH_BATCH_SIZE", 3)
+    for key in ("a", "b", "c"):
+        backend.set(key, key)
+
+    def access_times():
+        return dict(backend._connection().execute("SELECT key, accessed_at FROM cache").fetchall())
+
+    stored = access_times()
+    time.sleep(0.01)
+    backend.get("a")
+    backend.get("b")
+    assert access_times() == stored
+    backend.get("c")  # third touched key: the batch is written
+    assert all(accessed_at > stored[key] for key, accessed_at in access_times().items())
+
+    backend._connection().close()
+    with pytest.raises(CacheBackendError):
+        backend.size()
+    with pytest.raises(CacheBackendError):
+        backend.clear()
+
+
+def test_sqlite_backend_ttl(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), ttl=0.01)
+    backend.set("k", 1)
+    time.sleep(0.02)
+    assert backend.get("k") is None
+
+
+def test_redis_backend_against_fake_server(fake_redis):
+    """Round trip, TTL, prefix-scoped clear and reconnect after a dropped connection."""
+    host, port = fake_redis.server_address
+    backend = RedisBackend(f"redis://{host}:{port}/0", prefix="test:")
+    backend.SCAN_COUNT = 2  # several SCAN round trips
+    fake_redis.store[b"other:key"] = (b"1", None)
+
+    backend.set("k", {"score": 2})
+    assert backend.get("k") == {"score": 2}
+    assert backend.get("missing") is None
+    assert backend.size() == 1
+    for i in range(4):
+        backend.set(f"k{i}", i)
+    assert backend.size() == 5
+
+    backend._local.sock.close()
+    assert backend.get("k") == {"score": 2}
+
+    backend.clear()
+    assert backend.size() == 0
+    assert b"other:key" in fake_redis.store
+
+    expiring = RedisBackend(f"redis://{host}:{port}/0", ttl=0.01, prefix="test:")
+    expiring.set("k", 1)
+    time.sleep(0.02)
+    assert expiring.get("k") is None
+
+
+def test_unreachable_backend_degrades_to_miss():
+    """Backend errors are counted and treated as misses instead of failing the request."""
+    with socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler) as server:
+        port = server.server_address[1]
+    backend = RedisBackend(f"redis://127.0.0.1:{port}/0", timeout=0.2)
+    with pytest.raises(CacheBackendError):
+        backend.get("k")
+
+    cache = ResponseCache(backend=backend)
+    cache.set("k", 1)
+    assert cache.get("k") is None
+    assert cache.stats()["errors"] == 2
+
+
+def test_analyze_survives_failing_backend(monkeypatch):
+    """Any backend exception is a miss for /analyze, not a 500."""
+    class BrokenBackend(MemoryBackend):
+        name = "broken"
+
+        def get(self, key):
+            raise ValueError("corrupt entry")
+
+        def set(self, key, value):
+            raise CacheBackendError("read-only")
+
+    monkeypatch.setattr(api, "response_cache", ResponseCache(backend=BrokenBackend()))
+    response = TestClient(api.app).post("/api/v1/analyze", json={"chart_data": test_chart_data,
+                                                                 "transit_date": TRANSIT_DATE})
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+    assert api.response_cache.stats()["errors"] == 2
+
+
+def test_analyze_served_from_shared_cache(monkeypatch, fake_redis):
+    """A payload cached by one worker is a hit for another worker with its own client."""
+    host, port = fake_redis.server_address
+    url = f"redis://{host}:{port}/0"
+    payload = {"chart_data": test_chart_data, "transit_date": TRANSIT_DATE}
+    client = TestClient(api.app)
+
+    monkeypatch.setattr(api, "response_cache", ResponseCache(backend=RedisBackend(url)))
+    first = client.post("/api/v1/analyze", json=payload)
+
+    monkeypatch.setattr(api, "response_cache", ResponseCache(backend=RedisBackend(url)))
+    second = client.post("/api/v1/analyze", json=payload)
+
+    assert first.headers["X-Cache"] == "MISS" and second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert client.get("/api/v1/cache/stats").json()["backend"] == "redis"
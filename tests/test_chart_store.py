@@ -0,0 +1,82 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from core_files.chart_store import BIRTH_CHARTS, NATAL_DATABASE, ChartStore, migrate_json
+from core_files.natal_context import chart_content_hash
+from tests.test_api import test_chart_data
+
+
+def test_add_get_and_find_by_name(tmp_path):
+    """Charts are found by id and by case-insensitive (Cyrillic) name."""
+    store = ChartStore(tmp_path / "charts.sqlite3")
+    chart_id = store.add({**test_chart_data, "name": "Павел"})
+    store.add({**test_chart_data, "name": "Анна"})
+
+    assert store.get(chart_id)["planets"] == test_chart_data["planets"]
+    assert [c["name"] for c in store.find_by_name("ПАВЕЛ")] == ["Павел"]
+    assert [c["name"] for c in store.list_charts()] == ["Павел", "Анна"]
+    assert store.get(999) is None
+    assert store.delete(chart_id) and store.count() == 1
+
+
+def test_concurrent_writers_and_readers(tmp_path):
+    """Threads writing and reading at once lose no chart and never see partial rows."""
+    store = ChartStore(tmp_path / "charts.sqlite3")
+
+    def write(i):
+        return store.add({"name": f"client{i % 10}", "index": i})
+
+    def read(i):
+        return all("index" in chart for chart in store.find_by_name(f"client{i % 10}"))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(write, range(400)))
+        reads = list(pool.map(read, range(400)))
+
+    assert len(set(ids)) == 400 and store.count() == 400
+    assert all(reads)
+    assert len(store.find_by_name("client3")) == 40
+
+
+def test_migrate_legacy_json_files(tmp_path):
+    """Both legacy files are imported once; re-running the migration skips them."""
+    charts_path = tmp_path / "birth_charts.json"
+    charts_path.write_text(json.dumps([test_chart_data], ensure_ascii=False), encoding="utf-8")
+    natal_db_path = tmp_path / "natal_database.json"
+    natal_db_path.write_text(json.dumps({"Иван": {"date": "1990-01-01"}}, ensure_ascii=False), encoding="utf-8")
+
+    store = ChartStore(tmp_path / "charts.sqlite3")
+    imported = migrate_json(store, charts_path, natal_db_path)
+    assert (imported[BIRTH_CHARTS], imported[NATAL_DATABASE]) == (1, 1)
+
+    assert store.find_by_name(test_chart_data["name"]) == [test_chart_data]
+    assert store.find_by_name("иван", NATAL_DATABASE) == [{"date": "1990-01-01"}]
+
+    assert migrate_json(store, charts_path, natal_db_path)["skipped"] == 2
+    assert store.count() == 1
+
+
+def test_natal_db_imports_legacy_file_and_adds_atomically(tmp_path, monkeypatch):
+    """natal_db sees natal_database.json without a manual migration; concurrent adds of a name insert once."""
+    from core_files import chart_store, natal_db
+
+    natal_db_path = tmp_path / "natal_database.json"
+    natal_db_path.write_text(json.dumps({"Иван": {"date": "1990-01-01"}}, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setenv("CHART_STORE_PATH", str(tmp_path / "charts.sqlite3"))
+    monkeypatch.setattr(chart_store, "LEGACY_CHARTS_PATH", tmp_path / "missing.json")
+    monkeypatch.setattr(chart_store, "LEGACY_NATAL_DB_PATH", str(natal_db_path))
+    monkeypatch.setattr(chart_store, "_store", None)
+
+    assert natal_db.get_natal_chart("Иван") == {"date": "1990-01-01"}
+    assert natal_db.list_all_names() == ["Иван"]
+
+    # The import runs once: an emptied collection does not get the file back on the next start
+    store = chart_store.get_chart_store()
+    store.delete(store.find_id_by_hash(chart_content_hash({"date": "1990-01-01"}), NATAL_DATABASE))
+    monkeypatch.setattr(chart_store, "_store", None)
+    assert natal_db.get_natal_chart("Иван") is None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = list(pool.map(lambda i: natal_db.add_natal_chart("Мария", {"index": i}), range(16)))
+    assert created.count(True) == 1
+    assert natal_db.list_all_names() == ["Мария"]
@@ -0,0 +1,39 @@
+from core_files.city_index import CityIndex, directory_entries, gazetteer_entries
+from core_files.russian_cities import cities, get_city_info
+
+# Две строки в формате дампа GeoNames (cities15000.txt)
+GEONAMES_ROWS = [
+    "\t".join(["2267057", "Lisbon", "Lisbon", "LIS,Lisboa,Lissabon,Лиссабон", "38.71667", "-9.13333",
+               "P", "PPLC", "PT", "", "14", "", "", "", "517802", "", "45", "Europe/Lisbon", "2024-01-01"]),
+    "\t".join(["515003", "Orsk", "Orsk", "Orsk,Орск", "51.2049", "58.5668",
+               "P", "PPL", "RU", "", "55", "", "", "", "230414", "", "200", "Asia/Yekaterinburg", "2024-01-01"]),
+]
+
+
+def test_directory_lookup_variants():
+    """Every directory city resolves; spelling variants, Latin names and typos find the same city."""
+    for name, info in cities.items():
+        assert get_city_info(name) == info
+
+    assert get_city_info("Йошкар Ола") == get_city_info("Yoshkar-Ola") == cities["йошкар-ола"]
+    assert get_city_info("Орел") == cities["орёл"]
+    assert get_city_info("Saint Petersburg") == cities["санкт-петербург"]
+    assert get_city_info("Chelyabinskk") == cities["челябинск"]
+    assert get_city_info("тулья") == cities["тула"]
+    assert get_city_info("Орск") is None  # one edit from "Омск", but too short for a typo
+    assert get_city_info("Париж") is None
+
+
+def test_compiled_gazetteer_roundtrip(tmp_path):
+    """A GeoNames dump is indexed under alternate names and survives a save/load cycle."""
+    dump = tmp_path / "cities15000.txt"
+    dump.write_text("\n".join(GEONAMES_ROWS) + "\n", encoding="utf-8")
+    path = tmp_path / "city_index.npz"
+    CityIndex.build([*directory_entries(), *gazetteer_entries(dump)]).save(path)
+
+    index = CityIndex.load(path)
+    assert index.lookup("Лиссабон")["timezone"] == "Europe/Lisbon"
+    assert index.lookup("lisboa")["name"] == "Lisbon"
+    assert index.lookup("LIS", fuzzy=False) is None  # airport codes are not indexed
+    assert index.lookup("Орск")["latitude"] == 51.2049
+    assert index.lookup("Москва")["latitude"] == cities["москва"]["latitude"]
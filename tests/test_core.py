@@ -3,6 +3,7 @@ from datetime import datetime
 # Importing functions directly from your core engine
 # (Assuming the main core file is named core.py)
 from core import degree_str_to_float, get_zodiac_sign, get_nakshatra_and_pada_by_degree, calculate_julian_day
+from core_files.degrees import parse_dms
 
 # --- String Parsing Tests ---
 
@@ -16,6 +17,12 @@ def test_degree_str_to_float_zero():
     """Verify error handling for empty or malformed degree strings."""
     assert degree_str_to_float("invalid") == 0.0
 
+def test_parse_dms_is_strict():
+    """The calculation path raises instead of silently returning 0.0."""
+    assert parse_dms("18°58'5'' R") == pytest.approx(18 + 58/60 + 5/3600)
+    with pytest.raises(ValueError):
+        parse_dms("invalid")
+
 # --- Zodiac Logic Tests (360° Circle Mathematics) ---
 
 @pytest.mark.parametrize("degree, expected_sign", [
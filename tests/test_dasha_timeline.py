@@ -0,0 +1,110 @@
+import random
+
+from core_files.vimshottari import (
+    DashaTimeline,
+    calculate_antara_dashas,
+    calculate_fraction_in_nakshatra,
+    calculate_pratyantara_dashas,
+    calculate_vimshottari_dasha_full,
+    find_active_period,
+    iter_sub_periods,
+)
+from core_files.astro_report import get_nakshatra_and_pada
+from core_files.constants import NAKSHATRA_LENGTH
+from core_files.degrees import format_dms
+from tests.test_api import test_chart_data
+
+JD_BIRTH = test_chart_data["julian_day"]
+MOON = test_chart_data["planets"]["Луна"]
+
+
+def linear_states(jd):
+    """Reference lookup: full period lists scanned level by level."""
+    maha = find_active_period(calculate_vimshottari_dasha_full(JD_BIRTH, MOON), jd)
+    if not maha:
+        return None
+    antara = find_active_period(calculate_antara_dashas(maha["planet"], maha["start_jd"], maha["end_jd"]), jd)
+    if not antara:
+        return None
+    pratyantara = find_active_period(
+        calculate_pratyantara_dashas(maha["planet"], antara["planet"], antara["start_jd"], antara["end_jd"]), jd
+    )
+    if not pratyantara:
+        return None
+    return {"mahadasha": maha, "antara": antara, "pratyantara": pratyantara}
+
+
+def test_bisect_lookup_matches_linear_scan():
+    """Active periods from the timeline equal a linear scan, including dates outside the 120 years."""
+    timeline = DashaTimeline(JD_BIRTH, MOON)
+    first, last = timeline.starts[0][0], timeline.ends[0][-1]
+
+    rng = random.Random(13)
+    dates = [rng.uniform(first - 1000, last + 1000) for _ in range(300)]
+    dates += timeline.starts[2][:50]  # точно на границах периодов
+
+    for jd in dates:
+        assert timeline.states(jd) == linear_states(jd)
+
+
+def test_changes_returns_period_starts_in_window():
+    """Range query lists every period that begins within the window, sorted by time."""
+    timeline = DashaTimeline(JD_BIRTH, MOON, depth=3)
+    maha = timeline.period(0, 1)
+
+    changes = timeline.changes(maha["start_jd"], maha["end_jd"])
+
+    assert changes[0]["level"] == "dasha" and changes[0]["planet"] == maha["planet"]
+    assert [c["level"] for c in changes].count("antara") == 9
+    assert [c["level"] for c in changes].count("pratyantara") == 81
+    assert all(maha["start_jd"] <= c["start_jd"] < maha["end_jd"] for c in changes)
+    assert [c["start_jd"] for c in changes] == sorted(c["start_jd"] for c in changes)
+
+
+def test_lazy_prana_levels_match_full_expansion():
+    """Sookshma and Prana found lazily equal a linear scan over the expanded branch."""
+    timeline = DashaTimeline(JD_BIRTH, MOON, depth=5)
+    assert len(timeline.starts) == 3  # глубокие уровни не хранятся
+
+    rng = random.Random(14)
+    for _ in range(100):
+        jd = rng.uniform(timeline.starts[0][0], timeline.ends[0][-1])
+        states = timeline.states(jd)
+
+        periods = [(p["planet"], p["start_jd"], p["end_jd"]) for p in linear_states(jd).values()]
+        for _ in range(2):
+            planet, start_jd, end_jd, _ = next(
+                sub for sub in iter_sub_periods(*periods[-1]) if sub[1] <= jd < sub[2]
+            )
+            periods.append((planet, start_jd, end_jd))
+
+        assert [(p["planet"], p["start_jd"], p["end_jd"]) for p in states.values()] == periods
+        assert states["prana"]["sookshma"] == states["sookshma"]["planet"]
+
+
+def test_changes_in_intraday_window_expands_one_branch():
+    """Prana changes within a few days come from the overlapping branches only."""
+    timeline = DashaTimeline(JD_BIRTH, MOON, depth=5)
+    start_jd = 2461038.5
+
+    changes = timeline.changes(start_jd, start_jd + 3)
+    pranas = [c for c in changes if c["level"] == "prana"]
+
+    assert pranas
+    assert all(start_jd <= c["start_jd"] < start_jd + 3 for c in changes)
+    assert all(a["end_jd"] == b["start_jd"] for a, b in zip(pranas, pranas[1:]))
+    assert timeline.active_planets(pranas[0]["start_jd"])["prana"] == pranas[0]["planet"]
+
+
+def test_nakshatra_fraction_from_degree_string_matches_longitude():
+    """Charts with only the DMS string within the sign get the fraction of the absolute longitude."""
+    rng = random.Random(3)
+    for _ in range(2000):
+        longitude = rng.random() * 360
+        nakshatra, pada = get_nakshatra_and_pada(longitude)
+        legacy = {"degree": format_dms(longitude), "nakshatra": nakshatra, "pada": pada}
+        exact = calculate_fraction_in_nakshatra({**legacy, "sidereal_longitude": longitude})
+
+        assert exact == (longitude % NAKSHATRA_LENGTH) / NAKSHATRA_LENGTH
+        # Строка округлена до секунды
+        assert abs(calculate_fraction_in_nakshatra(legacy) - exact) <= 0.5 / 3600 / NAKSHATRA_LENGTH + 1e-12
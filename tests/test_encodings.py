@@ -0,0 +1,108 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.responses as responses
+from app.api import app
+from app.codes import CODE_TABLES, POSITION_FIELDS
+from app.responses import JSON, MSGPACK, CBOR, NotAcceptable, negotiate, decode
+from tests.test_api import test_chart_data, TRANSIT_DATE
+
+client = TestClient(app)
+
+PAYLOAD = {"chart_data": test_chart_data, "transit_date": TRANSIT_DATE}
+
+
+def without_timestamp(payload: dict) -> dict:
+    payload["meta"].pop("calculation_timestamp", None)
+    return payload
+
+
+def test_negotiate(monkeypatch):
+    """Accept header selects the most preferred installed encoding, JSON otherwise"""
+    monkeypatch.setattr(responses, "msgpack", object())
+    monkeypatch.setattr(responses, "cbor2", object())
+    assert negotiate("") == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate("text/html, application/xhtml+xml") == JSON
+    assert negotiate("application/msgpack") == MSGPACK
+    assert negotiate("application/x-msgpack") == MSGPACK
+    assert negotiate("application/json;q=0.9, application/cbor") == CBOR
+    assert negotiate("application/cbor;q=0.2, application/msgpack;q=0.5") == MSGPACK
+    assert negotiate("application/msgpack;q=0, */*") == JSON
+
+    monkeypatch.setattr(responses, "msgpack", None)
+    with pytest.raises(NotAcceptable):
+        negotiate("application/msgpack")
+    assert negotiate("application/msgpack, application/json;q=0.5") == JSON
+
+
+def test_codes_schema():
+    """Code payloads decode through the published tables to the named payload"""
+    tables = client.get("/api/v1/codes").json()
+    assert tables == CODE_TABLES
+
+    named = client.post("/api/v1/analyze", json=PAYLOAD).json()
+    coded = client.post("/api/v1/analyze", json={**PAYLOAD, "codes": True}).json()
+    assert coded["meta"]["codes"] == tables["version"]
+
+    positions = coded["transits"]["positions"]
+    assert len(positions) == len(named["transits"]["positions"])
+    for row in positions:
+        row = dict(zip(POSITION_FIELDS, row))
+        expected = named["transits"]["positions"][tables["planets"][row["planet"]]]
+        assert tables["signs"][row["sign"]] == expected["sign"]
+        assert tables["nakshatras"][row["nakshatra"]] == expected["nakshatra"]
+        for field in ("sidereal_longitude", "speed", "house", "pada", "retrograde"):
+            assert row[field] == expected[field]
+
+    for house, data in coded["derived_tables"]["houses"]["scores"].items():
+        expected = named["derived_tables"]["houses"]["scores"][house]
+        assert tables["house_statuses"][data["status"]] == expected["status"]
+        assert data["total_score"] == expected["total_score"]
+
+    for house, (ruler, transit_house) in coded["derived_tables"]["house_rulers"].items():
+        assert [tables["planets"][ruler], transit_house] == named["derived_tables"]["house_rulers"][house]
+
+    for level, period in coded["derived_tables"]["periods"]["vimshottari"].items():
+        expected = named["derived_tables"]["periods"]["vimshottari"][level]
+        assert tables["planets"][period["planet"]] == expected["planet"]
+        assert period["start_date"] == expected["start_date"]
+
+    # Text sections are unchanged
+    assert coded["derived_tables"]["aspects"] == named["derived_tables"]["aspects"]
+
+
+@pytest.mark.parametrize("media_type, module", [(MSGPACK, "msgpack"), (CBOR, "cbor2")])
+def test_binary_responses(media_type, module):
+    """MessagePack/CBOR responses carry the same payload as JSON"""
+    pytest.importorskip(module)
+    expected = without_timestamp(client.post("/api/v1/analyze", json=PAYLOAD).json())
+
+    response = client.post("/api/v1/analyze", json=PAYLOAD, headers={"Accept": media_type})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+    assert response.headers["vary"] == "Accept"
+    assert without_timestamp(decode(response.content, media_type)) == expected
+
+    batch = {"chart_data": test_chart_data, "dates": [TRANSIT_DATE, "2026-01-02"], "codes": True}
+    expected = without_timestamp(client.post("/api/v1/analyze/batch", json=batch).json())
+    response = client.post("/api/v1/analyze/batch", json=batch, headers={"Accept": media_type})
+    assert response.headers["content-type"] == media_type
+    assert without_timestamp(decode(response.content, media_type)) == expected
+
+
+def test_encoding_not_installed(monkeypatch):
+    """Only an uninstalled encoding accepted: 406; with a JSON fallback: JSON"""
+    monkeypatch.setattr(responses, "msgpack", None)
+    response = client.post("/api/v1/analyze", json=PAYLOAD, headers={"Accept": "application/msgpack"})
+    assert response.status_code == 406
+
+    response = client.post("/api/v1/analyze", json=PAYLOAD,
+                           headers={"Accept": "application/msgpack, application/json;q=0.5"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == JSON
+
+    # Streamed batches are always JSON
+    batch = {"chart_data": test_chart_data, "dates": [TRANSIT_DATE], "stream": True}
+    response = client.post("/api/v1/analyze/batch", json=batch, headers={"Accept": "application/msgpack"})
+    assert response.status_code == 200
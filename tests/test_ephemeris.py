@@ -0,0 +1,84 @@
+import numpy as np
+import swisseph as swe
+
+from core_files.constants import GRAHAS
+from core_files.ephemeris import calculate_graha_arrays, julian_day_range, use_ephemeris_table
+from core_files.ephemeris_table import (
+    EphemerisTable, build_ephemeris_table, TOLERANCE_ARCSEC, SPEED_TOLERANCE
+)
+from core_files.transit_analys import calculate_transit_positions, calculate_transit_positions_range
+
+JD_START = 2461038.5  # 2025-12-29 00:00 UT
+LAGNA = 198.97
+
+
+def test_graha_arrays_shape():
+    """Each array has one row per date and one column per graha."""
+    jds = julian_day_range(JD_START, 30)
+    arrays = calculate_graha_arrays(jds, LAGNA)
+
+    assert arrays["planets"] == GRAHAS
+    for key in ("longitude", "speed", "retrograde", "sign", "house", "nakshatra", "pada"):
+        assert arrays[key].shape == (30, 9)
+
+    assert np.all((arrays["longitude"] >= 0) & (arrays["longitude"] < 360))
+    assert np.all((arrays["house"] >= 1) & (arrays["house"] <= 12))
+    assert np.all((arrays["pada"] >= 1) & (arrays["pada"] <= 4))
+
+
+def test_graha_arrays_match_direct_calculation():
+    """Sidereal longitudes agree with a direct swe.calc_ut call for every date."""
+    jds = julian_day_range(JD_START, 5, step=0.5)
+    arrays = calculate_graha_arrays(jds)
+
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    for i, jd in enumerate(jds):
+        data, _ = swe.calc_ut(float(jd), swe.SATURN)
+        expected = (data[0] - swe.get_ayanamsa_ut(float(jd))) % 360
+        assert arrays["longitude"][i, GRAHAS.index("Сатурн")] == expected
+
+    ketu = arrays["longitude"][:, GRAHAS.index("Кету")]
+    rahu = arrays["longitude"][:, GRAHAS.index("Раху")]
+    assert np.allclose((rahu + 180) % 360, ketu)
+
+
+def test_range_matches_single_date_positions():
+    """The batch path produces exactly the same dicts as calculate_transit_positions."""
+    jds = julian_day_range(JD_START, 10)
+    batch = calculate_transit_positions_range(jds, LAGNA, 55.75, 37.61)
+
+    for jd, positions in zip(jds, batch):
+        assert positions == calculate_transit_positions(float(jd), LAGNA, 55.75, 37.61)
+
+
+def test_ephemeris_table_within_tolerance(tmp_path):
+    """
+    Interpolated table lookups stay within the documented tolerance of swe.calc_ut.
+    The window includes Jupiter's solar conjunction (worst case for interpolation).
+    """
+    start_jd = 2460840.5
+    build_ephemeris_table(tmp_path, start_jd, start_jd + 20)
+    table = EphemerisTable.load(tmp_path)
+
+    jds = np.random.default_rng(0).uniform(start_jd, start_jd + 20, 2000)
+    direct = calculate_graha_arrays(jds)
+    longitude, speed = table.interpolate(jds)
+
+    error_arcsec = np.abs((longitude - direct["longitude"] + 180) % 360 - 180) * 3600
+    assert error_arcsec.max() < TOLERANCE_ARCSEC
+    assert np.abs(speed - direct["speed"]).max() < SPEED_TOLERANCE
+
+
+def test_ephemeris_table_routes_transit_positions(tmp_path):
+    """An active table serves calculate_graha_arrays; dates outside it fall back to Swiss Ephemeris."""
+    build_ephemeris_table(tmp_path, JD_START, JD_START + 10)
+    direct = calculate_transit_positions(JD_START + 3, LAGNA, 55.75, 37.61)
+
+    use_ephemeris_table(EphemerisTable.load(tmp_path))
+    try:
+        # Table nodes are exact, so a midnight lookup reproduces the direct result
+        assert calculate_transit_positions(JD_START + 3, LAGNA, 55.75, 37.61) == direct
+        outside = calculate_graha_arrays([JD_START + 100])
+        assert outside["longitude"].shape == (1, 9)
+    finally:
+        use_ephemeris_table(None)
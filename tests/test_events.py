@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.api import app
+from core_files.constants import GRAHAS
+from core_files.ephemeris import calculate_graha_arrays, calculate_graha_position
+from core_files.events import SEGMENT_WIDTH, find_events
+from fastapi.testclient import TestClient
+from tests.test_api import test_chart_data
+
+START_JD = 2460676.5  # 2025-01-01
+END_JD = START_JD + 366
+
+
+def test_sign_changes_match_daily_sampling():
+    """Every sign change seen by daily sampling is found, and no more."""
+    events = find_events(START_JD, END_JD, event_types=["sign"])
+    daily = calculate_graha_arrays(np.arange(START_JD, END_JD + 0.5))
+
+    for j, planet in enumerate(GRAHAS):
+        sampled = int((np.diff(daily["sign"][:, j]) != 0).sum())
+        assert len([e for e in events if e["planet"] == planet]) == sampled
+
+
+def test_events_are_exact_to_seconds():
+    """The segment index changes within a few seconds around each reported instant."""
+    events = find_events(START_JD, START_JD + 30, planets=["Луна", "Меркурий"], event_types=["nakshatra", "pada"])
+    assert events == sorted(events, key=lambda e: e["jd"])
+
+    for event in events:
+        width = SEGMENT_WIDTH[event["type"]]
+        index = GRAHAS.index(event["planet"])
+        before = calculate_graha_position(event["jd"] - 2 / 86400, index)[0] // width
+        after = calculate_graha_position(event["jd"] + 2 / 86400, index)[0] // width
+        assert before != after
+
+
+def test_saturn_ingress_and_house_change():
+    """Saturn enters sidereal Pisces at the end of March 2025 (house 6 from a Libra lagna)."""
+    events = find_events(START_JD, END_JD, planets=["Сатурн"], event_types=["sign", "house"],
+                         natal_lagna_degree=test_chart_data["lagna"])
+    sign_event, house_event = events
+    assert (sign_event["from"], sign_event["to"]) == ("Водолей", "Рыбы")
+    assert sign_event["utc"].startswith("2025-03-")
+    assert (house_event["from"], house_event["to"], house_event["jd"]) == (5, 6, sign_event["jd"])
+
+    with pytest.raises(ValueError):
+        find_events(START_JD, END_JD, event_types=["house"])
+
+
+def test_events_endpoint():
+    client = TestClient(app)
+    payload = {"start_date": "2025-03-01", "end_date": "2025-04-30", "planets": ["Сатурн"],
+               "event_types": ["sign", "house"], "chart_data": test_chart_data}
+    response = client.post("/api/v1/events", json=payload)
+
+    assert response.status_code == 200
+    assert [e["type"] for e in response.json()["events"]] == ["sign", "house"]
+
+    no_chart = {**payload, "chart_data": None}
+    assert client.post("/api/v1/events", json=no_chart).status_code == 422
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api as api
+from app.executor import AnalysisExecutor, ExecutorSaturated
+from app.response_cache import ResponseCache
+from app.transit_service import get_transit_analysis_payload
+from tests.test_api import test_chart_data, TRANSIT_DATE
+
+
+def test_saturated_executor_rejects_new_jobs():
+    """Jobs beyond max_pending are rejected immediately instead of queueing."""
+    executor = AnalysisExecutor(backend="thread", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(sum, [1, 2])
+        release.set()
+        await blocked
+        return await executor.run(sum, [1, 2])
+
+    try:
+        assert asyncio.run(scenario()) == 3
+        assert executor.stats()["rejected"] == 1
+        assert executor.stats()["pending"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_cancelled_job_keeps_its_slot_until_done():
+    """A cancelled await does not free the slot while the job still runs in the pool."""
+    executor = AnalysisExecutor(backend="thread", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        waiting = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await asyncio.sleep(0.05)
+        assert executor.stats()["pending"] == 1
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(sum, [1, 2])
+
+        release.set()
+        await asyncio.sleep(0.05)
+        return await executor.run(sum, [1, 2])
+
+    try:
+        assert asyncio.run(scenario()) == 3
+        assert executor.stats()["pending"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_process_backend_matches_inline():
+    """Warmed-up process workers produce the same analysis as an inline call."""
+    executor = AnalysisExecutor(backend="process", workers=1, max_pending=2)
+    try:
+        remote = asyncio.run(executor.run(get_transit_analysis_payload, test_chart_data, TRANSIT_DATE))
+    finally:
+        executor.shutdown()
+
+    local = get_transit_analysis_payload(test_chart_data, TRANSIT_DATE)
+    assert remote["transits"] == local["transits"]
+    for house, data in local["derived_tables"]["houses"]["scores"].items():
+        assert remote["derived_tables"]["houses"]["scores"][house]["total_score"] == data["total_score"]
+
+
+def test_api_returns_503_when_saturated(monkeypatch):
+    """The analyze endpoint answers 503 with Retry-After while /health stays available."""
+    saturated = AnalysisExecutor(backend="inline", workers=1, max_pending=0)
+    monkeypatch.setattr(api.app.state, "analysis_executor", saturated)
+    monkeypatch.setattr(api, "response_cache", ResponseCache(max_size=0))
+    client = TestClient(api.app)
+
+    response = client.post("/api/v1/analyze", json={"chart_data": test_chart_data, "transit_date": TRANSIT_DATE})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["analysis_queue"]["rejected"] == 1
+
+
+def test_forecast_stream_holds_a_slot(monkeypatch):
+    """A streamed forecast takes a queue slot for its whole duration and answers 503 when none is free."""
+    executor = AnalysisExecutor(backend="inline", workers=1, max_pending=1)
+    monkeypatch.setattr(api.app.state, "analysis_executor", executor)
+    client = TestClient(api.app)
+    payload = {"chart_data": test_chart_data, "start_date": TRANSIT_DATE, "end_date": "2026-01-02"}
+
+    executor.acquire()
+    response = client.post("/api/v1/forecast", json=payload)
+    assert response.status_code == 503
+    executor.release()
+
+    response = client.post("/api/v1/forecast", json=payload)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 5
+    assert executor.stats()["pending"] == 0
+
+
+def test_forecast_runs_on_the_executor(monkeypatch):
+    """The natal context and every chunk of forecast days are jobs of the configured executor."""
+    executor = AnalysisExecutor(backend="thread", workers=1, max_pending=1)
+    submitted = []
+    submit = executor.submit
+
+    def recording_submit(func, *args, **kwargs):
+        submitted.append(func.__name__)
+        return submit(func, *args, **kwargs)
+
+    monkeypatch.setattr(executor, "submit", recording_submit)
+    monkeypatch.setattr(api.app.state, "analysis_executor", executor)
+    client = TestClient(api.app)
+    payload = {"chart_data": test_chart_data, "start_date": "2025-12-01", "end_date": "2026-01-31"}
+
+    try:
+        response = client.post("/api/v1/forecast", json=payload)
+    finally:
+        executor.shutdown()
+    assert len(response.text.splitlines()) == 62
+    assert submitted == ["prepare_natal_context", "get_transit_batch_results", "get_transit_batch_results"]
+    assert executor.stats()["pending"] == 0
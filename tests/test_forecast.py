@@ -0,0 +1,34 @@
+from itertools import count, islice
+
+from core_files.forecast import FORECAST_CHUNK_DAYS, iter_daily_forecast
+from core_files.natal_context import NatalContext
+from core_files.transit_analys import analyze_transits_full, calculate_transit_positions
+from tests.test_api import test_chart_data
+
+JD_START = 2461038.5  # 2025-12-29
+
+
+def test_forecast_is_lazy():
+    """An unbounded day sequence is consumed chunk by chunk, not materialized."""
+    consumed = []
+
+    def days():
+        for i in count():
+            consumed.append(i)
+            yield JD_START + i
+
+    first_days = list(islice(iter_daily_forecast(NatalContext(test_chart_data), days(), with_report=False), 3))
+    assert [day["jd"] for day in first_days] == [JD_START, JD_START + 1, JD_START + 2]
+    assert len(consumed) == FORECAST_CHUNK_DAYS
+
+
+def test_forecast_day_matches_single_date_analysis():
+    natal = NatalContext(test_chart_data)
+    day = next(iter_daily_forecast(natal, [JD_START]))
+
+    transit = calculate_transit_positions(JD_START, natal.lagna_degree, natal.latitude, natal.longitude)
+    report, houses = analyze_transits_full(test_chart_data["planets"], transit)
+    assert day["transit_positions"] == transit
+    assert {h: d["total_score"] for h, d in day["houses_analysis"].items()} == \
+        {h: d["total_score"] for h, d in houses.items()}
+    assert len(day["report"]) == len(report)
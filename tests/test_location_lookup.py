@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+from core_files import location_lookup
+from core_files.location_lookup import GeocodeCache, get_location_data, load_gazetteer
+
+BIRTH_DT = datetime(1990, 5, 17, 14, 30)
+
+
+class StandInGeocoder:
+    """Local geocoder that counts its (would-be network) calls."""
+
+    def __init__(self, places):
+        self.places = places
+        self.calls = []
+
+    def __call__(self, city_name):
+        self.calls.append(city_name)
+        return self.places.get(city_name.lower())
+
+
+@pytest.fixture
+def geocode_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(location_lookup, "_geocode_cache", GeocodeCache(tmp_path / "geocode.sqlite3"))
+    monkeypatch.setattr(location_lookup, "_gazetteer", {})
+    monkeypatch.delenv("GEOCODER_OFFLINE", raising=False)
+    return location_lookup._geocode_cache
+
+
+def test_geocoded_city_is_cached_persistently(geocode_cache, tmp_path):
+    """The geocoder runs once per city; later lookups (also from a new cache instance) stay local."""
+    geocoder = StandInGeocoder({"лиссабон": {"latitude": 38.72, "longitude": -9.14}})
+
+    first = get_location_data("Лиссабон", BIRTH_DT, geocoder)
+    again = get_location_data("  лиссабон ", BIRTH_DT, geocoder)
+
+    assert geocoder.calls == ["Лиссабон"]
+    assert first["timezone"] == again["timezone"] == "Europe/Lisbon"
+    assert first["utc_offset"] == 1.0
+    assert GeocodeCache(tmp_path / "geocode.sqlite3").get("ЛИССАБОН")["latitude"] == 38.72
+
+    with pytest.raises(ValueError):
+        get_location_data("атлантида", BIRTH_DT, geocoder)
+
+
+def test_offline_gazetteer(geocode_cache, tmp_path, monkeypatch):
+    """With a gazetteer and offline mode unknown cities fail without calling the geocoder."""
+    path = tmp_path / "cities.csv"
+    path.write_text("name,latitude,longitude,timezone\nПорту,41.15,-8.61,Europe/Lisbon\n", encoding="utf-8")
+    monkeypatch.setattr(location_lookup, "_gazetteer", load_gazetteer(path))
+    monkeypatch.setenv("GEOCODER_OFFLINE", "1")
+    geocoder = StandInGeocoder({})
+
+    assert get_location_data("порту", BIRTH_DT, geocoder)["latitude"] == 41.15
+    with pytest.raises(ValueError):
+        get_location_data("Лиссабон", BIRTH_DT, geocoder)
+    assert geocoder.calls == []
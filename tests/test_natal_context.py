@@ -0,0 +1,63 @@
+from core_files.natal_context import NatalContext, chart_content_hash, get_natal_context
+from core_files.transit_analys import (
+    analyze_transits_full,
+    calculate_transit_positions,
+    check_sade_sati,
+    get_house_rulers,
+)
+from core_files.vimshottari import get_vimshottari_dasha_states
+from tests.test_api import test_chart_data, client, TRANSIT_DATE
+
+JD_TRANSIT = 2461038.5  # 2025-12-29
+
+
+def test_chart_hash_ignores_key_order():
+    """Charts with the same content share a hash regardless of key order."""
+    reordered = dict(reversed(list(test_chart_data.items())))
+    assert chart_content_hash(reordered) == chart_content_hash(test_chart_data)
+    assert chart_content_hash({**test_chart_data, "lagna": 199.0}) != chart_content_hash(test_chart_data)
+
+
+def test_get_natal_context_is_cached():
+    """Repeated requests for the same chart reuse one context."""
+    assert get_natal_context(test_chart_data) is get_natal_context(dict(test_chart_data))
+
+
+def test_context_precomputes_natal_tables():
+    """Longitudes, lagna sign and house rulers are derived from the raw planets dict."""
+    context = NatalContext(test_chart_data)
+
+    assert context.lagna_sign_index == 6  # Весы
+    assert context.house_rulers[1] == "Венера"
+    assert context.house_map["Луна"] == 10
+    assert abs(context.longitudes["Луна"] - (90 + 8 + 45 / 60 + 15 / 3600)) < 1e-9
+
+
+def test_context_accepts_decimal_degrees():
+    """Degree strings that parse_dms rejects are left out instead of failing the analysis."""
+    planets = {**test_chart_data["planets"], "Марс": {**test_chart_data["planets"]["Марс"], "degree": "22.55"}}
+    chart = {**test_chart_data, "planets": planets}
+
+    context = NatalContext(chart)
+    assert "Марс" not in context.longitudes
+    assert "Луна" in context.longitudes
+
+    response = client.post("/api/v1/analyze", json={"chart_data": chart, "transit_date": TRANSIT_DATE})
+    assert response.status_code == 200
+
+
+def test_transit_functions_accept_context():
+    """Analysis results are identical for the raw planets dict and the context."""
+    context = NatalContext(test_chart_data)
+    planets = test_chart_data["planets"]
+    transit = calculate_transit_positions(JD_TRANSIT, context.lagna_degree, context.latitude, context.longitude)
+
+    _, houses_from_dict = analyze_transits_full(planets, transit)
+    _, houses_from_context = analyze_transits_full(context, transit)
+    assert houses_from_context == houses_from_dict
+
+    assert get_house_rulers(context, transit) == get_house_rulers(planets, transit)
+    assert check_sade_sati(transit, context) == check_sade_sati(transit, planets)
+    assert context.dasha_states(JD_TRANSIT) == get_vimshottari_dasha_states(
+        JD_TRANSIT, test_chart_data["julian_day"], planets["Луна"]
+    )
@@ -0,0 +1,56 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import app.api as api
+from app.response_cache import ResponseCache, make_cache_key, make_etag
+from tests.test_api import test_chart_data, TRANSIT_DATE
+
+
+def test_lru_eviction_and_ttl():
+    """The least recently used entry is evicted first; expired entries count as misses."""
+    cache = ResponseCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    short_lived = ResponseCache(max_size=2, ttl=0.01)
+    short_lived.set("a", 1)
+    time.sleep(0.02)
+    assert short_lived.get("a") is None
+    assert short_lived.stats()["size"] == 0
+
+
+def test_cache_key_uses_chart_content():
+    """Key order of chart_data does not change the key; the date and variant do."""
+    reordered = dict(reversed(list(test_chart_data.items())))
+    key = make_cache_key(test_chart_data, TRANSIT_DATE)
+    assert make_cache_key(reordered, TRANSIT_DATE) == key
+    assert make_cache_key(test_chart_data, "2025-12-30") != key
+    assert make_cache_key(test_chart_data, TRANSIT_DATE, "scores") != key
+
+
+def test_analyze_hits_cache_and_honours_etag(monkeypatch):
+    """A repeated request is served from the cache; a matching If-None-Match gets 304."""
+    monkeypatch.setattr(api, "response_cache", ResponseCache(max_size=8))
+    client = TestClient(api.app)
+    payload = {"chart_data": test_chart_data, "transit_date": TRANSIT_DATE}
+
+    first = client.post("/api/v1/analyze", json=payload)
+    second = client.post("/api/v1/analyze", json=payload)
+    assert first.status_code == second.status_code == 200
+    assert first.headers["X-Cache"] == "MISS" and second.headers["X-Cache"] == "HIT"
+    assert first.json() == second.json()
+
+    etag = first.headers["ETag"]
+    assert etag == make_etag(make_cache_key(test_chart_data, TRANSIT_DATE))
+    not_modified = client.post("/api/v1/analyze", json=payload, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+    stats = client.get("/api/v1/cache/stats").json()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
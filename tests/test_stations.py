@@ -0,0 +1,64 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import app
+from core_files.constants import GRAHAS
+from core_files.ephemeris import calculate_graha_arrays
+from core_files.stations import STATION_PLANETS, find_stations, stationary_planets
+from core_files.transit_analys import calculate_transit_positions, evaluate_house_ruler
+from tests.test_api import test_chart_data
+
+START_JD = 2460676.5  # 2025-01-01
+END_JD = START_JD + 365
+
+
+def test_stations_match_speed_sign_changes():
+    """Each speed sign change seen on a 6-hour grid is found exactly once, with the right direction."""
+    stations = find_stations(START_JD, END_JD)
+    sampled = calculate_graha_arrays(np.arange(START_JD, END_JD, 0.25))
+
+    for planet in STATION_PLANETS:
+        speed = sampled["speed"][:, GRAHAS.index(planet)]
+        changes = np.flatnonzero(np.diff(np.sign(speed)) != 0)
+        found = [s for s in stations if s["planet"] == planet]
+        assert len(found) == len(changes)
+        for station, i in zip(found, changes):
+            assert sampled["jd"][i] <= station["jd"] <= sampled["jd"][i + 1]
+            assert station["type"] == ("retrograde" if speed[i + 1] < 0 else "direct")
+
+
+def test_mercury_station_in_march_2025():
+    mercury = find_stations(START_JD, END_JD, ["Меркурий"])
+    assert mercury[0]["type"] == "retrograde"
+    assert mercury[0]["utc"].startswith("2025-03-15")
+    assert "Меркурий" in stationary_planets(mercury[0]["jd"] + 0.5)
+    assert "Меркурий" not in stationary_planets(mercury[0]["jd"] + 10)
+
+
+def test_stationary_ruler_scores_zero_for_motion():
+    """Motion scoring is unchanged by default and 0 for a stationary ruler."""
+    jd = find_stations(START_JD, END_JD, ["Меркурий"])[0]["jd"]
+    transit = calculate_transit_positions(jd, test_chart_data["lagna"], test_chart_data["latitude"],
+                                          test_chart_data["longitude"])
+    house_map = {p: d["house"] for p, d in test_chart_data["planets"].items()}
+
+    default = evaluate_house_ruler("Меркурий", house_map, transit)
+    stationary = evaluate_house_ruler("Меркурий", house_map, transit, stationary={"Меркурий"})
+    motion = 1 if not transit["Меркурий"]["retrograde"] else -1
+    assert default["score"] - stationary["score"] == motion
+    assert "стационарен" in stationary["reason"]
+
+
+def test_stations_endpoint_and_stationary_analysis():
+    client = TestClient(app)
+    response = client.post("/api/v1/stations", json={"start_date": "2025-01-01", "end_date": "2025-12-31",
+                                                     "planets": ["Меркурий"]})
+    assert response.status_code == 200
+    assert len(response.json()["stations"]) == 6
+
+    assert client.post("/api/v1/stations", json={"start_date": "2025-01-01", "end_date": "2025-12-31",
+                                                 "planets": ["Луна"]}).status_code == 422
+
+    analysis = client.post("/api/v1/analyze", json={"chart_data": test_chart_data, "transit_date": "2025-03-15",
+                                                    "stationary_motion": True}).json()
+    assert analysis["transits"]["stationary"] == ["Меркурий"]
@@ -0,0 +1,43 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core_files.astro_report import get_planet_positions_and_houses
+from core_files.constants import GRAHAS
+from core_files.ephemeris import calculate_graha_position
+from core_files.lunar_module import get_lunar_details
+
+JD_START = 2461038.5  # 2025-12-29 00:00 UT
+
+
+def calculate_all(jd):
+    """Every façade entry point for one date."""
+    return (
+        [calculate_graha_position(jd, i) for i in range(len(GRAHAS))],
+        get_planet_positions_and_houses(jd, 55.75, 37.61),
+        get_lunar_details(jd),
+    )
+
+
+def test_new_thread_uses_lahiri():
+    """A fresh thread gets the same (Lahiri) results as the main thread."""
+    expected = calculate_all(JD_START)
+    result = {}
+
+    thread = threading.Thread(target=lambda: result.update(value=calculate_all(JD_START)))
+    thread.start()
+    thread.join()
+
+    assert result["value"] == expected
+
+
+def test_concurrent_calculations_match_serial():
+    """Many threads calculating interleaved dates reproduce the serial results exactly."""
+    rng = random.Random(15)
+    jds = [JD_START + rng.uniform(-3650, 3650) for _ in range(200)]
+    expected = {jd: calculate_all(jd) for jd in jds}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(calculate_all, jds * 3))
+
+    assert results == [expected[jd] for jd in jds * 3]
@@ -0,0 +1,25 @@
+import random
+
+from core_files.constants import ZODIAC_SIGNS
+from core_files.transit_analys import analyze_transits_full, analyze_transits_scores, calculate_transit_positions
+from tests.test_api import test_chart_data
+
+
+def test_numeric_scores_match_text_analysis():
+    """The array-based scores equal the scores of the reason-building analysis, including int/float types."""
+    rng = random.Random(7)
+    natal_planets = {k: v for k, v in test_chart_data["planets"].items() if k != "Лагна"}
+
+    for _ in range(200):
+        jd = rng.uniform(2415020, 2488070)
+        lagna = rng.uniform(0, 360)
+        natal = {"Лагна": {"sign": ZODIAC_SIGNS[int(lagna // 30)], "house": 1}, **natal_planets}
+        transit = calculate_transit_positions(jd, lagna, 0, 0)
+
+        _, full = analyze_transits_full(natal, transit)
+        numeric = analyze_transits_scores(natal, transit)
+
+        for house in range(1, 13):
+            expected = {k: v for k, v in full[house].items() if k != "reasons"}
+            assert numeric[house] == expected
+            assert [type(v) for v in numeric[house].values()] == [type(v) for v in expected.values()]
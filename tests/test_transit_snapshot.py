@@ -0,0 +1,71 @@
+import pytest
+
+import core_files.transit_snapshot as transit_snapshot
+from core_files.astro_report import get_planet_positions_and_houses
+from core_files.constants import ZODIAC_SIGNS
+from core_files.degrees import parse_dms
+from core_files.ephemeris import calculate_graha_arrays
+from core_files.natal_context import NatalContext
+from core_files.positions import ChartPositions, Graha
+from core_files.transit_analys import analyze_transits_scores, calculate_transit_positions, is_sade_sati_active
+from core_files.transit_snapshot import clear_transit_snapshot_cache, get_transit_snapshot
+from tests.test_api import test_chart_data
+
+JD = 2461038.5  # 2025-12-29
+
+
+def test_projection_matches_per_chart_houses():
+    """Houses projected from the shared snapshot equal houses calculated for each lagna."""
+    snapshot = get_transit_snapshot(JD)
+    for lagna in (0.0, 29.99, 198.97, 359.5):
+        arrays = calculate_graha_arrays([JD], lagna)
+        positions = snapshot.project(lagna)
+        assert [positions[p]["house"] for p in arrays["planets"]] == arrays["house"][0].tolist()
+
+
+def test_positions_carry_float_longitude_and_speed():
+    """Transit and natal positions carry the absolute longitude and speed; the DMS string agrees."""
+    natal, _ = get_planet_positions_and_houses(JD, 55.75, 37.62)
+    for positions in (calculate_transit_positions(JD, 198.97, 0, 0), natal):
+        for name, data in positions.items():
+            from_string = ZODIAC_SIGNS.index(data["sign"]) * 30 + parse_dms(data["degree"])
+            assert abs(data["sidereal_longitude"] - from_string) <= 0.6 / 3600
+            if name != "Лагна":
+                assert data["retrograde"] == (data["speed"] < 0)
+    assert natal["Луна"]["speed"] > 11
+
+
+def test_many_charts_share_one_ephemeris_pass(monkeypatch):
+    clear_transit_snapshot_cache()
+    calls = []
+    original = transit_snapshot.calculate_graha_arrays
+    monkeypatch.setattr(transit_snapshot, "calculate_graha_arrays", lambda jds: calls.append(jds) or original(jds))
+
+    for i in range(100):
+        calculate_transit_positions(JD, i * 3.6, 0, 0)
+    assert len(calls) == 1
+
+
+def test_snapshot_is_immutable():
+    snapshot = get_transit_snapshot(JD)
+    with pytest.raises(AttributeError):
+        snapshot.jd = 0
+
+    positions = snapshot.project(198.97)
+    positions["Луна"]["house"] = 99
+    assert snapshot.project(198.97)["Луна"]["house"] != 99
+
+
+def test_compact_positions_match_dicts():
+    """ChartPositions round-trip through the dict format and score exactly like the dicts."""
+    natal = NatalContext(test_chart_data)
+    for lagna in (0.0, 198.97, 359.5):
+        compact = get_transit_snapshot(JD).chart_positions(lagna)
+        positions = calculate_transit_positions(JD, lagna, 0, 0)
+
+        assert compact.to_dict() == positions == dict(compact)
+        assert ChartPositions.from_dict(positions, JD).to_dict() == positions
+        assert compact.position(Graha.SATURN).sign.label == positions["Сатурн"]["sign"]
+        assert compact.position(Graha.MOON).nakshatra.label == positions["Луна"]["nakshatra"]
+        assert analyze_transits_scores(natal, compact) == analyze_transits_scores(natal, positions)
+        assert is_sade_sati_active(compact, natal) == is_sade_sati_active(positions, natal)